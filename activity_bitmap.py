@@ -0,0 +1,139 @@
+import sqlite3
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+# One bit per day of the year (bit 0 = 1 January), 366 bits in 46 bytes,
+# stored little-endian so the bitmap round-trips through int.from_bytes.
+BITMAP_BYTES = 46
+
+ACTIVITY_BITMAP_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS activity_bitmaps (
+        user_id INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        days BLOB NOT NULL,
+        PRIMARY KEY (user_id, year)
+    ) WITHOUT ROWID
+'''
+
+
+def day_index(day: date) -> int:
+    """Bit position of a date within its year"""
+    return day.timetuple().tm_yday - 1
+
+
+def to_int(bitmap: Optional[bytes]) -> int:
+    """Bitmap bytes as an integer for bitwise operations"""
+    return int.from_bytes(bitmap or b'', 'little')
+
+
+def to_bytes(bits: int) -> bytes:
+    """Integer bitmap back to its stored form"""
+    return bits.to_bytes(BITMAP_BYTES, 'little')
+
+
+def _bit_count(bits: int) -> int:
+    # int.bit_count() needs Python 3.10; the app supports 3.8.
+    return bin(bits).count('1')
+
+
+def popcount(bitmap: bytes) -> int:
+    """Number of active days in a bitmap"""
+    return _bit_count(to_int(bitmap))
+
+
+def union(bitmaps: Iterable[bytes]) -> bytes:
+    """Days active in any of the bitmaps"""
+    bits = 0
+    for bitmap in bitmaps:
+        bits |= to_int(bitmap)
+    return to_bytes(bits)
+
+
+def load_year(conn: sqlite3.Connection, user_id: int, year: int) -> bytes:
+    """A user's bitmap for one year; all zeros when there was no activity"""
+    row = conn.execute(
+        "SELECT days FROM activity_bitmaps WHERE user_id = ? AND year = ?", (user_id, year)
+    ).fetchone()
+    return bytes(row[0]) if row else to_bytes(0)
+
+
+def mark_active_day(conn: sqlite3.Connection, user_id: int, day: Optional[date] = None):
+    """Set the bit for an active day"""
+    day = day or date.today()
+    bits = to_int(load_year(conn, user_id, day.year)) | (1 << day_index(day))
+    conn.execute(
+        "INSERT INTO activity_bitmaps (user_id, year, days) VALUES (?, ?, ?) "
+        "ON CONFLICT(user_id, year) DO UPDATE SET days = excluded.days",
+        (user_id, day.year, to_bytes(bits))
+    )
+
+
+def activity_flags(conn: sqlite3.Connection, user_id: int, start: date, end: date) -> List[bool]:
+    """Active/inactive flag for each day from start to end inclusive"""
+    years = {year: to_int(load_year(conn, user_id, year)) for year in range(start.year, end.year + 1)}
+    flags = []
+    day = start
+    while day <= end:
+        flags.append(bool(years[day.year] >> day_index(day) & 1))
+        day += timedelta(days=1)
+    return flags
+
+
+def year_heatmap(conn: sqlite3.Connection, user_id: int, year: int) -> Dict[str, Any]:
+    """Render-ready heatmap for one year.
+
+    ``weeks`` holds Monday-first columns of seven cells: 1 active, 0 idle,
+    None for padding outside the year. ``weekly_counts`` is the number of
+    active days in each column.
+    """
+    return _heatmap(to_int(load_year(conn, user_id, year)), year)
+
+
+def empty_heatmap(year: int) -> Dict[str, Any]:
+    """Heatmap of a year without activity"""
+    return _heatmap(0, year)
+
+
+def _heatmap(bits: int, year: int) -> Dict[str, Any]:
+    first = date(year, 1, 1)
+    days_in_year = (date(year + 1, 1, 1) - first).days
+    lead = first.weekday()
+
+    weeks, weekly_counts = [], []
+    for start in range(-lead, days_in_year, 7):
+        lo, hi = max(start, 0), min(start + 7, days_in_year)
+        week_bits = bits >> lo & ((1 << (hi - lo)) - 1)
+        cells = [None] * (lo - start)
+        cells += [week_bits >> i & 1 for i in range(hi - lo)]
+        cells += [None] * (7 - len(cells))
+        weeks.append(cells)
+        weekly_counts.append(_bit_count(week_bits))
+
+    return {
+        'year': year,
+        'weeks': weeks,
+        'weekly_counts': weekly_counts,
+        'active_days': _bit_count(bits),
+        'total_days': days_in_year
+    }
+
+
+def backfill_bitmaps(conn: sqlite3.Connection, activity_table: str) -> int:
+    """Rebuild activity_bitmaps from an activity table; returns bitmaps written"""
+    conn.execute("DELETE FROM activity_bitmaps")
+    bitmaps: Dict[tuple, int] = {}
+    for user_id, day_str in conn.execute(
+        f"SELECT DISTINCT user_id, activity_date FROM {activity_table} WHERE activity_date IS NOT NULL"
+    ):
+        try:
+            day = date.fromisoformat(day_str)
+        except (TypeError, ValueError):
+            continue
+        key = (user_id, day.year)
+        bitmaps[key] = bitmaps.get(key, 0) | (1 << day_index(day))
+
+    conn.executemany(
+        "INSERT INTO activity_bitmaps (user_id, year, days) VALUES (?, ?, ?)",
+        [(user_id, year, to_bytes(bits)) for (user_id, year), bits in bitmaps.items()]
+    )
+    return len(bitmaps)
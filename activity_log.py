@@ -0,0 +1,128 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+PERIODS = ('day', 'week', 'month')
+
+ACTIVITY_EVENTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS activity_events (
+        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        activity_type TEXT NOT NULL,
+        activity_date DATE NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+ACTIVITY_EVENTS_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_activity_events_user_date ON activity_events (user_id, activity_date)"
+)
+
+# One counter per user, period bucket and activity type; week buckets
+# start on Monday and month buckets on the 1st.
+ACTIVITY_ROLLUPS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS activity_rollups (
+        user_id INTEGER NOT NULL,
+        period TEXT NOT NULL,
+        period_start DATE NOT NULL,
+        activity_type TEXT NOT NULL,
+        event_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, period, period_start, activity_type)
+    ) WITHOUT ROWID
+'''
+
+
+def period_start(day: date, period: str) -> date:
+    """First day of the bucket containing ``day``"""
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+
+
+def _bump_rollups(conn: sqlite3.Connection, rows: List[tuple]):
+    conn.executemany('''
+        INSERT INTO activity_rollups (user_id, period, period_start, activity_type, event_count)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, period, period_start, activity_type)
+        DO UPDATE SET event_count = event_count + excluded.event_count
+    ''', rows)
+
+
+def record_event(conn: sqlite3.Connection, user_id: int, activity_type: str, day: Optional[date] = None):
+    """Append one typed event and bump its day, week and month rollups"""
+    day = day or date.today()
+    activity_type = activity_type or 'activity'
+    conn.execute(
+        "INSERT INTO activity_events (user_id, activity_type, activity_date) VALUES (?, ?, ?)",
+        (user_id, activity_type, day.isoformat())
+    )
+    _bump_rollups(conn, [
+        (user_id, period, period_start(day, period).isoformat(), activity_type, 1) for period in PERIODS
+    ])
+
+
+def read_rollups(conn: sqlite3.Connection, user_id: int, period: str = 'day', since: Optional[date] = None,
+                 activity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Pre-aggregated event counts, oldest bucket first"""
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+
+    query = '''
+        SELECT period_start, activity_type, event_count FROM activity_rollups
+        WHERE user_id = ? AND period = ?
+    '''
+    params: List[Any] = [user_id, period]
+    if since is not None:
+        query += " AND period_start >= ?"
+        params.append(period_start(since, period).isoformat())
+    if activity_type is not None:
+        query += " AND activity_type = ?"
+        params.append(activity_type)
+    query += " ORDER BY period_start, activity_type"
+
+    return [
+        {'period_start': r[0], 'activity_type': r[1], 'count': r[2]}
+        for r in conn.execute(query, params)
+    ]
+
+
+def rebuild_rollups(conn: sqlite3.Connection) -> int:
+    """Recompute every rollup from activity_events; returns rollup rows written"""
+    conn.execute("DELETE FROM activity_rollups")
+    counts: Dict[tuple, int] = {}
+    for user_id, activity_type, day_str, count in conn.execute(
+        "SELECT user_id, activity_type, activity_date, COUNT(*) FROM activity_events "
+        "GROUP BY user_id, activity_type, activity_date"
+    ):
+        day = datetime.strptime(day_str, '%Y-%m-%d').date()
+        for period in PERIODS:
+            key = (user_id, period, period_start(day, period).isoformat(), activity_type)
+            counts[key] = counts.get(key, 0) + count
+
+    _bump_rollups(conn, [key + (count,) for key, count in counts.items()])
+    return len(counts)
+
+
+def import_legacy_activity(conn: sqlite3.Connection, source_sql: str):
+    """Seed activity_events from an older table, then rebuild the rollups.
+
+    ``source_sql`` yields (user_id, activity_type, activity_date, repeat)
+    rows; each becomes ``repeat`` events.
+    """
+    events = []
+    for user_id, activity_type, day_str, repeat in conn.execute(source_sql).fetchall():
+        try:
+            day = datetime.strptime(day_str, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            continue
+        events.extend([(user_id, activity_type or 'activity', day.isoformat())] * max(repeat or 1, 1))
+
+    conn.executemany(
+        "INSERT INTO activity_events (user_id, activity_type, activity_date) VALUES (?, ?, ?)",
+        events
+    )
+    rebuild_rollups(conn)
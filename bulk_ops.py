@@ -0,0 +1,142 @@
+import sqlite3
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+VALID_PRIORITIES = ('low', 'medium', 'high')
+
+# Per-row failures: constraint violations, and values sqlite3 cannot bind
+# (InterfaceError before Python 3.11, ProgrammingError since).
+ROW_ERRORS = (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError)
+
+
+def _require_text(row: Mapping[str, Any], field: str) -> str:
+    value = row.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{field} is required")
+    return value
+
+
+def _optional_text(row: Mapping[str, Any], field: str) -> Optional[str]:
+    value = row.get(field)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"{field} must be text")
+    return value
+
+
+def _optional_date(row: Mapping[str, Any], field: str) -> Optional[str]:
+    value = row.get(field)
+    if value in (None, '', 'YYYY-MM-DD'):
+        return None
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be YYYY-MM-DD")
+    return value
+
+
+def _optional_id(row: Mapping[str, Any], field: str) -> Optional[int]:
+    value = row.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{field} must be an integer")
+    return value
+
+
+def _mapping(row: Any) -> Mapping[str, Any]:
+    if not isinstance(row, Mapping):
+        raise ValueError("Row must be a mapping")
+    return row
+
+
+# ==================== ROW VALIDATORS ====================
+# Each returns the column values that follow user_id in its INSERT.
+
+def validate_task(row: Any) -> Tuple:
+    """(task_text, due_date, priority)"""
+    row = _mapping(row)
+    priority = row.get('priority') or 'medium'
+    if priority not in VALID_PRIORITIES:
+        raise ValueError(f"priority must be one of {', '.join(VALID_PRIORITIES)}")
+    return (_require_text(row, 'task_text'), _optional_date(row, 'due_date'), priority)
+
+
+def validate_note(row: Any) -> Tuple:
+    """(topic_id, note_text)"""
+    row = _mapping(row)
+    return (_optional_id(row, 'topic_id'), _require_text(row, 'note_text'))
+
+
+def validate_goal(row: Any) -> Tuple:
+    """(topic_id, goal_text, target_date)"""
+    row = _mapping(row)
+    return (_optional_id(row, 'topic_id'), _require_text(row, 'goal_text'), _optional_date(row, 'target_date'))
+
+
+def validate_subtopic(row: Any) -> Tuple:
+    """(topic_name, subject)"""
+    row = _mapping(row)
+    return (_require_text(row, 'topic_name'), _optional_text(row, 'subject'))
+
+
+def validate_snippet(row: Any) -> Tuple:
+    """(title, language, code, description)"""
+    row = _mapping(row)
+    return (
+        _require_text(row, 'title'),
+        _require_text(row, 'language'),
+        _require_text(row, 'code'),
+        _optional_text(row, 'description')
+    )
+
+
+# ==================== BATCH INSERT ====================
+
+def insert_rows(conn: sqlite3.Connection, sql: str, rows: Iterable[Any],
+                validate: Callable[[Any], Tuple], prefix: Sequence[Any] = ()) -> Dict[str, List]:
+    """Validate and insert many rows with one ``executemany``.
+
+    Must run inside the caller's transaction. Returns ``ids`` aligned with the
+    input (None for rejected rows) and ``errors`` as ``{'index', 'error'}``
+    dicts; invalid rows are reported rather than aborting the batch. Rowids
+    are derived from ``last_insert_rowid()`` since a single writer holding the
+    transaction receives consecutive ids.
+    """
+    ids: List[Optional[int]] = []
+    errors: List[Dict[str, Any]] = []
+    valid: List[Tuple[int, Tuple]] = []
+
+    for index, row in enumerate(rows):
+        ids.append(None)
+        try:
+            valid.append((index, tuple(prefix) + validate(row)))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    if not valid:
+        return {'ids': ids, 'errors': errors}
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    conn.execute("SAVEPOINT bulk_insert")
+    try:
+        conn.executemany(sql, [params for _, params in valid])
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        first_id = last_id - len(valid) + 1
+        for offset, (index, _) in enumerate(valid):
+            ids[index] = first_id + offset
+    except ROW_ERRORS:
+        # A constraint failed or a value could not be bound somewhere in the
+        # batch: undo it and insert row by row so only the offending rows
+        # are rejected.
+        conn.execute("ROLLBACK TO bulk_insert")
+        for index, params in valid:
+            try:
+                ids[index] = conn.execute(sql, params).lastrowid
+            except ROW_ERRORS as e:
+                errors.append({'index': index, 'error': str(e)})
+        errors.sort(key=lambda e: e['index'])
+    finally:
+        conn.execute("RELEASE bulk_insert")
+
+    return {'ids': ids, 'errors': errors}
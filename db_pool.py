@@ -0,0 +1,216 @@
+import sqlite3
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Callable, Dict, Iterator
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when a connection is requested from a closed pool"""
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections.
+
+    Connections are opened lazily up to ``size``, configured once (row factory,
+    pragmas) and handed back to an idle queue after use, so hot CRUD paths skip
+    the connect/teardown and keep their prepared-statement caches warm.
+
+    ``transaction()`` is a unit of work: nested calls on the same thread join
+    the outermost transaction, so several repository calls made for one user
+    action share a connection and commit once.
+    """
+
+    def __init__(self, db_path: str, size: int = 5, timeout: float = 30.0,
+                 row_factory: Optional[Callable] = None,
+                 health_check_interval: float = 30.0,
+                 cached_statements: int = 256,
+                 foreign_keys: bool = True):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.row_factory = row_factory
+        self.health_check_interval = health_check_interval
+        self.cached_statements = cached_statements
+        self.foreign_keys = foreign_keys
+
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._last_used: Dict[int, float] = {}
+        self._created = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    # ==================== CONNECTION LIFECYCLE ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new pooled connection"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        if self.foreign_keys:
+            conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Ping a connection that has been idle for a while"""
+        idle_for = time.monotonic() - self._last_used.get(id(conn), 0.0)
+        if idle_for < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection):
+        """Close a connection and free its slot"""
+        self._last_used.pop(id(conn), None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def acquire(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """Take a connection from the pool, opening one if a slot is free"""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            if self._closed:
+                raise PoolClosedError("Connection pool is closed")
+
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+
+            if conn is not None:
+                if self._is_healthy(conn):
+                    return conn
+                self._discard(conn)
+                continue
+
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Timed out waiting for a database connection")
+            try:
+                conn = self._idle.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                continue
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool"""
+        if self._closed:
+            self._discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._last_used[id(conn)] = time.monotonic()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of a ``with`` block"""
+        active = getattr(self._local, 'conn', None)
+        if active is not None:
+            yield active
+            return
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection and commit on success, roll back on error.
+
+        Inside an enclosing transaction on the same thread this joins it and
+        leaves the commit to the outermost block. The joined block runs under
+        a SAVEPOINT, so if it raises only its own writes are undone, even when
+        the caller catches the error and the outer block goes on to commit.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            depth = getattr(self._local, 'depth', 0) + 1
+            savepoint = f"pool_nested_{depth}"
+            if not conn.in_transaction:
+                # A SAVEPOINT opened outside a transaction would commit on
+                # RELEASE; begin explicitly so the outer block keeps the commit
+                conn.execute("BEGIN")
+            conn.execute(f"SAVEPOINT {savepoint}")
+            self._local.depth = depth
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+                raise
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+            finally:
+                self._local.depth = depth - 1
+            return
+        with self.connection() as conn:
+            self._local.conn = conn
+            try:
+                with conn:
+                    yield conn
+            finally:
+                self._local.conn = None
+
+    @property
+    def in_transaction(self) -> bool:
+        """Whether the calling thread is inside ``transaction()``"""
+        return getattr(self._local, 'conn', None) is not None
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
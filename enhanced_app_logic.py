@@ -7,25 +7,223 @@ import tempfile
 import os
 from datetime import datetime, date, timedelta
 from pathlib import Path
+from db_pool import ConnectionPool
+from schema_migrations import Migration, ensure_schema
+from exam_store import (
+    EXAM_QUESTIONS_SCHEMA, insert_questions, load_questions, load_answer_key, record_answers,
+    migrate_exam_blobs, compress_question_payloads
+)
+from pagination import DEFAULT_PAGE_SIZE, SortKey, fetch_page, page_result
+from user_stats import EXAM_TAKEN_SCORE, user_stats_schema, rebuild_user_stats, read_user_stats
+from streaks import STREAK_SCHEMA, record_active_day, read_streak, backfill_streaks, streak_history
+from activity_bitmap import (
+    ACTIVITY_BITMAP_SCHEMA, mark_active_day, activity_flags, year_heatmap, empty_heatmap, backfill_bitmaps
+)
+from activity_log import (
+    ACTIVITY_EVENTS_SCHEMA, ACTIVITY_EVENTS_INDEX, ACTIVITY_ROLLUPS_SCHEMA, record_event, read_rollups,
+    import_legacy_activity
+)
+from exam_analytics import AnalyticsCache, compute_exam_analytics
+from progress_history import (
+    PROGRESS_HISTORY_SCHEMA, PROGRESS_HISTORY_INDEX, DEFAULT_MAX_POINTS, append_progress, seed_progress_history,
+    progress_series
+)
+from spaced_repetition import (
+    REVIEW_CARDS_SCHEMA, REVIEW_CARDS_INDEX, DEFAULT_REVIEW_LIMIT, CORRECT_QUALITY, INCORRECT_QUALITY,
+    schedule_exam_answers, review_card, due_cards, due_count, backfill_review_cards
+)
+from exam_stats import EXAM_STATS_SCHEMA, record_exam_score, rebuild_exam_stats, read_exam_stats, empty_exam_stats
+from item_analysis import ITEM_STATS_SCHEMA, analyze_items, flagged_item_keys, item_key
+from response_cache import RESPONSE_CACHE_SCHEMA, RESPONSE_CACHE_INDEX, ResponseCache
+from bulk_ops import insert_rows, validate_task, validate_note, validate_goal, validate_subtopic
+
+
+def _migrate_exam_blobs(conn):
+    migrate_exam_blobs(conn, 'questions_data')
+
+
+def _rebuild_user_stats(conn):
+    rebuild_user_stats(conn, EXAM_TAKEN_SCORE)
+
+
+def _backfill_streaks(conn):
+    backfill_streaks(conn, 'study_activity')
+
+
+def _backfill_bitmaps(conn):
+    backfill_bitmaps(conn, 'study_activity')
+
+
+def _import_activity_events(conn):
+    import_legacy_activity(conn, "SELECT user_id, activity_type, activity_date, 1 FROM study_activity")
+
+
+def _backfill_review_cards(conn):
+    backfill_review_cards(conn, EXAM_TAKEN_SCORE)
+
+
+def _rebuild_exam_stats(conn):
+    rebuild_exam_stats(conn, EXAM_TAKEN_SCORE)
+
+
+SCHEMA_MIGRATIONS = [
+    Migration(1, "Base tables", (
+        # Users table
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+
+        # Subtopics table
+        '''
+        CREATE TABLE IF NOT EXISTS subtopics (
+            topic_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_name TEXT NOT NULL,
+            subject TEXT,
+            progress INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+        ''',
+
+        # Goals table
+        '''
+        CREATE TABLE IF NOT EXISTS goals (
+            goal_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_id INTEGER,
+            goal_text TEXT NOT NULL,
+            target_date DATE,
+            is_completed BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id)
+        )
+        ''',
+
+        # Notes table
+        '''
+        CREATE TABLE IF NOT EXISTS notes (
+            note_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_id INTEGER,
+            note_text TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id)
+        )
+        ''',
+
+        # Tasks table
+        '''
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            task_text TEXT NOT NULL,
+            due_date DATE,
+            priority TEXT DEFAULT 'medium',
+            is_completed BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+        ''',
+
+        # Exams table
+        '''
+        CREATE TABLE IF NOT EXISTS exams (
+            exam_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_id INTEGER,
+            exam_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            score REAL,
+            total_questions INTEGER,
+            questions_data TEXT,
+            user_answers TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id)
+        )
+        ''',
+
+        # Study activity table (for streak tracking)
+        '''
+        CREATE TABLE IF NOT EXISTS study_activity (
+            activity_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            activity_date DATE NOT NULL,
+            activity_type TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        )
+        '''
+    )),
+    Migration(2, "Indexes for per-user queries", (
+        "CREATE INDEX IF NOT EXISTS idx_subtopics_user ON subtopics (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_goals_user_status ON goals (user_id, is_completed, target_date)",
+        "CREATE INDEX IF NOT EXISTS idx_notes_user_created ON notes (user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_status_due ON tasks (user_id, is_completed, due_date)",
+        "CREATE INDEX IF NOT EXISTS idx_exams_user_date ON exams (user_id, exam_date)",
+        "CREATE INDEX IF NOT EXISTS idx_study_activity_user_date ON study_activity (user_id, activity_date)"
+    )),
+    Migration(3, "Normalized exam questions", (EXAM_QUESTIONS_SCHEMA,), _migrate_exam_blobs),
+    Migration(4, "Compressed exam question payloads", (), compress_question_payloads),
+    Migration(5, "Trigger-maintained user_stats", user_stats_schema(EXAM_TAKEN_SCORE), _rebuild_user_stats),
+    Migration(6, "Incremental streak tracking", (STREAK_SCHEMA,), _backfill_streaks),
+    Migration(7, "Per-year activity bitmaps", (ACTIVITY_BITMAP_SCHEMA,), _backfill_bitmaps),
+    Migration(8, "Typed activity events and rollups", (
+        ACTIVITY_EVENTS_SCHEMA, ACTIVITY_EVENTS_INDEX, ACTIVITY_ROLLUPS_SCHEMA
+    ), _import_activity_events),
+    Migration(9, "Topic progress history", (
+        PROGRESS_HISTORY_SCHEMA, PROGRESS_HISTORY_INDEX
+    ), seed_progress_history),
+    Migration(10, "Spaced repetition review cards", (
+        REVIEW_CARDS_SCHEMA, REVIEW_CARDS_INDEX
+    ), _backfill_review_cards),
+    Migration(11, "Persisted per-user exam score stats", (EXAM_STATS_SCHEMA,), _rebuild_exam_stats),
+    Migration(12, "Per-question item analysis results", (ITEM_STATS_SCHEMA,)),
+    Migration(13, "Persistent LLM response cache", (RESPONSE_CACHE_SCHEMA, RESPONSE_CACHE_INDEX)),
+]
+
 
 class EnhancedAppLogic:
-    def __init__(self, db_path="study_tracker.db"):
+    def __init__(self, db_path="study_tracker.db", pool_size=5):
         self.db_path = db_path
+        self.db = ConnectionPool(db_path, size=pool_size, foreign_keys=False)
+        self.analytics_cache = AnalyticsCache()
         self.current_user_id = None
         self.init_database()
         self._init_ai_generators()
     
+    def close(self):
+        """Close all pooled database connections and the Ollama session"""
+        self.db.close()
+        if self.ollama:
+            self.ollama.close()
+    
+    def start_health_probe(self):
+        """Keep Ollama availability current in the background until close()"""
+        if self.ollama:
+            self.ollama.start_health_probe()
+    
+    @property
+    def ollama_available(self):
+        """Last known Ollama availability, without a network round-trip"""
+        return self.ollama is not None and self.ollama.is_available()
+    
     def _init_ai_generators(self):
         """Initialize AI generators with fallback support"""
-        # Try Ollama first
+        # Try Ollama first; the UI starts the background health probe
         self.ollama = None
-        self.ollama_available = False
         try:
             from ollama_integration import OllamaIntegration
-            self.ollama = OllamaIntegration()
-            self.ollama_available = self.ollama.check_connection()
-            if self.ollama_available:
+            self.ollama = OllamaIntegration(cache=ResponseCache(self.db))
+            if self.ollama.check_connection():
                 print("✅ Ollama connected successfully")
+            else:
+                print(f"⚠️ Ollama not available: {self.ollama.health().error}")
         except Exception as e:
             print(f"⚠️ Ollama not available: {e}")
         
@@ -49,104 +247,9 @@ class EnhancedAppLogic:
             self.offline_coding_gen = None
     
     def init_database(self):
-        """Initialize database with all required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Subtopics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS subtopics (
-                topic_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                topic_name TEXT NOT NULL,
-                subject TEXT,
-                progress INTEGER DEFAULT 0,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-        
-        # Goals table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS goals (
-                goal_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                topic_id INTEGER,
-                goal_text TEXT NOT NULL,
-                target_date DATE,
-                is_completed BOOLEAN DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id)
-            )
-        ''')
-        
-        # Notes table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notes (
-                note_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                topic_id INTEGER,
-                note_text TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id)
-            )
-        ''')
-        
-        # Tasks table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                task_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                task_text TEXT NOT NULL,
-                due_date DATE,
-                priority TEXT DEFAULT 'medium',
-                is_completed BOOLEAN DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-        
-        # Exams table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS exams (
-                exam_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                topic_id INTEGER,
-                exam_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                score REAL,
-                total_questions INTEGER,
-                questions_data TEXT,
-                user_answers TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (user_id),
-                FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id)
-            )
-        ''')
-        
-        # Study activity table (for streak tracking)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS study_activity (
-                activity_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                activity_date DATE NOT NULL,
-                activity_type TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (user_id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Create or upgrade all tables; a single read when already current"""
+        with self.db.connection() as conn:
+            ensure_schema(conn, SCHEMA_MIGRATIONS)
     
     def hash_password(self, password):
         """Hash a password for storing"""
@@ -155,17 +258,12 @@ class EnhancedAppLogic:
     def register_user(self, username, password, email):
         """Register a new user"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             password_hash = self.hash_password(password)
-            cursor.execute(
-                "INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)",
-                (username, password_hash, email)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)",
+                    (username, password_hash, email)
+                )
             return True, "Account created successfully!"
         except sqlite3.IntegrityError:
             return False, "Username or email already exists"
@@ -175,21 +273,18 @@ class EnhancedAppLogic:
     def login_user(self, username, password):
         """Login a user"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             password_hash = self.hash_password(password)
-            cursor.execute(
-                "SELECT user_id FROM users WHERE username = ? AND password_hash = ?",
-                (username, password_hash)
-            )
-            
-            result = cursor.fetchone()
-            conn.close()
+            with self.db.transaction() as conn:
+                result = conn.execute(
+                    "SELECT user_id FROM users WHERE username = ? AND password_hash = ?",
+                    (username, password_hash)
+                ).fetchone()
+                
+                if result:
+                    self.current_user_id = result[0]
+                    self.log_activity("login")
             
             if result:
-                self.current_user_id = result[0]
-                self.log_activity("login")
                 return True, "Login successful!"
             else:
                 return False, "Invalid username or password"
@@ -205,16 +300,11 @@ class EnhancedAppLogic:
         if not self.current_user_id:
             return None
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT user_id, username, email FROM users WHERE user_id = ?",
-            (self.current_user_id,)
-        )
-        
-        result = cursor.fetchone()
-        conn.close()
+        with self.db.connection() as conn:
+            result = conn.execute(
+                "SELECT user_id, username, email FROM users WHERE user_id = ?",
+                (self.current_user_id,)
+            ).fetchone()
         
         if result:
             return {
@@ -225,30 +315,36 @@ class EnhancedAppLogic:
         return None
     
     def log_activity(self, activity_type):
-        """Log user activity for streak tracking"""
+        """Log user activity for streak tracking.
+        
+        Every call is appended to the typed event log; study_activity keeps
+        the first activity of each day. Joins the caller's transaction when
+        invoked inside one, so the activity rows are committed together with
+        the action they record.
+        """
         if not self.current_user_id:
             return
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             today = date.today().strftime('%Y-%m-%d')
             
-            # Check if already logged today
-            cursor.execute(
-                "SELECT activity_id FROM study_activity WHERE user_id = ? AND activity_date = ?",
-                (self.current_user_id, today)
-            )
-            
-            if not cursor.fetchone():
+            with self.db.transaction() as conn:
+                record_event(conn, self.current_user_id, activity_type)
+                cursor = conn.cursor()
+                
+                # Check if already logged today
                 cursor.execute(
-                    "INSERT INTO study_activity (user_id, activity_date, activity_type) VALUES (?, ?, ?)",
-                    (self.current_user_id, today, activity_type)
+                    "SELECT activity_id FROM study_activity WHERE user_id = ? AND activity_date = ?",
+                    (self.current_user_id, today)
                 )
-                conn.commit()
-            
-            conn.close()
+                
+                if not cursor.fetchone():
+                    cursor.execute(
+                        "INSERT INTO study_activity (user_id, activity_date, activity_type) VALUES (?, ?, ?)",
+                        (self.current_user_id, today, activity_type)
+                    )
+                    record_active_day(conn, self.current_user_id)
+                    mark_active_day(conn, self.current_user_id)
         except Exception:
             pass
     
@@ -263,18 +359,13 @@ class EnhancedAppLogic:
             return False, "Topic name is required"
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "INSERT INTO subtopics (user_id, topic_name, subject) VALUES (?, ?, ?)",
-                (self.current_user_id, topic_name, subject)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO subtopics (user_id, topic_name, subject) VALUES (?, ?, ?)",
+                    (self.current_user_id, topic_name, subject)
+                )
+                self.log_activity("add_topic")
             
-            self.log_activity("add_topic")
             return True, "Topic added successfully!"
         except Exception as e:
             return False, f"Error: {str(e)}"
@@ -284,16 +375,11 @@ class EnhancedAppLogic:
         if not self.current_user_id:
             return []
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT topic_id, topic_name, subject, progress FROM subtopics WHERE user_id = ?",
-            (self.current_user_id,)
-        )
-        
-        results = cursor.fetchall()
-        conn.close()
+        with self.db.connection() as conn:
+            results = conn.execute(
+                "SELECT topic_id, topic_name, subject, progress FROM subtopics WHERE user_id = ?",
+                (self.current_user_id,)
+            ).fetchall()
         
         return [
             {
@@ -311,30 +397,78 @@ class EnhancedAppLogic:
             return False, "Not logged in"
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "UPDATE subtopics SET progress = ? WHERE topic_id = ? AND user_id = ?",
-                (progress, topic_id, self.current_user_id)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                row = conn.execute(
+                    "SELECT progress FROM subtopics WHERE topic_id = ? AND user_id = ?",
+                    (topic_id, self.current_user_id)
+                ).fetchone()
+                if not row:
+                    return False, "Topic not found"
+                conn.execute(
+                    "UPDATE subtopics SET progress = ? WHERE topic_id = ? AND user_id = ?",
+                    (progress, topic_id, self.current_user_id)
+                )
+                append_progress(conn, topic_id, row[0], progress)
+                self.log_activity("update_progress")
             
-            self.log_activity("update_progress")
             return True, "Progress updated!"
         except Exception as e:
             return False, f"Error: {str(e)}"
     
+    def get_topic_progress_history(self, topic_id, since=None, until=None, max_points=DEFAULT_MAX_POINTS):
+        """Get a downsampled progress series for one of the user's topics"""
+        if not self.current_user_id:
+            return []
+        
+        with self.db.connection() as conn:
+            owned = conn.execute(
+                "SELECT 1 FROM subtopics WHERE topic_id = ? AND user_id = ?",
+                (topic_id, self.current_user_id)
+            ).fetchone()
+            if not owned:
+                return []
+            return progress_series(conn, topic_id, since, until, max_points)
+    
     def calculate_total_progress(self):
         """Calculate average progress across all topics"""
-        topics = self.get_user_subtopics()
-        if not topics:
+        if not self.current_user_id:
             return 0
         
-        total = sum(t['progress'] for t in topics)
-        return total / len(topics)
+        with self.db.connection() as conn:
+            return read_user_stats(conn, self.current_user_id)['average_progress']
+    
+    def get_dashboard_summary(self):
+        """Get the dashboard counts, average progress and streak in one query.
+        
+        The counts come from the trigger-maintained user_stats row and the
+        streak from user_streaks.
+        """
+        summary = {
+            'topic_count': 0,
+            'average_progress': 0,
+            'exams_taken': 0,
+            'pending_tasks': 0,
+            'completed_goals': 0,
+            'current_streak': 0
+        }
+        if not self.current_user_id:
+            return summary
+        
+        with self.db.connection() as conn:
+            row = conn.execute('''
+                SELECT
+                    COALESCE(s.topic_count, 0),
+                    CASE WHEN s.topic_count > 0 THEN s.progress_total * 1.0 / s.topic_count ELSE 0 END,
+                    COALESCE(s.exams_taken, 0),
+                    COALESCE(s.pending_tasks, 0),
+                    COALESCE(s.completed_goals, 0),
+                    CASE WHEN k.last_active_date = :today THEN k.current_streak ELSE 0 END
+                FROM (SELECT :user_id AS user_id) u
+                LEFT JOIN user_streaks k ON k.user_id = u.user_id
+                LEFT JOIN user_stats s ON s.user_id = u.user_id
+            ''', {'user_id': self.current_user_id, 'today': date.today().strftime('%Y-%m-%d')}).fetchone()
+        
+        return dict(zip(summary, row))
     
     # ========== GOALS ==========
     
@@ -347,18 +481,13 @@ class EnhancedAppLogic:
             return False, "Goal text is required"
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "INSERT INTO goals (user_id, topic_id, goal_text, target_date) VALUES (?, ?, ?, ?)",
-                (self.current_user_id, topic_id, goal_text, target_date)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO goals (user_id, topic_id, goal_text, target_date) VALUES (?, ?, ?, ?)",
+                    (self.current_user_id, topic_id, goal_text, target_date)
+                )
+                self.log_activity("add_goal")
             
-            self.log_activity("add_goal")
             return True, "Goal added successfully!"
         except Exception as e:
             return False, f"Error: {str(e)}"
@@ -368,30 +497,45 @@ class EnhancedAppLogic:
         if not self.current_user_id:
             return []
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT g.goal_id, g.goal_text, g.target_date, g.is_completed, s.topic_name
-            FROM goals g
-            LEFT JOIN subtopics s ON g.topic_id = s.topic_id
-            WHERE g.user_id = ?
-            ORDER BY g.is_completed, g.target_date
-        ''', (self.current_user_id,))
+        with self.db.connection() as conn:
+            results = conn.execute('''
+                SELECT g.goal_id, g.goal_text, g.target_date, g.is_completed, s.topic_name
+                FROM goals g
+                LEFT JOIN subtopics s ON g.topic_id = s.topic_id
+                WHERE g.user_id = ?
+                ORDER BY g.is_completed, g.target_date
+            ''', (self.current_user_id,)).fetchall()
         
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [
-            {
-                'goal_id': r[0],
-                'goal_text': r[1],
-                'target_date': r[2],
-                'is_completed': bool(r[3]),
-                'topic_name': r[4] or 'General'
-            }
-            for r in results
-        ]
+        return [self._goal_from_row(r) for r in results]
+    
+    def get_user_goals_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Get one page of goals for current user"""
+        if not self.current_user_id:
+            return page_result([], None)
+        
+        with self.db.connection() as conn:
+            results, next_cursor = fetch_page(conn, 'goals', '''
+                SELECT g.goal_id, g.goal_text, g.target_date, g.is_completed, s.topic_name
+                FROM goals g
+                LEFT JOIN subtopics s ON g.topic_id = s.topic_id
+                WHERE g.user_id = ?
+            ''', (self.current_user_id,), (
+                SortKey('g.is_completed', 'is_completed'),
+                SortKey('g.target_date', 'target_date', nullable=True),
+                SortKey('g.goal_id', 'goal_id')
+            ), limit, cursor)
+        
+        return page_result([self._goal_from_row(r) for r in results], next_cursor)
+    
+    @staticmethod
+    def _goal_from_row(r):
+        return {
+            'goal_id': r[0],
+            'goal_text': r[1],
+            'target_date': r[2],
+            'is_completed': bool(r[3]),
+            'topic_name': r[4] or 'General'
+        }
     
     def toggle_goal(self, goal_id):
         """Toggle goal completion status"""
@@ -399,18 +543,13 @@ class EnhancedAppLogic:
             return False, "Not logged in"
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "UPDATE goals SET is_completed = NOT is_completed WHERE goal_id = ? AND user_id = ?",
-                (goal_id, self.current_user_id)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "UPDATE goals SET is_completed = NOT is_completed WHERE goal_id = ? AND user_id = ?",
+                    (goal_id, self.current_user_id)
+                )
+                self.log_activity("toggle_goal")
             
-            self.log_activity("toggle_goal")
             return True, "Goal status updated!"
         except Exception as e:
             return False, f"Error: {str(e)}"
@@ -426,18 +565,13 @@ class EnhancedAppLogic:
             return False, "Note text is required"
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "INSERT INTO notes (user_id, topic_id, note_text) VALUES (?, ?, ?)",
-                (self.current_user_id, topic_id, note_text)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO notes (user_id, topic_id, note_text) VALUES (?, ?, ?)",
+                    (self.current_user_id, topic_id, note_text)
+                )
+                self.log_activity("add_note")
             
-            self.log_activity("add_note")
             return True, "Note added successfully!"
         except Exception as e:
             return False, f"Error: {str(e)}"
@@ -447,29 +581,43 @@ class EnhancedAppLogic:
         if not self.current_user_id:
             return []
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.db.connection() as conn:
+            results = conn.execute('''
+                SELECT n.note_id, n.note_text, n.created_at, s.topic_name
+                FROM notes n
+                LEFT JOIN subtopics s ON n.topic_id = s.topic_id
+                WHERE n.user_id = ?
+                ORDER BY n.created_at DESC
+            ''', (self.current_user_id,)).fetchall()
         
-        cursor.execute('''
-            SELECT n.note_id, n.note_text, n.created_at, s.topic_name
-            FROM notes n
-            LEFT JOIN subtopics s ON n.topic_id = s.topic_id
-            WHERE n.user_id = ?
-            ORDER BY n.created_at DESC
-        ''', (self.current_user_id,))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [
-            {
-                'note_id': r[0],
-                'note_text': r[1],
-                'created_at': r[2],
-                'topic_name': r[3] or 'General'
-            }
-            for r in results
-        ]
+        return [self._note_from_row(r) for r in results]
+    
+    def get_user_notes_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Get one page of notes for current user, newest first"""
+        if not self.current_user_id:
+            return page_result([], None)
+        
+        with self.db.connection() as conn:
+            results, next_cursor = fetch_page(conn, 'notes', '''
+                SELECT n.note_id, n.note_text, n.created_at, s.topic_name
+                FROM notes n
+                LEFT JOIN subtopics s ON n.topic_id = s.topic_id
+                WHERE n.user_id = ?
+            ''', (self.current_user_id,), (
+                SortKey('n.created_at', 'created_at', descending=True),
+                SortKey('n.note_id', 'note_id', descending=True)
+            ), limit, cursor)
+        
+        return page_result([self._note_from_row(r) for r in results], next_cursor)
+    
+    @staticmethod
+    def _note_from_row(r):
+        return {
+            'note_id': r[0],
+            'note_text': r[1],
+            'created_at': r[2],
+            'topic_name': r[3] or 'General'
+        }
     
     def delete_note(self, note_id):
         """Delete a note"""
@@ -477,16 +625,11 @@ class EnhancedAppLogic:
             return False, "Not logged in"
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "DELETE FROM notes WHERE note_id = ? AND user_id = ?",
-                (note_id, self.current_user_id)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "DELETE FROM notes WHERE note_id = ? AND user_id = ?",
+                    (note_id, self.current_user_id)
+                )
             
             return True, "Note deleted!"
         except Exception as e:
@@ -512,18 +655,13 @@ class EnhancedAppLogic:
             due_date = None
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "INSERT INTO tasks (user_id, task_text, due_date, priority) VALUES (?, ?, ?, ?)",
-                (self.current_user_id, task_text, due_date, priority)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO tasks (user_id, task_text, due_date, priority) VALUES (?, ?, ?, ?)",
+                    (self.current_user_id, task_text, due_date, priority)
+                )
+                self.log_activity("add_task")
             
-            self.log_activity("add_task")
             return True, "Task added successfully!"
         except Exception as e:
             return False, f"Error: {str(e)}"
@@ -533,9 +671,6 @@ class EnhancedAppLogic:
         if not self.current_user_id:
             return []
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         query = '''
             SELECT task_id, task_text, due_date, priority, is_completed
             FROM tasks
@@ -547,21 +682,43 @@ class EnhancedAppLogic:
         
         query += " ORDER BY is_completed, due_date"
         
-        cursor.execute(query, (self.current_user_id,))
+        with self.db.connection() as conn:
+            results = conn.execute(query, (self.current_user_id,)).fetchall()
         
-        results = cursor.fetchall()
-        conn.close()
+        return [self._task_from_row(r) for r in results]
+    
+    def get_tasks_page(self, include_completed=False, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Get one page of tasks for current user"""
+        if not self.current_user_id:
+            return page_result([], None)
         
-        return [
-            {
-                'task_id': r[0],
-                'task_text': r[1],
-                'due_date': r[2],
-                'priority': r[3],
-                'is_completed': bool(r[4])
-            }
-            for r in results
-        ]
+        query = '''
+            SELECT task_id, task_text, due_date, priority, is_completed
+            FROM tasks
+            WHERE user_id = ?
+        '''
+        
+        if not include_completed:
+            query += " AND is_completed = 0"
+        
+        with self.db.connection() as conn:
+            results, next_cursor = fetch_page(conn, 'tasks', query, (self.current_user_id,), (
+                SortKey('is_completed', 'is_completed'),
+                SortKey('due_date', 'due_date', nullable=True),
+                SortKey('task_id', 'task_id')
+            ), limit, cursor)
+        
+        return page_result([self._task_from_row(r) for r in results], next_cursor)
+    
+    @staticmethod
+    def _task_from_row(r):
+        return {
+            'task_id': r[0],
+            'task_text': r[1],
+            'due_date': r[2],
+            'priority': r[3],
+            'is_completed': bool(r[4])
+        }
     
     def toggle_task(self, task_id):
         """Toggle task completion status"""
@@ -569,18 +726,13 @@ class EnhancedAppLogic:
             return False, "Not logged in"
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "UPDATE tasks SET is_completed = NOT is_completed WHERE task_id = ? AND user_id = ?",
-                (task_id, self.current_user_id)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "UPDATE tasks SET is_completed = NOT is_completed WHERE task_id = ? AND user_id = ?",
+                    (task_id, self.current_user_id)
+                )
+                self.log_activity("toggle_task")
             
-            self.log_activity("toggle_task")
             return True, "Task status updated!"
         except Exception as e:
             return False, f"Error: {str(e)}"
@@ -591,16 +743,11 @@ class EnhancedAppLogic:
             return False, "Not logged in"
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "DELETE FROM tasks WHERE task_id = ? AND user_id = ?",
-                (task_id, self.current_user_id)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "DELETE FROM tasks WHERE task_id = ? AND user_id = ?",
+                    (task_id, self.current_user_id)
+                )
             
             return True, "Task deleted!"
         except Exception as e:
@@ -608,8 +755,16 @@ class EnhancedAppLogic:
     
     # ========== EXAMS ==========
     
-    def start_exam(self, topic_id, question_count=20, difficulty='medium'):
-        """Generate and start an exam"""
+    def start_exam(self, topic_id, question_count=20, difficulty='medium', on_question=None, fresh=None):
+        """Generate and start an exam.
+        
+        Questions are saved as they are generated; ``on_question(exam_id,
+        position, question)`` is called after each one is stored, so callers
+        can show progress before generation finishes. ``fresh`` bypasses the
+        AI response cache; by default it does so for retakes, i.e. when the
+        user already has an exam on this topic, so a retake gets new
+        questions rather than the cached set.
+        """
         if not self.current_user_id:
             return False, "Not logged in", None
         
@@ -620,50 +775,94 @@ class EnhancedAppLogic:
         if not topic:
             return False, "Topic not found", None
         
-        # Generate questions with AI
-        print(f"🔍 Generating {question_count} questions for {topic['topic_name']}...")
-        questions = self.generate_exam_questions(
-            topic['topic_name'],
-            topic['subject'],
-            question_count,
-            difficulty
-        )
-        
-        if not questions:
-            return False, "Failed to generate questions", None
-        
+        exam_id = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self.db.transaction() as conn:
+                if fresh is None:
+                    fresh = conn.execute(
+                        "SELECT 1 FROM exams WHERE user_id = ? AND topic_id = ? LIMIT 1",
+                        (self.current_user_id, topic_id)
+                    ).fetchone() is not None
+                exam_id = conn.execute(
+                    "INSERT INTO exams (user_id, topic_id, total_questions) VALUES (?, ?, 0)",
+                    (self.current_user_id, topic_id)
+                ).lastrowid
+            
+            stored = []
+            
+            def persist(question):
+                with self.db.transaction() as conn:
+                    insert_questions(conn, exam_id, [question], first_position=len(stored))
+                stored.append(question)
+                if on_question:
+                    on_question(exam_id, len(stored) - 1, question)
             
-            cursor.execute(
-                "INSERT INTO exams (user_id, topic_id, total_questions, questions_data) VALUES (?, ?, ?, ?)",
-                (self.current_user_id, topic_id, len(questions), json.dumps(questions))
+            # Generate questions with AI
+            print(f"🔍 Generating {question_count} questions for {topic['topic_name']}...")
+            self.generate_exam_questions(
+                topic['topic_name'],
+                topic['subject'],
+                question_count,
+                difficulty,
+                on_question=persist,
+                fresh=fresh
             )
             
-            exam_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                if not stored:
+                    self._discard_exam(conn, exam_id)
+                    return False, "Failed to generate questions", None
+                conn.execute("UPDATE exams SET total_questions = ? WHERE exam_id = ?", (len(stored), exam_id))
+                self.log_activity("start_exam")
             
-            self.log_activity("start_exam")
             print(f"✅ Exam created with ID: {exam_id}")
             return True, "Exam generated successfully!", exam_id
         except Exception as e:
             print(f"❌ Error creating exam: {e}")
+            if exam_id is not None:
+                with self.db.transaction() as conn:
+                    self._discard_exam(conn, exam_id)
             return False, f"Error: {str(e)}", None
     
-    def generate_exam_questions(self, topic_name, subject, count, difficulty):
-        """Generate exam questions using AI (Ollama) or fallback generators"""
+    @staticmethod
+    def _discard_exam(conn, exam_id):
+        """Remove a partially generated exam"""
+        conn.execute("DELETE FROM exam_questions WHERE exam_id = ?", (exam_id,))
+        conn.execute("DELETE FROM exams WHERE exam_id = ?", (exam_id,))
+    
+    def generate_exam_questions(self, topic_name, subject, count, difficulty, on_question=None, fresh=False):
+        """Generate exam questions using AI (Ollama) or fallback generators.
+        
+        Ollama questions are streamed, so ``on_question`` sees each accepted
+        question as soon as it is produced; ``fresh`` skips cached Ollama
+        answers. Questions flagged by item analysis are set aside and
+        replaced from the next generator; they are only used if nothing
+        else fills the exam.
+        """
         print(f"📝 Attempting to generate {count} questions...")
+        sound, poor = [], []
+        
+        def accept(questions):
+            kept, flagged = [], []
+            self._screen_questions(questions, kept, flagged)
+            kept = kept[:count - len(sound)]
+            sound.extend(kept)
+            poor.extend(flagged)
+            if on_question:
+                for question in kept:
+                    on_question(question)
         
         # Try Ollama first (best quality)
         if self.ollama_available and self.ollama:
             try:
                 print("🤖 Using Ollama AI for question generation...")
-                questions = self.ollama.generate_exam(topic_name, subject, count, difficulty)
-                if questions and len(questions) >= count:
-                    print(f"✅ Ollama generated {len(questions)} questions")
-                    return questions[:count]
+                for question in self.ollama.generate_exam_stream(topic_name, subject, count, difficulty, fresh=fresh):
+                    accept([question])
+                    if len(sound) >= count:
+                        break
+                if len(sound) >= count:
+                    print(f"✅ Ollama generated {len(sound)} questions")
+                    return sound
             except Exception as e:
                 print(f"⚠️ Ollama generation failed: {e}")
         
@@ -671,16 +870,61 @@ class EnhancedAppLogic:
         if self.offline_exam_gen:
             try:
                 print("📋 Using offline template generator...")
-                questions = self.offline_exam_gen.generate_exam(topic_name, subject, count, difficulty)
-                if questions and len(questions) >= count:
-                    print(f"✅ Offline generator created {len(questions)} questions")
-                    return questions[:count]
+                questions = self.offline_exam_gen.generate_exam(topic_name, subject, count - len(sound), difficulty)
+                if questions:
+                    accept(questions)
+                    if len(sound) >= count:
+                        print(f"✅ Offline generator created {len(questions)} questions")
+                        return sound
             except Exception as e:
                 print(f"⚠️ Offline generator failed: {e}")
         
         # Final fallback
         print("⚠️ Using basic fallback generator...")
-        return self._generate_fallback_questions(topic_name, subject, count, difficulty)
+        accept(self._generate_fallback_questions(topic_name, subject, count - len(sound), difficulty))
+        filler = poor[:count - len(sound)]
+        if on_question:
+            for question in filler:
+                on_question(question)
+        return sound + filler
+    
+    def _screen_questions(self, questions, sound, poor):
+        """Sort generated questions into sound ones and ones item analysis flagged"""
+        try:
+            with self.db.connection() as conn:
+                flagged = flagged_item_keys(conn, [item_key(q) for q in questions])
+        except (sqlite3.Error, KeyError, TypeError):
+            flagged = set()
+        for question in questions:
+            (poor if flagged and item_key(question) in flagged else sound).append(question)
+    
+    def run_item_analysis(self):
+        """Recompute per-question statistics from all graded exams"""
+        try:
+            with self.db.transaction() as conn:
+                count = analyze_items(conn, EXAM_TAKEN_SCORE)
+            return True, f"Analyzed {count} questions", count
+        except Exception as e:
+            return False, f"Error: {str(e)}", 0
+    
+    def get_ai_cache_stats(self):
+        """Entries, size and hit/miss counts of the Ollama response cache"""
+        if not self.ollama or not self.ollama.cache:
+            return {}
+        try:
+            return self.ollama.cache.stats()
+        except sqlite3.Error:
+            return {}
+    
+    def clear_ai_cache(self):
+        """Forget every cached Ollama response"""
+        if not self.ollama or not self.ollama.cache:
+            return False, "No AI cache configured"
+        try:
+            self.ollama.cache.clear()
+            return True, "AI response cache cleared"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
     
     def _generate_fallback_questions(self, topic_name, subject, count, difficulty):
         """Fallback question generator with basic templates"""
@@ -755,89 +999,74 @@ class EnhancedAppLogic:
         if not self.current_user_id:
             return None
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT exam_id, questions_data FROM exams WHERE exam_id = ? AND user_id = ?",
-            (exam_id, self.current_user_id)
-        )
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
+        with self.db.connection() as conn:
+            result = conn.execute(
+                "SELECT exam_id FROM exams WHERE exam_id = ? AND user_id = ?",
+                (exam_id, self.current_user_id)
+            ).fetchone()
+            
+            if not result:
+                return None
+            
             return {
                 'exam_id': result[0],
-                'questions': json.loads(result[1])
+                'questions': load_questions(conn, exam_id, include_explanations=False)
             }
-        return None
     
     def submit_exam(self, exam_id, answers):
         """Submit exam answers and calculate score"""
         if not self.current_user_id:
             return False, "Not logged in", 0
         
-        exam = self.get_exam(exam_id)
-        if not exam:
-            return False, "Exam not found", 0
-        
-        # Calculate score
-        correct = 0
-        questions = exam['questions']
-        
-        for idx, question in enumerate(questions):
-            user_answer = answers.get(idx, '')
-            if user_answer == question['correct_answer']:
-                correct += 1
-        
-        score = (correct / len(questions)) * 100
-        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "UPDATE exams SET score = ?, user_answers = ? WHERE exam_id = ? AND user_id = ?",
-                (score, json.dumps(answers), exam_id, self.current_user_id)
-            )
-            
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as conn:
+                owned = conn.execute(
+                    "SELECT topic_id, score FROM exams WHERE exam_id = ? AND user_id = ?",
+                    (exam_id, self.current_user_id)
+                ).fetchone()
+                total = len(load_answer_key(conn, exam_id)) if owned else 0
+                if not total:
+                    return False, "Exam not found", 0
+                
+                # Grade against the answer key only
+                correct = record_answers(conn, exam_id, answers)
+                score = (correct / total) * 100
+                
+                conn.execute(
+                    "UPDATE exams SET score = ? WHERE exam_id = ? AND user_id = ?",
+                    (score, exam_id, self.current_user_id)
+                )
+                # Regrading must not count as another review of the same answers
+                if owned[1] is None:
+                    schedule_exam_answers(conn, self.current_user_id, owned[0], exam_id)
+                record_exam_score(
+                    conn, EXAM_TAKEN_SCORE, self.current_user_id, owned[0], score, owned[1] is not None
+                )
+                self.log_activity("complete_exam")
             
-            self.log_activity("complete_exam")
+            self.analytics_cache.invalidate(self.current_user_id)
             return True, "Exam submitted successfully!", score
         except Exception as e:
             return False, f"Error: {str(e)}", 0
     
     def validate_exam_answers(self, exam_id):
         """Get detailed results for an exam"""
-        exam = self.get_exam(exam_id)
-        if not exam:
-            return None
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT user_answers FROM exams WHERE exam_id = ? AND user_id = ?",
-            (exam_id, self.current_user_id)
-        )
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if not result or not result[0]:
-            return None
-        
-        user_answers = json.loads(result[0])
-        questions = exam['questions']
+        with self.db.connection() as conn:
+            result = conn.execute(
+                "SELECT score FROM exams WHERE exam_id = ? AND user_id = ?",
+                (exam_id, self.current_user_id)
+            ).fetchone()
+            
+            if not result or result[0] is None:
+                return None
+            
+            questions = load_questions(conn, exam_id, include_answers=True)
         
         details = []
         correct_count = 0
         
         for idx, question in enumerate(questions):
-            user_answer = user_answers.get(str(idx), 'Not answered')
+            user_answer = question['user_answer'] or 'Not answered'
             is_correct = user_answer == question['correct_answer']
             
             if is_correct:
@@ -864,87 +1093,243 @@ class EnhancedAppLogic:
         if not self.current_user_id:
             return []
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.db.connection() as conn:
+            results = conn.execute('''
+                SELECT e.exam_id, e.exam_date, e.score, e.total_questions, s.topic_name, s.subject
+                FROM exams e
+                LEFT JOIN subtopics s ON e.topic_id = s.topic_id
+                WHERE e.user_id = ? AND e.score IS NOT NULL
+                ORDER BY e.exam_date DESC
+            ''', (self.current_user_id,)).fetchall()
         
-        cursor.execute('''
-            SELECT e.exam_id, e.exam_date, e.score, e.total_questions, s.topic_name, s.subject
-            FROM exams e
-            LEFT JOIN subtopics s ON e.topic_id = s.topic_id
-            WHERE e.user_id = ? AND e.score IS NOT NULL
-            ORDER BY e.exam_date DESC
-        ''', (self.current_user_id,))
+        return [self._exam_from_row(r) for r in results]
+    
+    def get_exam_stats(self):
+        """Get cached exam count, average, best and recent scores for current user"""
+        if not self.current_user_id:
+            return empty_exam_stats()
         
-        results = cursor.fetchall()
-        conn.close()
+        with self.db.connection() as conn:
+            return read_exam_stats(conn, self.current_user_id)
+    
+    def get_exam_analytics(self, window=3):
+        """Get per-topic score trends and weak topics for current user"""
+        if not self.current_user_id:
+            return compute_exam_analytics([], window)
+        
+        user_id = self.current_user_id
+        
+        def compute():
+            with self.db.connection() as conn:
+                rows = conn.execute('''
+                    SELECT e.topic_id, s.topic_name, e.score
+                    FROM exams e
+                    LEFT JOIN subtopics s ON e.topic_id = s.topic_id
+                    WHERE e.user_id = ? AND e.score IS NOT NULL
+                    ORDER BY e.topic_id, e.exam_date, e.exam_id
+                ''', (user_id,)).fetchall()
+            return compute_exam_analytics(rows, window)
+        
+        return self.analytics_cache.get(user_id, window, compute)
+    
+    def get_exam_history_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Get one page of exam history for current user, newest first"""
+        if not self.current_user_id:
+            return page_result([], None)
+        
+        with self.db.connection() as conn:
+            results, next_cursor = fetch_page(conn, 'exam_history', '''
+                SELECT e.exam_id, e.exam_date, e.score, e.total_questions, s.topic_name, s.subject
+                FROM exams e
+                LEFT JOIN subtopics s ON e.topic_id = s.topic_id
+                WHERE e.user_id = ? AND e.score IS NOT NULL
+            ''', (self.current_user_id,), (
+                SortKey('e.exam_date', 'exam_date', descending=True),
+                SortKey('e.exam_id', 'exam_id', descending=True)
+            ), limit, cursor)
+        
+        return page_result([self._exam_from_row(r) for r in results], next_cursor)
+    
+    @staticmethod
+    def _exam_from_row(r):
+        return {
+            'exam_id': r[0],
+            'exam_date': r[1],
+            'score': r[2],
+            'total_questions': r[3],
+            'topic_name': r[4],
+            'subject': r[5]
+        }
+    
+    # ========== REVIEWS ==========
+    
+    def get_due_reviews(self, limit=DEFAULT_REVIEW_LIMIT):
+        """Get the most urgent review cards due today for current user"""
+        if not self.current_user_id:
+            return []
         
-        return [
-            {
-                'exam_id': r[0],
-                'exam_date': r[1],
-                'score': r[2],
-                'total_questions': r[3],
-                'topic_name': r[4],
-                'subject': r[5]
+        with self.db.connection() as conn:
+            return due_cards(conn, self.current_user_id, limit)
+    
+    def get_due_review_count(self):
+        """Count review cards due today for current user"""
+        if not self.current_user_id:
+            return 0
+        
+        with self.db.connection() as conn:
+            return due_count(conn, self.current_user_id)
+    
+    def submit_review(self, card_id, answer):
+        """Grade an answer to a review card and reschedule it"""
+        if not self.current_user_id:
+            return False, "Not logged in", None
+        
+        try:
+            with self.db.transaction() as conn:
+                row = conn.execute(
+                    "SELECT correct_answer FROM review_cards WHERE card_id = ? AND user_id = ?",
+                    (card_id, self.current_user_id)
+                ).fetchone()
+                if not row:
+                    return False, "Review card not found", None
+                
+                is_correct = answer == row[0]
+                due = review_card(
+                    conn, self.current_user_id, card_id, CORRECT_QUALITY if is_correct else INCORRECT_QUALITY
+                )
+                self.log_activity("review_card")
+            
+            return True, "Correct!" if is_correct else "Incorrect", {
+                'is_correct': is_correct,
+                'correct_answer': row[0],
+                'next_due': due
             }
-            for r in results
-        ]
+        except Exception as e:
+            return False, f"Error: {str(e)}", None
     
     # ========== STREAK ==========
     
     def get_current_streak(self):
         """Calculate current study streak"""
+        return self.get_streak_summary()['current_streak']
+    
+    def get_streak_summary(self):
+        """Get current and longest streak from the maintained streak row"""
         if not self.current_user_id:
-            return 0
+            return {'current_streak': 0, 'longest_streak': 0, 'last_active_date': None}
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT DISTINCT activity_date
-            FROM study_activity
-            WHERE user_id = ?
-            ORDER BY activity_date DESC
-        ''', (self.current_user_id,))
-        
-        dates = [r[0] for r in cursor.fetchall()]
-        conn.close()
-        
-        if not dates:
-            return 0
+        with self.db.connection() as conn:
+            return read_streak(conn, self.current_user_id)
+    
+    def get_streak_history(self):
+        """Get every streak run and monthly coverage for current user"""
+        if not self.current_user_id:
+            return {'runs': [], 'run_count': 0, 'longest_streak': 0, 'monthly_coverage': []}
         
-        streak = 0
-        today = date.today()
+        with self.db.connection() as conn:
+            return streak_history(conn, 'study_activity', self.current_user_id)
+    
+    def get_activity_heatmap(self, year=None):
+        """Get a render-ready activity heatmap for one year"""
+        year = year or date.today().year
+        if not self.current_user_id:
+            return empty_heatmap(year)
         
-        for i in range(len(dates)):
-            expected_date = (today - timedelta(days=i)).strftime('%Y-%m-%d')
-            if expected_date in dates:
-                streak += 1
-            else:
-                break
+        with self.db.connection() as conn:
+            return year_heatmap(conn, self.current_user_id, year)
+    
+    def get_recent_activity(self, days=30):
+        """Whether the user was active on each of the last ``days`` days, oldest first"""
+        end = date.today()
+        start = end - timedelta(days=days - 1)
+        if not self.current_user_id:
+            flags = [False] * days
+        else:
+            with self.db.connection() as conn:
+                flags = activity_flags(conn, self.current_user_id, start, end)
+        return [{'date': (start + timedelta(days=i)).isoformat(), 'active': f} for i, f in enumerate(flags)]
+    
+    def get_activity_rollups(self, period='day', since=None, activity_type=None):
+        """Get activity counts per day, week or month and type"""
+        if not self.current_user_id:
+            return []
         
-        return streak
+        with self.db.connection() as conn:
+            return read_rollups(conn, self.current_user_id, period, since, activity_type)
+    
+    def backfill_streaks(self):
+        """Recompute stored streaks for all users from study_activity"""
+        try:
+            with self.db.transaction() as conn:
+                count = backfill_streaks(conn, 'study_activity')
+            return True, f"Rebuilt streaks for {count} users"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
     
     def get_streak_data(self):
         """Get activity data for visualization"""
         if not self.current_user_id:
             return {}
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT activity_date, COUNT(*)
-            FROM study_activity
-            WHERE user_id = ?
-            GROUP BY activity_date
-        ''', (self.current_user_id,))
-        
-        results = cursor.fetchall()
-        conn.close()
+        with self.db.connection() as conn:
+            results = conn.execute('''
+                SELECT activity_date, COUNT(*)
+                FROM study_activity
+                WHERE user_id = ?
+                GROUP BY activity_date
+            ''', (self.current_user_id,)).fetchall()
         
         return {r[0]: r[1] for r in results}
     
+    # ========== BULK IMPORT ==========
+    
+    def _bulk_add(self, sql, rows, validate, activity_type, label):
+        """Insert many rows for the current user in a single transaction"""
+        if not self.current_user_id:
+            return False, "Not logged in", None
+        
+        try:
+            with self.db.transaction() as conn:
+                result = insert_rows(conn, sql, rows, validate, (self.current_user_id,))
+                added = sum(1 for i in result['ids'] if i is not None)
+                if added:
+                    self.log_activity(activity_type)
+            
+            message = f"Added {added} {label}"
+            if result['errors']:
+                message += f", {len(result['errors'])} rejected"
+            return True, message, result
+        except Exception as e:
+            return False, f"Error: {str(e)}", None
+    
+    def add_subtopics_bulk(self, topics):
+        """Add many topics at once, e.g. when importing a syllabus"""
+        return self._bulk_add(
+            "INSERT INTO subtopics (user_id, topic_name, subject) VALUES (?, ?, ?)",
+            topics, validate_subtopic, "add_topic", "topics"
+        )
+    
+    def add_goals_bulk(self, goals):
+        """Add many goals at once"""
+        return self._bulk_add(
+            "INSERT INTO goals (user_id, topic_id, goal_text, target_date) VALUES (?, ?, ?, ?)",
+            goals, validate_goal, "add_goal", "goals"
+        )
+    
+    def add_notes_bulk(self, notes):
+        """Add many notes at once"""
+        return self._bulk_add(
+            "INSERT INTO notes (user_id, topic_id, note_text) VALUES (?, ?, ?)",
+            notes, validate_note, "add_note", "notes"
+        )
+    
+    def add_tasks_bulk(self, tasks):
+        """Add many tasks at once"""
+        return self._bulk_add(
+            "INSERT INTO tasks (user_id, task_text, due_date, priority) VALUES (?, ?, ?, ?)",
+            tasks, validate_task, "add_task", "tasks"
+        )
+    
     # ========== CODE EXECUTION ==========
     
     def run_code(self, code, language='python', timeout=5):
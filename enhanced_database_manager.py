@@ -1,151 +1,246 @@
 import sqlite3
 import hashlib
 import json
-from datetime import date
-from typing import Optional, List, Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterable
+from db_pool import ConnectionPool
+from schema_migrations import Migration, ensure_schema
+from exam_store import (
+    EXAM_QUESTIONS_SCHEMA, insert_questions, load_questions, load_user_answers, record_answers,
+    migrate_exam_blobs, compress_question_payloads
+)
+from pagination import DEFAULT_PAGE_SIZE, SortKey, fetch_page, page_result
+from user_stats import EXAM_TAKEN_FLAG, user_stats_schema, rebuild_user_stats, check_user_stats, read_user_stats
+from streaks import STREAK_SCHEMA, record_active_day, read_streak, backfill_streaks, streak_history
+from activity_bitmap import (
+    ACTIVITY_BITMAP_SCHEMA, mark_active_day, activity_flags, year_heatmap, backfill_bitmaps
+)
+from activity_log import (
+    ACTIVITY_EVENTS_SCHEMA, ACTIVITY_EVENTS_INDEX, ACTIVITY_ROLLUPS_SCHEMA, record_event, read_rollups,
+    rebuild_rollups, import_legacy_activity
+)
+from exam_analytics import AnalyticsCache, compute_exam_analytics
+from progress_history import (
+    PROGRESS_HISTORY_SCHEMA, PROGRESS_HISTORY_INDEX, DEFAULT_MAX_POINTS, append_progress, seed_progress_history,
+    progress_series
+)
+from spaced_repetition import (
+    REVIEW_CARDS_SCHEMA, REVIEW_CARDS_INDEX, DEFAULT_REVIEW_LIMIT, CORRECT_QUALITY, INCORRECT_QUALITY,
+    schedule_exam_answers, review_card, due_cards, due_count, backfill_review_cards
+)
+from exam_stats import EXAM_STATS_SCHEMA, record_exam_score, rebuild_exam_stats, read_exam_stats
+from item_analysis import ITEM_STATS_SCHEMA, MIN_ATTEMPTS, analyze_items, read_item_stats
+from bulk_ops import (
+    insert_rows, validate_task, validate_note, validate_goal, validate_subtopic, validate_snippet
+)
+
+
+def _migrate_exam_blobs(conn):
+    migrate_exam_blobs(conn, 'questions')
+
+
+def _rebuild_user_stats(conn):
+    rebuild_user_stats(conn, EXAM_TAKEN_FLAG)
+
+
+def _backfill_streaks(conn):
+    backfill_streaks(conn, 'activity_streak')
+
+
+def _backfill_bitmaps(conn):
+    backfill_bitmaps(conn, 'activity_streak')
+
+
+def _import_activity_events(conn):
+    import_legacy_activity(conn, "SELECT user_id, 'activity', activity_date, activity_count FROM activity_streak")
+
+
+def _backfill_review_cards(conn):
+    backfill_review_cards(conn, EXAM_TAKEN_FLAG)
+
+
+def _rebuild_exam_stats(conn):
+    rebuild_exam_stats(conn, EXAM_TAKEN_FLAG)
+
+
+SCHEMA_MIGRATIONS = [
+    Migration(1, "Base tables", (
+        # Users
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+
+        # Subtopics
+        '''
+        CREATE TABLE IF NOT EXISTS subtopics (
+            topic_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_name TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            progress INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+        )
+        ''',
+
+        # Goals
+        '''
+        CREATE TABLE IF NOT EXISTS goals (
+            goal_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_id INTEGER,
+            goal_text TEXT NOT NULL,
+            is_completed INTEGER DEFAULT 0,
+            target_date DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
+            FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id) ON DELETE SET NULL
+        )
+        ''',
+
+        # Notes
+        '''
+        CREATE TABLE IF NOT EXISTS notes (
+            note_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_id INTEGER,
+            note_text TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
+            FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id) ON DELETE SET NULL
+        )
+        ''',
+
+        # Exams
+        '''
+        CREATE TABLE IF NOT EXISTS exams (
+            exam_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            topic_id INTEGER,
+            exam_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            questions TEXT NOT NULL,
+            user_answers TEXT,
+            score REAL,
+            total_questions INTEGER,
+            is_completed INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
+            FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id) ON DELETE SET NULL
+        )
+        ''',
+
+        # Tasks
+        '''
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            task_text TEXT NOT NULL,
+            is_completed INTEGER DEFAULT 0,
+            due_date DATE,
+            priority TEXT DEFAULT 'medium',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+        )
+        ''',
+
+        # Code Snippets
+        '''
+        CREATE TABLE IF NOT EXISTS code_snippets (
+            snippet_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            language TEXT NOT NULL,
+            code TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+        )
+        ''',
+
+        # Activity Streak
+        '''
+        CREATE TABLE IF NOT EXISTS activity_streak (
+            streak_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            activity_date DATE NOT NULL,
+            activity_count INTEGER DEFAULT 1,
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
+            UNIQUE(user_id, activity_date)
+        )
+        ''',
+
+        # Practice Attempts
+        '''
+        CREATE TABLE IF NOT EXISTS practice_attempts (
+            attempt_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            problem_id TEXT,
+            problem_title TEXT,
+            code TEXT,
+            language TEXT,
+            passed INTEGER,
+            total_questions INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+        )
+        '''
+    )),
+    Migration(2, "Indexes for per-user queries", (
+        "CREATE INDEX IF NOT EXISTS idx_subtopics_user ON subtopics (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_goals_user_status ON goals (user_id, is_completed, target_date)",
+        "CREATE INDEX IF NOT EXISTS idx_notes_user_created ON notes (user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_exams_user_status_date ON exams (user_id, is_completed, exam_date)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_status_due ON tasks (user_id, is_completed, due_date)",
+        "CREATE INDEX IF NOT EXISTS idx_snippets_user_created ON code_snippets (user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_practice_user_created ON practice_attempts (user_id, created_at)"
+    )),
+    Migration(3, "Normalized exam questions", (EXAM_QUESTIONS_SCHEMA,), _migrate_exam_blobs),
+    Migration(4, "Compressed exam question payloads", (), compress_question_payloads),
+    Migration(5, "Trigger-maintained user_stats", user_stats_schema(EXAM_TAKEN_FLAG), _rebuild_user_stats),
+    Migration(6, "Incremental streak tracking", (STREAK_SCHEMA,), _backfill_streaks),
+    Migration(7, "Per-year activity bitmaps", (ACTIVITY_BITMAP_SCHEMA,), _backfill_bitmaps),
+    Migration(8, "Typed activity events and rollups", (
+        ACTIVITY_EVENTS_SCHEMA, ACTIVITY_EVENTS_INDEX, ACTIVITY_ROLLUPS_SCHEMA
+    ), _import_activity_events),
+    Migration(9, "Topic progress history", (
+        PROGRESS_HISTORY_SCHEMA, PROGRESS_HISTORY_INDEX
+    ), seed_progress_history),
+    Migration(10, "Spaced repetition review cards", (
+        REVIEW_CARDS_SCHEMA, REVIEW_CARDS_INDEX
+    ), _backfill_review_cards),
+    Migration(11, "Persisted per-user exam score stats", (EXAM_STATS_SCHEMA,), _rebuild_exam_stats),
+    Migration(12, "Per-question item analysis results", (ITEM_STATS_SCHEMA,)),
+]
+
 
 class EnhancedDatabaseManager:
-    def __init__(self, db_name: str = "tracker.db"):
+    def __init__(self, db_name: str = "tracker.db", pool_size: int = 5):
         self.db_name = db_name
+        self.pool = ConnectionPool(db_name, size=pool_size, row_factory=sqlite3.Row)
+        self.analytics_cache = AnalyticsCache()
         self.init_database()
     
     def get_connection(self):
-        """Get database connection with Row factory"""
+        """Get a standalone (unpooled) connection with Row factory"""
         conn = sqlite3.connect(self.db_name)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON")
         return conn
     
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
+    
     def init_database(self):
-        """Initialize all database tables"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Users
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Subtopics
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS subtopics (
-                    topic_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    topic_name TEXT NOT NULL,
-                    subject TEXT NOT NULL,
-                    progress INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Goals
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS goals (
-                    goal_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    topic_id INTEGER,
-                    goal_text TEXT NOT NULL,
-                    is_completed INTEGER DEFAULT 0,
-                    target_date DATE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
-                    FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id) ON DELETE SET NULL
-                )
-            ''')
-            
-            # Notes
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS notes (
-                    note_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    topic_id INTEGER,
-                    note_text TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
-                    FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id) ON DELETE SET NULL
-                )
-            ''')
-            
-            # Exams
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS exams (
-                    exam_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    topic_id INTEGER,
-                    exam_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    questions TEXT NOT NULL,
-                    user_answers TEXT,
-                    score REAL,
-                    total_questions INTEGER,
-                    is_completed INTEGER DEFAULT 0,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
-                    FOREIGN KEY (topic_id) REFERENCES subtopics (topic_id) ON DELETE SET NULL
-                )
-            ''')
-            
-            # Tasks
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tasks (
-                    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    task_text TEXT NOT NULL,
-                    is_completed INTEGER DEFAULT 0,
-                    due_date DATE,
-                    priority TEXT DEFAULT 'medium',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    completed_at TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Code Snippets
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS code_snippets (
-                    snippet_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    title TEXT NOT NULL,
-                    language TEXT NOT NULL,
-                    code TEXT NOT NULL,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Activity Streak
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS activity_streak (
-                    streak_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    activity_date DATE NOT NULL,
-                    activity_count INTEGER DEFAULT 1,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
-                    UNIQUE(user_id, activity_date)
-                )
-            ''')
-            
-            # Practice Attempts
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS practice_attempts (
-                    attempt_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    problem_id TEXT,
-                    problem_title TEXT,
-                    code TEXT,
-                    language TEXT,
-                    passed INTEGER,
-                    total_questions INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
-                )
-            ''')
+        """Create or upgrade all tables; a single read when already current"""
+        with self.pool.connection() as conn:
+            ensure_schema(conn, SCHEMA_MIGRATIONS)
     
     def hash_password(self, password: str) -> str:
         """Hash password using SHA-256"""
@@ -156,7 +251,7 @@ class EnhancedDatabaseManager:
     def create_user(self, username: str, password: str, email: str) -> bool:
         """Create a new user"""
         password_hash = self.hash_password(password)
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO users (username, password_hash, email) VALUES (?, ?, ?)",
@@ -166,7 +261,7 @@ class EnhancedDatabaseManager:
     
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT user_id, username, password_hash, email FROM users WHERE username = ?",
@@ -179,44 +274,50 @@ class EnhancedDatabaseManager:
     
     def create_exam(self, user_id: int, topic_id: int, questions: List[Dict]) -> int:
         """Create a new exam"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO exams (user_id, topic_id, questions, total_questions) VALUES (?, ?, ?, ?)",
-                (user_id, topic_id, json.dumps(questions), len(questions))
+                "INSERT INTO exams (user_id, topic_id, questions, total_questions) VALUES (?, ?, '[]', ?)",
+                (user_id, topic_id, len(questions))
             )
-            return cursor.lastrowid
+            exam_id = cursor.lastrowid
+            insert_questions(conn, exam_id, questions)
+            return exam_id
     
     def submit_exam(self, exam_id: int, user_answers: Dict[int, str]) -> bool:
         """Submit exam and calculate score"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             
-            cursor.execute("SELECT questions, total_questions FROM exams WHERE exam_id = ?", (exam_id,))
+            cursor.execute(
+                "SELECT user_id, topic_id, total_questions, is_completed FROM exams WHERE exam_id = ?", (exam_id,)
+            )
             result = cursor.fetchone()
             
             if not result:
                 raise ValueError("Exam not found")
             
-            questions = json.loads(result['questions'])
             total = result['total_questions']
-            
-            correct = sum(
-                1 for idx, answer in user_answers.items()
-                if 0 <= int(idx) < len(questions) and questions[int(idx)].get('correct_answer') == answer
-            )
+            correct = record_answers(conn, exam_id, user_answers)
             
             score = (correct / total * 100) if total > 0 else 0
             
             cursor.execute(
-                "UPDATE exams SET user_answers = ?, score = ?, is_completed = 1 WHERE exam_id = ?",
-                (json.dumps(user_answers), score, exam_id)
+                "UPDATE exams SET score = ?, is_completed = 1 WHERE exam_id = ?",
+                (score, exam_id)
+            )
+            # Regrading must not count as another review of the same answers
+            if not result['is_completed']:
+                schedule_exam_answers(conn, result['user_id'], result['topic_id'], exam_id)
+            record_exam_score(
+                conn, EXAM_TAKEN_FLAG, result['user_id'], result['topic_id'], score, bool(result['is_completed'])
             )
+        self.analytics_cache.invalidate(result['user_id'])
         return True
     
     def get_exam_history(self, user_id: int) -> List[Dict[str, Any]]:
         """Get completed exams for user"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT e.exam_id, e.exam_date, e.score, e.total_questions, s.topic_name, s.subject
@@ -227,26 +328,96 @@ class EnhancedDatabaseManager:
             ''', (user_id,))
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_exam_history_page(self, user_id: int, limit: int = DEFAULT_PAGE_SIZE,
+                              cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of completed exams, newest first"""
+        with self.pool.connection() as conn:
+            rows, next_cursor = fetch_page(conn, 'exam_history', '''
+                SELECT e.exam_id, e.exam_date, e.score, e.total_questions, s.topic_name, s.subject
+                FROM exams e
+                LEFT JOIN subtopics s ON e.topic_id = s.topic_id
+                WHERE e.user_id = ? AND e.is_completed = 1
+            ''', (user_id,), (
+                SortKey('e.exam_date', 'exam_date', descending=True),
+                SortKey('e.exam_id', 'exam_id', descending=True)
+            ), limit, cursor)
+        return page_result([dict(row) for row in rows], next_cursor)
+    
+    def get_exam_stats(self, user_id: int) -> Dict[str, Any]:
+        """Exam count, average, best and recent scores, overall and per subject"""
+        with self.pool.connection() as conn:
+            return read_exam_stats(conn, user_id)
+    
+    def rebuild_exam_stats(self, user_id: Optional[int] = None) -> int:
+        """Recompute cached exam stats from the exams table"""
+        with self.pool.transaction() as conn:
+            return rebuild_exam_stats(conn, EXAM_TAKEN_FLAG, user_id)
+    
+    def get_exam_analytics(self, user_id: int, window: int = 3) -> Dict[str, Any]:
+        """Per-topic moving averages, slopes, quartiles and weak-topic ranking"""
+        def compute():
+            with self.pool.connection() as conn:
+                rows = conn.execute('''
+                    SELECT e.topic_id, s.topic_name, e.score
+                    FROM exams e
+                    LEFT JOIN subtopics s ON e.topic_id = s.topic_id
+                    WHERE e.user_id = ? AND e.is_completed = 1
+                    ORDER BY e.topic_id, e.exam_date, e.exam_id
+                ''', (user_id,)).fetchall()
+            return compute_exam_analytics([tuple(r) for r in rows], window)
+        
+        return self.analytics_cache.get(user_id, window, compute)
+    
     def get_exam_by_id(self, exam_id: int) -> Optional[Dict[str, Any]]:
         """Get exam details"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM exams WHERE exam_id = ?", (exam_id,))
             result = cursor.fetchone()
-        
-        if not result:
-            return None
-        
-        exam = dict(result)
-        exam['questions'] = json.loads(exam['questions'])
-        exam['user_answers'] = json.loads(exam.get('user_answers') or '{}')
+            
+            if not result:
+                return None
+            
+            exam = dict(result)
+            exam['questions'] = load_questions(conn, exam_id)
+            exam['user_answers'] = load_user_answers(conn, exam_id)
         return exam
     
+    def run_item_analysis(self, min_attempts: int = MIN_ATTEMPTS) -> int:
+        """Recompute per-question difficulty, discrimination and distractor stats"""
+        with self.pool.transaction() as conn:
+            return analyze_items(conn, EXAM_TAKEN_FLAG, min_attempts)
+    
+    def get_item_stats(self, flagged_only: bool = False) -> List[Dict[str, Any]]:
+        """Get the results of the last item analysis run"""
+        with self.pool.connection() as conn:
+            return read_item_stats(conn, flagged_only)
+    
+    # ==================== REVIEW OPERATIONS ====================
+    
+    def get_due_reviews(self, user_id: int, limit: int = DEFAULT_REVIEW_LIMIT) -> List[Dict[str, Any]]:
+        """Get the most urgent spaced-repetition cards due today"""
+        with self.pool.connection() as conn:
+            return due_cards(conn, user_id, limit)
+    
+    def get_due_review_count(self, user_id: int) -> int:
+        """Count review cards due today"""
+        with self.pool.connection() as conn:
+            return due_count(conn, user_id)
+    
+    def review_card(self, user_id: int, card_id: int, quality: int) -> str:
+        """Grade a review (0-5, SM-2 scale) and return the card's next due date"""
+        with self.pool.transaction() as conn:
+            due = review_card(conn, user_id, card_id, quality)
+        if due is None:
+            raise ValueError("Review card not found")
+        return due
+    
     # ==================== TASK OPERATIONS ====================
     
     def add_task(self, user_id: int, task_text: str, due_date: str = None, priority: str = 'medium') -> bool:
         """Add a task"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO tasks (user_id, task_text, due_date, priority) VALUES (?, ?, ?, ?)",
@@ -256,18 +427,33 @@ class EnhancedDatabaseManager:
     
     def get_tasks(self, user_id: int, include_completed: bool = True) -> List[Dict[str, Any]]:
         """Get tasks for user"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             query = "SELECT * FROM tasks WHERE user_id = ?"
             if not include_completed:
                 query += " AND is_completed = 0"
-            query += " ORDER BY due_date ASC, priority DESC, created_at DESC"
+            query += " ORDER BY due_date ASC, priority DESC, created_at DESC, task_id DESC"
             cursor.execute(query, (user_id,))
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_tasks_page(self, user_id: int, include_completed: bool = True, limit: int = DEFAULT_PAGE_SIZE,
+                       cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of tasks in get_tasks order"""
+        query = "SELECT * FROM tasks WHERE user_id = ?"
+        if not include_completed:
+            query += " AND is_completed = 0"
+        with self.pool.connection() as conn:
+            rows, next_cursor = fetch_page(conn, 'tasks', query, (user_id,), (
+                SortKey('due_date', 'due_date', nullable=True),
+                SortKey('priority', 'priority', descending=True, nullable=True),
+                SortKey('created_at', 'created_at', descending=True, nullable=True),
+                SortKey('task_id', 'task_id', descending=True)
+            ), limit, cursor)
+        return page_result([dict(row) for row in rows], next_cursor)
+    
     def toggle_task(self, task_id: int) -> bool:
         """Toggle task completion"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE tasks 
@@ -279,7 +465,7 @@ class EnhancedDatabaseManager:
     
     def delete_task(self, task_id: int) -> bool:
         """Delete a task"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
         return True
@@ -288,7 +474,7 @@ class EnhancedDatabaseManager:
     
     def save_snippet(self, user_id: int, title: str, language: str, code: str, description: str = None) -> bool:
         """Save code snippet"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO code_snippets (user_id, title, language, code, description) VALUES (?, ?, ?, ?, ?)",
@@ -298,7 +484,7 @@ class EnhancedDatabaseManager:
     
     def get_snippets(self, user_id: int, language: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get code snippets"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             if language:
                 cursor.execute(
@@ -312,31 +498,66 @@ class EnhancedDatabaseManager:
                 )
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_snippets_page(self, user_id: int, language: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                          cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of code snippets, newest first"""
+        query = "SELECT * FROM code_snippets WHERE user_id = ?"
+        params = [user_id]
+        if language:
+            query += " AND language = ?"
+            params.append(language)
+        with self.pool.connection() as conn:
+            rows, next_cursor = fetch_page(conn, 'snippets', query, params, (
+                SortKey('created_at', 'created_at', descending=True),
+                SortKey('snippet_id', 'snippet_id', descending=True)
+            ), limit, cursor)
+        return page_result([dict(row) for row in rows], next_cursor)
+    
     def delete_snippet(self, snippet_id: int) -> bool:
         """Delete code snippet"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM code_snippets WHERE snippet_id = ?", (snippet_id,))
         return True
     
+    # ==================== USER STATS ====================
+    
+    def get_user_stats(self, user_id: int) -> Dict[str, Any]:
+        """Get trigger-maintained counters for a user"""
+        with self.pool.connection() as conn:
+            return read_user_stats(conn, user_id)
+    
+    def rebuild_user_stats(self, user_id: Optional[int] = None) -> int:
+        """Recompute user_stats from the source tables"""
+        with self.pool.transaction() as conn:
+            return rebuild_user_stats(conn, EXAM_TAKEN_FLAG, user_id)
+    
+    def check_user_stats(self, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List user_stats counters that have drifted from the source tables"""
+        with self.pool.connection() as conn:
+            return check_user_stats(conn, EXAM_TAKEN_FLAG, user_id)
+    
     # ==================== STREAK OPERATIONS ====================
     
-    def update_streak(self, user_id: int) -> bool:
-        """Update activity streak"""
-        today = date.today().isoformat()
-        with self.get_connection() as conn:
+    def update_streak(self, user_id: int, activity_type: str = 'activity') -> bool:
+        """Update activity streak and record a typed activity event"""
+        today = date.today()
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO activity_streak (user_id, activity_date, activity_count) 
                 VALUES (?, ?, 1)
                 ON CONFLICT(user_id, activity_date) 
                 DO UPDATE SET activity_count = activity_count + 1
-            ''', (user_id, today))
+            ''', (user_id, today.isoformat()))
+            record_active_day(conn, user_id, today)
+            mark_active_day(conn, user_id, today)
+            record_event(conn, user_id, activity_type, today)
         return True
     
     def get_streak_data(self, user_id: int, days: int = 365) -> Dict[str, int]:
         """Get streak data"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT activity_date, activity_count 
@@ -348,39 +569,53 @@ class EnhancedDatabaseManager:
             return {row['activity_date']: row['activity_count'] for row in cursor.fetchall()}
     
     def get_current_streak(self, user_id: int) -> int:
-        """Calculate consecutive streak"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT activity_date FROM activity_streak 
-                WHERE user_id = ? 
-                ORDER BY activity_date DESC
-            ''', (user_id,))
-            results = cursor.fetchall()
-        
-        if not results:
-            return 0
-        
-        streak = 0
-        current_date = date.today()
-        
-        for row in results:
-            activity_date = date.fromisoformat(row['activity_date'])
-            days_diff = (current_date - activity_date).days
-            
-            if days_diff <= 1:
-                streak += 1
-                current_date = activity_date
-            else:
-                break
-        
-        return streak
+        """Consecutive active days ending today or yesterday"""
+        return self.get_streak_summary(user_id)['current_streak']
+    
+    def get_streak_summary(self, user_id: int) -> Dict[str, Any]:
+        """Current streak, longest streak and last active date from one row"""
+        with self.pool.connection() as conn:
+            return read_streak(conn, user_id, grace_days=1)
+    
+    def get_streak_history(self, user_id: int) -> Dict[str, Any]:
+        """All streak runs, longest streak, run count and monthly coverage"""
+        with self.pool.connection() as conn:
+            return streak_history(conn, 'activity_streak', user_id)
+    
+    def get_activity_heatmap(self, user_id: int, year: Optional[int] = None) -> Dict[str, Any]:
+        """Week-by-week activity grid for one year, read from a single bitmap"""
+        with self.pool.connection() as conn:
+            return year_heatmap(conn, user_id, year or date.today().year)
+    
+    def get_recent_activity(self, user_id: int, days: int = 30) -> List[Dict[str, Any]]:
+        """Whether the user was active on each of the last ``days`` days, oldest first"""
+        end = date.today()
+        start = end - timedelta(days=days - 1)
+        with self.pool.connection() as conn:
+            flags = activity_flags(conn, user_id, start, end)
+        return [{'date': (start + timedelta(days=i)).isoformat(), 'active': f} for i, f in enumerate(flags)]
+    
+    def get_activity_rollups(self, user_id: int, period: str = 'day', since: Optional[date] = None,
+                             activity_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Activity counts per day, week or month and type, from the rollup table"""
+        with self.pool.connection() as conn:
+            return read_rollups(conn, user_id, period, since, activity_type)
+    
+    def rebuild_activity_rollups(self) -> int:
+        """Recompute activity rollups from the event log"""
+        with self.pool.transaction() as conn:
+            return rebuild_rollups(conn)
+    
+    def backfill_streaks(self) -> int:
+        """Recompute stored streaks from activity_streak"""
+        with self.pool.transaction() as conn:
+            return backfill_streaks(conn, 'activity_streak')
     
     # ==================== TOPIC/GOAL/NOTE OPERATIONS ====================
     
     def add_subtopic(self, user_id: int, topic_name: str, subject: str) -> bool:
         """Add subtopic"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO subtopics (user_id, topic_name, subject) VALUES (?, ?, ?)",
@@ -390,24 +625,35 @@ class EnhancedDatabaseManager:
     
     def get_subtopics_by_user(self, user_id: int) -> List[Dict[str, Any]]:
         """Get user subtopics"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM subtopics WHERE user_id = ?", (user_id,))
             return [dict(row) for row in cursor.fetchall()]
     
     def update_subtopic_progress(self, topic_id: int, new_progress: int) -> bool:
-        """Update subtopic progress"""
-        with self.get_connection() as conn:
+        """Update subtopic progress and append it to the progress history"""
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT progress FROM subtopics WHERE topic_id = ?", (topic_id,))
+            result = cursor.fetchone()
+            if not result:
+                return True
             cursor.execute(
                 "UPDATE subtopics SET progress = ? WHERE topic_id = ?",
                 (new_progress, topic_id)
             )
+            append_progress(conn, topic_id, result['progress'], new_progress)
         return True
     
+    def get_progress_history(self, topic_id: int, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             max_points: int = DEFAULT_MAX_POINTS) -> List[Dict[str, Any]]:
+        """Downsampled progress series of a topic for charting"""
+        with self.pool.connection() as conn:
+            return progress_series(conn, topic_id, since, until, max_points)
+    
     def add_goal(self, user_id: int, goal_text: str, topic_id: int = None, target_date: str = None) -> bool:
         """Add goal"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO goals (user_id, topic_id, goal_text, target_date) VALUES (?, ?, ?, ?)",
@@ -417,7 +663,7 @@ class EnhancedDatabaseManager:
     
     def get_goals_by_user(self, user_id: int) -> List[Dict[str, Any]]:
         """Get user goals"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT g.*, COALESCE(s.topic_name, 'General') as topic_name
@@ -427,9 +673,25 @@ class EnhancedDatabaseManager:
             ''', (user_id,))
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_goals_page(self, user_id: int, limit: int = DEFAULT_PAGE_SIZE,
+                       cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of goals, open ones first, then by target date"""
+        with self.pool.connection() as conn:
+            rows, next_cursor = fetch_page(conn, 'goals', '''
+                SELECT g.*, COALESCE(s.topic_name, 'General') as topic_name
+                FROM goals g 
+                LEFT JOIN subtopics s ON g.topic_id = s.topic_id 
+                WHERE g.user_id = ?
+            ''', (user_id,), (
+                SortKey('g.is_completed', 'is_completed'),
+                SortKey('g.target_date', 'target_date', nullable=True),
+                SortKey('g.goal_id', 'goal_id')
+            ), limit, cursor)
+        return page_result([dict(row) for row in rows], next_cursor)
+    
     def toggle_goal_completion(self, goal_id: int) -> bool:
         """Toggle goal completion"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "UPDATE goals SET is_completed = CASE WHEN is_completed = 1 THEN 0 ELSE 1 END WHERE goal_id = ?",
@@ -439,7 +701,7 @@ class EnhancedDatabaseManager:
     
     def add_note(self, user_id: int, note_text: str, topic_id: int = None) -> bool:
         """Add note"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO notes (user_id, topic_id, note_text) VALUES (?, ?, ?)",
@@ -449,7 +711,7 @@ class EnhancedDatabaseManager:
     
     def get_notes_by_user(self, user_id: int) -> List[Dict[str, Any]]:
         """Get user notes"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT n.*, COALESCE(s.topic_name, 'General') as topic_name
@@ -460,9 +722,24 @@ class EnhancedDatabaseManager:
             ''', (user_id,))
             return [dict(row) for row in cursor.fetchall()]
     
+    def get_notes_page(self, user_id: int, limit: int = DEFAULT_PAGE_SIZE,
+                       cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of notes, newest first"""
+        with self.pool.connection() as conn:
+            rows, next_cursor = fetch_page(conn, 'notes', '''
+                SELECT n.*, COALESCE(s.topic_name, 'General') as topic_name
+                FROM notes n 
+                LEFT JOIN subtopics s ON n.topic_id = s.topic_id 
+                WHERE n.user_id = ?
+            ''', (user_id,), (
+                SortKey('n.created_at', 'created_at', descending=True),
+                SortKey('n.note_id', 'note_id', descending=True)
+            ), limit, cursor)
+        return page_result([dict(row) for row in rows], next_cursor)
+    
     def delete_note(self, note_id: int) -> bool:
         """Delete note"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM notes WHERE note_id = ?", (note_id,))
         return True
@@ -472,7 +749,7 @@ class EnhancedDatabaseManager:
     def save_practice_attempt(self, user_id: int, problem_id: str, problem_title: str, 
                             code: str, language: str, passed: bool, total_questions: int) -> bool:
         """Save practice attempt"""
-        with self.get_connection() as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO practice_attempts 
@@ -483,7 +760,7 @@ class EnhancedDatabaseManager:
     
     def get_practice_attempts_for_user(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent practice attempts"""
-        with self.get_connection() as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT * FROM practice_attempts 
@@ -491,4 +768,51 @@ class EnhancedDatabaseManager:
                 ORDER BY created_at DESC 
                 LIMIT ?
             ''', (user_id, limit))
-            return [dict(r) for r in cursor.fetchall()]
\ No newline at end of file
+            return [dict(r) for r in cursor.fetchall()]
+    
+    # ==================== BULK OPERATIONS ====================
+    
+    def add_tasks_bulk(self, user_id: int, tasks: Iterable[Dict[str, Any]]) -> Dict[str, List]:
+        """Add many tasks in one transaction; returns ids and per-row errors"""
+        with self.pool.transaction() as conn:
+            return insert_rows(
+                conn,
+                "INSERT INTO tasks (user_id, task_text, due_date, priority) VALUES (?, ?, ?, ?)",
+                tasks, validate_task, (user_id,)
+            )
+    
+    def add_notes_bulk(self, user_id: int, notes: Iterable[Dict[str, Any]]) -> Dict[str, List]:
+        """Add many notes in one transaction; returns ids and per-row errors"""
+        with self.pool.transaction() as conn:
+            return insert_rows(
+                conn,
+                "INSERT INTO notes (user_id, topic_id, note_text) VALUES (?, ?, ?)",
+                notes, validate_note, (user_id,)
+            )
+    
+    def add_goals_bulk(self, user_id: int, goals: Iterable[Dict[str, Any]]) -> Dict[str, List]:
+        """Add many goals in one transaction; returns ids and per-row errors"""
+        with self.pool.transaction() as conn:
+            return insert_rows(
+                conn,
+                "INSERT INTO goals (user_id, topic_id, goal_text, target_date) VALUES (?, ?, ?, ?)",
+                goals, validate_goal, (user_id,)
+            )
+    
+    def add_subtopics_bulk(self, user_id: int, subtopics: Iterable[Dict[str, Any]]) -> Dict[str, List]:
+        """Add many subtopics in one transaction; returns ids and per-row errors"""
+        with self.pool.transaction() as conn:
+            return insert_rows(
+                conn,
+                "INSERT INTO subtopics (user_id, topic_name, subject) VALUES (?, ?, ?)",
+                subtopics, validate_subtopic, (user_id,)
+            )
+    
+    def save_snippets_bulk(self, user_id: int, snippets: Iterable[Dict[str, Any]]) -> Dict[str, List]:
+        """Save many code snippets in one transaction; returns ids and per-row errors"""
+        with self.pool.transaction() as conn:
+            return insert_rows(
+                conn,
+                "INSERT INTO code_snippets (user_id, title, language, code, description) VALUES (?, ?, ?, ?, ?)",
+                snippets, validate_snippet, (user_id,)
+            )
@@ -0,0 +1,162 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional; the pure Python path gives the same results
+    np = None
+
+PERCENTILES = (25, 50, 75)
+
+# Rows are (topic_id, topic_name, score), ordered by topic and then by exam
+# date so each topic's attempts are contiguous and chronological.
+ScoreRow = Tuple[Optional[int], Optional[str], float]
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile, matching numpy's default method"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100
+    lo = int(rank)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (rank - lo)
+
+
+def _groups(rows: Sequence[ScoreRow]) -> List[Tuple[Optional[int], str, int, int]]:
+    """(topic_id, topic_name, start, end) for each contiguous topic block"""
+    groups = []
+    for i, (topic_id, topic_name, _) in enumerate(rows):
+        if not groups or groups[-1][0] != topic_id:
+            groups.append([topic_id, topic_name or 'General', i, i])
+        groups[-1][3] = i + 1
+    return [tuple(g) for g in groups]
+
+
+def _python_stats(scores: List[float], groups, window: int) -> Dict[str, list]:
+    means, slopes, moving, percentiles = [], [], [], []
+    for _, _, start, end in groups:
+        block = scores[start:end]
+        n = len(block)
+        means.append(sum(block) / n)
+
+        x_mean = (n - 1) / 2
+        sxx = sum((x - x_mean) ** 2 for x in range(n))
+        slopes.append(
+            sum((x - x_mean) * (y - means[-1]) for x, y in enumerate(block)) / sxx if sxx else 0.0
+        )
+
+        running, series = 0.0, []
+        for i, y in enumerate(block):
+            running += y
+            if i >= window:
+                running -= block[i - window]
+            series.append(running / min(i + 1, window))
+        moving.append(series)
+
+        ordered = sorted(block)
+        percentiles.append([_percentile(ordered, q) for q in PERCENTILES])
+    return {'means': means, 'slopes': slopes, 'moving': moving, 'percentiles': percentiles}
+
+
+def _numpy_stats(scores: List[float], groups, window: int) -> Dict[str, list]:
+    values = np.asarray(scores, dtype=float)
+    counts = np.array([end - start for _, _, start, end in groups])
+    starts = np.array([start for _, _, start, _ in groups])
+    codes = np.repeat(np.arange(len(groups)), counts)
+    pos = np.arange(len(values)) - starts[codes]
+
+    # Per-topic sums give means and least-squares slopes in one pass
+    sy = np.bincount(codes, weights=values)
+    sx = np.bincount(codes, weights=pos)
+    sxy = np.bincount(codes, weights=pos * values)
+    sxx = np.bincount(codes, weights=pos * pos)
+    denom = counts * sxx - sx ** 2
+    slopes = np.where(denom > 0, (counts * sxy - sx * sy) / np.where(denom > 0, denom, 1), 0.0)
+
+    # Trailing window sums from one cumulative sum, clipped at topic starts
+    cumulative = np.cumsum(values)
+    index = np.arange(len(values))
+    lo = np.maximum(index - window, starts[codes] - 1)
+    before = np.where(lo >= 0, cumulative[np.maximum(lo, 0)], 0.0)
+    moving = (cumulative - before) / (index - lo)
+
+    return {
+        'means': (sy / counts).tolist(),
+        'slopes': slopes.tolist(),
+        'moving': [moving[start:end].tolist() for _, _, start, end in groups],
+        'percentiles': [np.percentile(values[start:end], PERCENTILES).tolist() for _, _, start, end in groups],
+    }
+
+
+def compute_exam_analytics(rows: Sequence[ScoreRow], window: int = 3, use_numpy: Optional[bool] = None) -> Dict[str, Any]:
+    """Per-topic trends for one user's completed exams.
+
+    Returns each topic's attempts, mean, latest score, trailing moving
+    average, improvement slope (points per attempt) and quartiles, plus
+    overall quartiles and ``weak_topics``: topic names ordered by recent
+    average and then slope, weakest first.
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    use_numpy = np is not None if use_numpy is None else use_numpy and np is not None
+
+    scores = [float(score or 0) for _, _, score in rows]
+    groups = _groups(rows)
+    stats = (_numpy_stats if use_numpy else _python_stats)(scores, groups, window) if groups else None
+
+    topics = []
+    for i, (topic_id, topic_name, start, end) in enumerate(groups):
+        topics.append({
+            'topic_id': topic_id,
+            'topic_name': topic_name,
+            'attempts': end - start,
+            'mean': stats['means'][i],
+            'latest': scores[end - 1],
+            'moving_average': stats['moving'][i],
+            'recent_average': stats['moving'][i][-1],
+            'slope': stats['slopes'][i],
+            'percentiles': dict(zip((f"p{q}" for q in PERCENTILES), stats['percentiles'][i]))
+        })
+
+    ordered = sorted(scores)
+    return {
+        'topics': topics,
+        'weak_topics': [t['topic_name'] for t in sorted(topics, key=lambda t: (t['recent_average'], t['slope']))],
+        'overall': {
+            'attempts': len(scores),
+            'mean': sum(scores) / len(scores) if scores else 0.0,
+            'percentiles': {f"p{q}": _percentile(ordered, q) for q in PERCENTILES}
+        },
+        'backend': 'numpy' if use_numpy else 'python'
+    }
+
+
+class AnalyticsCache:
+    """Per-user memo of computed analytics, dropped when a user's scores change"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[Any, Dict[Any, Any]] = {}
+        self._generation: Dict[Any, int] = {}
+
+    def get(self, user_id: Any, key: Any, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for (user, key), computing it on a miss"""
+        with self._lock:
+            cached = self._results.get(user_id, {})
+            if key in cached:
+                return cached[key]
+            generation = self._generation.get(user_id, 0)
+
+        value = compute()
+        with self._lock:
+            # Skip storing if the user's scores changed while computing
+            if self._generation.get(user_id, 0) == generation:
+                self._results.setdefault(user_id, {})[key] = value
+        return value
+
+    def invalidate(self, user_id: Any):
+        """Forget everything cached for a user"""
+        with self._lock:
+            self._results.pop(user_id, None)
+            self._generation[user_id] = self._generation.get(user_id, 0) + 1
@@ -0,0 +1,126 @@
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+RECENT_SCORES = 10
+ALL_SUBJECTS = ''
+
+# Running score totals per user: one row for all exams (subject = '') and one
+# per subject. recent_scores is a JSON list of the last RECENT_SCORES scores,
+# oldest first. submit_exam keeps the rows current, so reads never touch exams.
+EXAM_STATS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS exam_score_stats (
+        user_id INTEGER NOT NULL,
+        subject TEXT NOT NULL,
+        exam_count INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        best_score REAL,
+        recent_scores TEXT NOT NULL DEFAULT '[]',
+        PRIMARY KEY (user_id, subject)
+    ) WITHOUT ROWID
+'''
+
+
+def _subject(conn: sqlite3.Connection, topic_id: Optional[int]) -> str:
+    # A blank subject would collide with the ALL_SUBJECTS row
+    row = conn.execute("SELECT subject FROM subtopics WHERE topic_id = ?", (topic_id,)).fetchone()
+    return (row[0] if row else None) or 'General'
+
+
+def _add_score(conn: sqlite3.Connection, user_id: int, subject: str, score: float):
+    row = conn.execute(
+        "SELECT recent_scores FROM exam_score_stats WHERE user_id = ? AND subject = ?",
+        (user_id, subject)
+    ).fetchone()
+    recent = (json.loads(row[0]) if row else []) + [score]
+
+    conn.execute('''
+        INSERT INTO exam_score_stats (user_id, subject, exam_count, score_sum, best_score, recent_scores)
+        VALUES (?, ?, 1, ?, ?, ?)
+        ON CONFLICT(user_id, subject) DO UPDATE SET
+            exam_count = exam_count + 1,
+            score_sum = score_sum + excluded.score_sum,
+            best_score = MAX(COALESCE(best_score, excluded.best_score), excluded.best_score),
+            recent_scores = excluded.recent_scores
+    ''', (user_id, subject, score, score, json.dumps(recent[-RECENT_SCORES:])))
+
+
+def record_exam_score(conn: sqlite3.Connection, exam_taken: str, user_id: int, topic_id: Optional[int],
+                      score: float, resubmitted: bool = False):
+    """Fold one newly graded exam into the user's stats.
+
+    A resubmitted exam replaces an earlier score, which running totals cannot
+    undo, so that user's rows are rebuilt instead.
+    """
+    if resubmitted:
+        rebuild_exam_stats(conn, exam_taken, user_id)
+        return
+    score = float(score or 0)
+    for subject in (ALL_SUBJECTS, _subject(conn, topic_id)):
+        _add_score(conn, user_id, subject, score)
+
+
+def rebuild_exam_stats(conn: sqlite3.Connection, exam_taken: str, user_id: Optional[int] = None) -> int:
+    """Recompute exam_score_stats from exams, for one user or everyone; returns rows written.
+
+    ``exam_taken`` is a predicate template such as user_stats.EXAM_TAKEN_FLAG.
+    """
+    where = exam_taken.format(row='e')
+    params: List[Any] = []
+    if user_id is not None:
+        where += " AND e.user_id = ?"
+        params.append(user_id)
+        conn.execute("DELETE FROM exam_score_stats WHERE user_id = ?", (user_id,))
+    else:
+        conn.execute("DELETE FROM exam_score_stats")
+
+    stats: Dict[tuple, list] = {}
+    for uid, subject, score in conn.execute(f'''
+        SELECT e.user_id, COALESCE(NULLIF(s.subject, ''), 'General'), COALESCE(e.score, 0)
+        FROM exams e
+        LEFT JOIN subtopics s ON e.topic_id = s.topic_id
+        WHERE {where}
+        ORDER BY e.exam_date, e.exam_id
+    ''', params):
+        for key in ((uid, ALL_SUBJECTS), (uid, subject)):
+            count, total, best, recent = stats.get(key, (0, 0.0, None, []))
+            stats[key] = [count + 1, total + score, score if best is None else max(best, score), recent + [score]]
+
+    conn.executemany(
+        "INSERT INTO exam_score_stats (user_id, subject, exam_count, score_sum, best_score, recent_scores) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [key + (count, total, best, json.dumps(recent[-RECENT_SCORES:]))
+         for key, (count, total, best, recent) in stats.items()]
+    )
+    return len(stats)
+
+
+def _summary(count: int, total: float, best: Optional[float], recent: str) -> Dict[str, Any]:
+    return {
+        'exam_count': count,
+        'average_score': total / count if count else 0.0,
+        'best_score': best or 0.0,
+        'recent_scores': json.loads(recent)
+    }
+
+
+def empty_exam_stats() -> Dict[str, Any]:
+    """Stats of a user without graded exams"""
+    stats = _summary(0, 0.0, None, '[]')
+    stats['by_subject'] = {}
+    return stats
+
+
+def read_exam_stats(conn: sqlite3.Connection, user_id: int) -> Dict[str, Any]:
+    """Overall count, mean, best and recent scores plus the same per subject"""
+    stats = empty_exam_stats()
+    for subject, count, total, best, recent in conn.execute(
+        "SELECT subject, exam_count, score_sum, best_score, recent_scores FROM exam_score_stats "
+        "WHERE user_id = ? ORDER BY subject",
+        (user_id,)
+    ):
+        if subject == ALL_SUBJECTS:
+            stats.update(_summary(count, total, best, recent))
+        else:
+            stats['by_subject'][subject] = _summary(count, total, best, recent)
+    return stats
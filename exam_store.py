@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import zlib
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+# Payloads at least this long are stored zlib-compressed behind PAYLOAD_MAGIC;
+# shorter ones stay plain text, where the header would cost more than it saves.
+PAYLOAD_MAGIC = b'EQZ1'
+COMPRESS_MIN_BYTES = 256
+
+# One row per question, keyed by (exam_id, position). Grading reads only the
+# answer key and review reads one exam's rows, both via the primary key.
+# options and explanation hold encode_payload output, so either may be a BLOB.
+EXAM_QUESTIONS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS exam_questions (
+        exam_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        question TEXT NOT NULL,
+        options TEXT NOT NULL,
+        correct_answer TEXT NOT NULL,
+        explanation TEXT,
+        user_answer TEXT,
+        PRIMARY KEY (exam_id, position),
+        FOREIGN KEY (exam_id) REFERENCES exams (exam_id) ON DELETE CASCADE
+    ) WITHOUT ROWID
+'''
+
+
+def encode_payload(text: str) -> Union[str, bytes]:
+    """Compress a bulky column value when that makes it smaller"""
+    raw = text.encode('utf-8')
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return text
+    packed = PAYLOAD_MAGIC + zlib.compress(raw)
+    return packed if len(packed) < len(raw) else text
+
+
+def decode_payload(value: Union[str, bytes, None]) -> Optional[str]:
+    """Inverse of encode_payload; plain text passes through untouched"""
+    if isinstance(value, bytes):
+        if value.startswith(PAYLOAD_MAGIC):
+            return zlib.decompress(value[len(PAYLOAD_MAGIC):]).decode('utf-8')
+        return value.decode('utf-8')
+    return value
+
+
+def insert_questions(conn: sqlite3.Connection, exam_id: int, questions: List[Mapping[str, Any]],
+                     first_position: int = 0):
+    """Store an exam's questions as rows, numbered from ``first_position``"""
+    conn.executemany(
+        "INSERT INTO exam_questions (exam_id, position, question, options, correct_answer, explanation) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (exam_id, position, q['question'], encode_payload(json.dumps(q.get('options', []))),
+             q['correct_answer'], encode_payload(q.get('explanation') or ''))
+            for position, q in enumerate(questions, first_position)
+        ]
+    )
+
+
+def load_questions(conn: sqlite3.Connection, exam_id: int, include_answers: bool = False,
+                   include_explanations: bool = True) -> List[Dict[str, Any]]:
+    """Rebuild the question dicts of one exam in position order.
+
+    Explanations are only read and decompressed when ``include_explanations``
+    is set, so the exam-taking view skips the bulkiest column.
+    """
+    explanation = "explanation" if include_explanations else "NULL"
+    rows = conn.execute(
+        f"SELECT question, options, correct_answer, {explanation}, user_answer "
+        "FROM exam_questions WHERE exam_id = ? ORDER BY position",
+        (exam_id,)
+    ).fetchall()
+
+    questions = []
+    for r in rows:
+        question = {
+            'question': r[0],
+            'options': json.loads(decode_payload(r[1])),
+            'correct_answer': r[2]
+        }
+        if include_explanations:
+            question['explanation'] = decode_payload(r[3])
+        if include_answers:
+            question['user_answer'] = r[4]
+        questions.append(question)
+    return questions
+
+
+def load_answer_key(conn: sqlite3.Connection, exam_id: int) -> Dict[int, str]:
+    """Map position -> correct answer without touching question text"""
+    rows = conn.execute(
+        "SELECT position, correct_answer FROM exam_questions WHERE exam_id = ?",
+        (exam_id,)
+    ).fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
+def load_user_answers(conn: sqlite3.Connection, exam_id: int) -> Dict[str, str]:
+    """Submitted answers keyed by position as a string, like the old JSON blob"""
+    rows = conn.execute(
+        "SELECT position, user_answer FROM exam_questions WHERE exam_id = ? AND user_answer IS NOT NULL",
+        (exam_id,)
+    ).fetchall()
+    return {str(r[0]): r[1] for r in rows}
+
+
+def record_answers(conn: sqlite3.Connection, exam_id: int, answers: Mapping[Any, str]) -> int:
+    """Store submitted answers on their question rows; returns the number correct"""
+    key = load_answer_key(conn, exam_id)
+    graded = []
+    for idx, answer in answers.items():
+        try:
+            position = int(idx)
+        except (TypeError, ValueError):
+            continue
+        if position in key:
+            graded.append((answer, exam_id, position))
+
+    conn.execute("UPDATE exam_questions SET user_answer = NULL WHERE exam_id = ?", (exam_id,))
+    conn.executemany(
+        "UPDATE exam_questions SET user_answer = ? WHERE exam_id = ? AND position = ?",
+        graded
+    )
+    return sum(1 for answer, _, position in graded if key[position] == answer)
+
+
+def migrate_exam_blobs(conn: sqlite3.Connection, questions_column: str):
+    """Move JSON question/answer blobs from ``exams`` into ``exam_questions``.
+
+    Rows whose blob cannot be parsed are left as they are. Migrated rows keep
+    an empty placeholder so NOT NULL blob columns stay valid.
+    """
+    rows = conn.execute(
+        f"SELECT exam_id, {questions_column}, user_answers FROM exams "
+        f"WHERE {questions_column} IS NOT NULL AND {questions_column} NOT IN ('', '[]')"
+    ).fetchall()
+
+    for exam_id, questions_json, answers_json in rows:
+        try:
+            questions = json.loads(questions_json)
+            answers = json.loads(answers_json) if answers_json else {}
+            insert_questions(conn, exam_id, questions)
+        except (ValueError, TypeError, KeyError, sqlite3.IntegrityError):
+            continue
+        if answers:
+            record_answers(conn, exam_id, answers)
+        conn.execute(
+            f"UPDATE exams SET {questions_column} = '[]', user_answers = NULL WHERE exam_id = ?",
+            (exam_id,)
+        )
+
+
+def compress_question_payloads(conn: sqlite3.Connection):
+    """Rewrite stored options and explanations with encode_payload"""
+    rows = conn.execute(
+        "SELECT exam_id, position, options, explanation FROM exam_questions "
+        "WHERE (typeof(options) = 'text' AND length(CAST(options AS BLOB)) >= :min) "
+        "OR (typeof(explanation) = 'text' AND length(CAST(explanation AS BLOB)) >= :min)",
+        {'min': COMPRESS_MIN_BYTES}
+    ).fetchall()
+    conn.executemany(
+        "UPDATE exam_questions SET options = ?, explanation = ? WHERE exam_id = ? AND position = ?",
+        [
+            (encode_payload(decode_payload(options)),
+             encode_payload(decode_payload(explanation)) if explanation is not None else None,
+             exam_id, position)
+            for exam_id, position, options, explanation in rows
+        ]
+    )
@@ -0,0 +1,252 @@
+import argparse
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+try:
+    import numpy as np
+except ImportError:  # optional; the pure Python path gives the same results
+    np = None
+
+from exam_store import decode_payload
+from spaced_repetition import card_key
+from user_stats import detect_exam_taken
+
+BATCH_EXAMS = 500
+MIN_ATTEMPTS = 10
+# Items answered correctly by nearly everyone or nearly no one tell little
+# about the examinee; items whose correctness barely tracks the rest of the
+# exam (point-biserial below MIN_DISCRIMINATION) often have a wrong key.
+P_VALUE_RANGE = (0.2, 0.95)
+MIN_DISCRIMINATION = 0.1
+OMITTED = '(omitted)'
+
+# One row per distinct question (item_key, as spaced_repetition.card_key),
+# replaced wholesale by each analysis run. flags is a comma-separated list of
+# reasons, empty for items that look sound.
+ITEM_STATS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS item_stats (
+        item_key TEXT PRIMARY KEY,
+        question TEXT NOT NULL,
+        attempts INTEGER NOT NULL,
+        p_value REAL NOT NULL,
+        discrimination REAL NOT NULL,
+        option_frequencies TEXT NOT NULL,
+        flags TEXT NOT NULL DEFAULT '',
+        analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID
+'''
+
+
+def item_key(question: Dict[str, Any]) -> str:
+    """Identity of a generated question across exams"""
+    return card_key(question['question'], question.get('options', []))
+
+
+class _Accumulator:
+    """Running per-item sums for p-values and point-biserial correlations.
+
+    Each batch is an answer matrix in long form: parallel columns of item
+    index, correctness (0/1) and the examinee's rest score (share of the
+    exam's other items answered correctly).
+    """
+
+    def __init__(self, use_numpy: bool):
+        self.use_numpy = use_numpy
+        # Rows: attempts, sum y, sum x, sum x*x, sum x*y
+        self.sums = np.zeros((5, 0)) if use_numpy else [[] for _ in range(5)]
+
+    def add(self, items: List[int], correct: List[float], rest: List[float], size: int):
+        if self.use_numpy:
+            idx = np.asarray(items)
+            y = np.asarray(correct, dtype=float)
+            x = np.asarray(rest, dtype=float)
+            if self.sums.shape[1] < size:
+                self.sums = np.pad(self.sums, ((0, 0), (0, size - self.sums.shape[1])))
+            for row, weights in enumerate((None, y, x, x * x, x * y)):
+                self.sums[row] += np.bincount(idx, weights=weights, minlength=size)
+            return
+
+        for column in self.sums:
+            column.extend([0.0] * (size - len(column)))
+        n, sy, sx, sxx, sxy = self.sums
+        for i, yi, xi in zip(items, correct, rest):
+            n[i] += 1
+            sy[i] += yi
+            sx[i] += xi
+            sxx[i] += xi * xi
+            sxy[i] += xi * yi
+
+    def results(self) -> List[tuple]:
+        """(attempts, p_value, discrimination) per item index"""
+        if self.use_numpy:
+            n, sy, sx, sxx, sxy = self.sums
+            n = np.where(n > 0, n, 1)
+            p, x_mean = sy / n, sx / n
+            denom = np.sqrt(np.clip((sxx / n - x_mean ** 2) * p * (1 - p), 0, None))
+            ok = denom > 1e-12
+            r = np.where(ok, (sxy / n - x_mean * p) / np.where(ok, denom, 1), 0.0)
+            return list(zip(self.sums[0].astype(int).tolist(), p.tolist(), r.tolist()))
+
+        out = []
+        for n, sy, sx, sxx, sxy in zip(*self.sums):
+            p, x_mean = sy / n, sx / n
+            denom = max((sxx / n - x_mean ** 2) * p * (1 - p), 0.0) ** 0.5
+            out.append((int(n), p, (sxy / n - x_mean * p) / denom if denom > 1e-12 else 0.0))
+        return out
+
+
+def _flags(attempts: int, p_value: float, discrimination: float, min_attempts: int) -> str:
+    if attempts < min_attempts:
+        return ''
+    reasons = []
+    if p_value > P_VALUE_RANGE[1]:
+        reasons.append('too_easy')
+    if p_value < P_VALUE_RANGE[0]:
+        reasons.append('too_hard')
+    if discrimination < MIN_DISCRIMINATION:
+        reasons.append('low_discrimination')
+    return ','.join(reasons)
+
+
+def _exam_rows(conn: sqlite3.Connection, exam_taken: str) -> Iterable[list]:
+    """Yield the question rows of one graded exam at a time"""
+    cursor = conn.execute(f'''
+        SELECT q.exam_id, q.question, q.options, q.correct_answer, q.user_answer
+        FROM exams e JOIN exam_questions q ON q.exam_id = e.exam_id
+        WHERE {exam_taken.format(row='e')}
+        ORDER BY q.exam_id, q.position
+    ''')
+    exam: list = []
+    for row in cursor:
+        if exam and exam[0][0] != row[0]:
+            yield exam
+            exam = []
+        exam.append(row)
+    if exam:
+        yield exam
+
+
+def analyze_items(conn: sqlite3.Connection, exam_taken: str, min_attempts: int = MIN_ATTEMPTS,
+                  use_numpy: Optional[bool] = None) -> int:
+    """Recompute item_stats from every graded exam; returns items written.
+
+    Exams are streamed and folded in BATCH_EXAMS at a time, so memory grows
+    with the number of distinct items rather than with attempts.
+    ``exam_taken`` is a predicate template such as user_stats.EXAM_TAKEN_FLAG.
+    """
+    use_numpy = np is not None if use_numpy is None else use_numpy and np is not None
+    keys: Dict[str, int] = {}
+    questions: List[str] = []
+    option_counts: List[Dict[str, int]] = []
+    acc = _Accumulator(use_numpy)
+    batch: tuple = ([], [], [])
+    exams_in_batch = 0
+
+    for exam in _exam_rows(conn, exam_taken):
+        graded = []
+        for _, text, options_json, correct_answer, user_answer in exam:
+            options = json.loads(decode_payload(options_json))
+            key = card_key(text, options)
+            if key not in keys:
+                keys[key] = len(questions)
+                questions.append(text)
+                option_counts.append({})
+            index = keys[key]
+
+            position = ord(user_answer) - ord('A') if user_answer and len(user_answer) == 1 else -1
+            chosen = options[position] if 0 <= position < len(options) else OMITTED
+            option_counts[index][chosen] = option_counts[index].get(chosen, 0) + 1
+            graded.append((index, 1.0 if user_answer == correct_answer else 0.0))
+
+        total = sum(y for _, y in graded)
+        for index, y in graded:
+            batch[0].append(index)
+            batch[1].append(y)
+            batch[2].append((total - y) / (len(graded) - 1) if len(graded) > 1 else 0.0)
+
+        exams_in_batch += 1
+        if exams_in_batch == BATCH_EXAMS:
+            acc.add(*batch, len(questions))
+            batch, exams_in_batch = ([], [], []), 0
+    if batch[0]:
+        acc.add(*batch, len(questions))
+
+    results = acc.results()
+    rows = []
+    for key, index in keys.items():
+        attempts, p_value, discrimination = results[index]
+        rows.append((
+            key, questions[index], attempts, p_value, discrimination,
+            json.dumps({option: count / attempts for option, count in sorted(option_counts[index].items())}),
+            _flags(attempts, p_value, discrimination, min_attempts)
+        ))
+
+    conn.execute("DELETE FROM item_stats")
+    conn.executemany(
+        "INSERT INTO item_stats (item_key, question, attempts, p_value, discrimination, option_frequencies, flags) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows
+    )
+    return len(rows)
+
+
+def read_item_stats(conn: sqlite3.Connection, flagged_only: bool = False) -> List[Dict[str, Any]]:
+    """Stored item statistics, flagged items first and then by attempts"""
+    query = (
+        "SELECT item_key, question, attempts, p_value, discrimination, option_frequencies, flags, analyzed_at "
+        "FROM item_stats"
+    )
+    if flagged_only:
+        query += " WHERE flags != ''"
+    query += " ORDER BY flags = '', attempts DESC, item_key"
+    return [{
+        'item_key': r[0],
+        'question': r[1],
+        'attempts': r[2],
+        'p_value': r[3],
+        'discrimination': r[4],
+        'option_frequencies': json.loads(r[5]),
+        'flags': r[6].split(',') if r[6] else [],
+        'analyzed_at': r[7]
+    } for r in conn.execute(query)]
+
+
+def flagged_item_keys(conn: sqlite3.Connection, keys: Sequence[str]) -> Set[str]:
+    """The subset of ``keys`` that item analysis flagged as poor"""
+    keys = list(set(keys))
+    if not keys:
+        return set()
+    rows = conn.execute(
+        f"SELECT item_key FROM item_stats WHERE flags != '' AND item_key IN ({', '.join('?' * len(keys))})",
+        keys
+    ).fetchall()
+    return {r[0] for r in rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute per-question statistics from graded exams")
+    parser.add_argument('database', help="Path to tracker.db or study_tracker.db")
+    parser.add_argument('--min-attempts', type=int, default=MIN_ATTEMPTS,
+                        help="Attempts needed before an item can be flagged")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.database)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'item_stats'").fetchone():
+            print("item_stats table not found; open the database with the app once to migrate it")
+            return 2
+        with conn:
+            count = analyze_items(conn, detect_exam_taken(conn), args.min_attempts)
+        flagged = read_item_stats(conn, flagged_only=True)
+        for item in flagged:
+            print(f"{', '.join(item['flags'])}: p={item['p_value']:.2f} r={item['discrimination']:.2f} "
+                  f"n={item['attempts']}  {item['question']}")
+        print(f"Analyzed {count} items, {len(flagged)} flagged")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,6 +9,7 @@ db_path = ensure_persistent_db("study_tracker.db")
 class StudyTrackerApp:
     def __init__(self):
         self.app_logic = EnhancedAppLogic()
+        self.app_logic.start_health_probe()
         self.root = tk.Tk()
         self.root.title("Study Progress Tracker")
         self.root.geometry("900x700")
@@ -30,6 +31,7 @@ class StudyTrackerApp:
         }
         
         self.root.configure(bg=self.colors['bg_primary'])
+        self.tree_pages = {}
         self.style = ttk.Style()
         
         available_themes = self.style.theme_names()
@@ -232,8 +234,9 @@ class StudyTrackerApp:
         )
         progress_frame.pack(fill='x', padx=30, pady=20)
         
-        total_progress = self.app_logic.calculate_total_progress()
-        streak = self.app_logic.get_current_streak()
+        summary = self.app_logic.get_dashboard_summary()
+        total_progress = summary['average_progress']
+        streak = summary['current_streak']
         
         stats_top = tk.Frame(progress_frame, bg=self.colors['bg_secondary'])
         stats_top.pack(pady=15)
@@ -268,18 +271,11 @@ class StudyTrackerApp:
         stats_frame = tk.Frame(progress_frame, bg=self.colors['bg_secondary'])
         stats_frame.pack(pady=(0, 15))
         
-        topics = self.app_logic.get_user_subtopics()
-        goals = self.app_logic.get_user_goals()
-        notes = self.app_logic.get_user_notes()
-        exams = self.app_logic.get_exam_history()
-        tasks = self.app_logic.get_tasks(include_completed=False)
-        completed_goals = [g for g in goals if g['is_completed']]
-        
         stats = [
-            (len(topics), "Topics"),
-            (len(exams), "Exams Taken"),
-            (len(tasks), "Pending Tasks"),
-            (len(completed_goals), f"Goals Done")
+            (summary['topic_count'], "Topics"),
+            (summary['exams_taken'], "Exams Taken"),
+            (summary['pending_tasks'], "Pending Tasks"),
+            (summary['completed_goals'], f"Goals Done")
         ]
         
         for i, (value, label) in enumerate(stats):
@@ -338,6 +334,42 @@ class StudyTrackerApp:
             btn.config(width=15, height=2)
             btn.grid(row=i//4, column=i%4, padx=8, pady=8)
     
+    # ========== PAGED LISTS ==========
+    
+    def _load_tree_page(self, tree, fetch_page=None, insert_row=None):
+        """Fill a Treeview one page at a time.
+        
+        Passing ``fetch_page`` and ``insert_row`` clears the tree and loads the
+        first page; calling with the tree alone appends the next page.
+        """
+        key = str(tree)
+        if fetch_page is not None:
+            for item in tree.get_children():
+                tree.delete(item)
+            self.tree_pages[key] = {'fetch': fetch_page, 'insert': insert_row, 'cursor': None, 'pending': False}
+        
+        state = self.tree_pages.get(key)
+        if not state or not tree.winfo_exists():
+            return
+        if fetch_page is None and not state['cursor']:
+            return
+        
+        page = state['fetch'](state['cursor'])
+        for item in page['items']:
+            state['insert'](item)
+        state['cursor'] = page['next_cursor']
+        state['pending'] = False
+    
+    def _paged_scroll_command(self, tree, scrollbar):
+        """yscrollcommand that loads the next page once the end is visible"""
+        def command(first, last):
+            scrollbar.set(first, last)
+            state = self.tree_pages.get(str(tree))
+            if state and state['cursor'] and not state['pending'] and float(last) >= 1.0:
+                state['pending'] = True
+                self.root.after_idle(lambda: self._load_tree_page(tree))
+        return command
+    
     # ========== TOPICS MANAGEMENT ==========
     
     def show_topics(self):
@@ -722,7 +754,7 @@ class StudyTrackerApp:
         self.notes_tree.column('Note', width=400)
         
         notes_scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.notes_tree.yview)
-        self.notes_tree.configure(yscrollcommand=notes_scrollbar.set)
+        self.notes_tree.configure(yscrollcommand=self._paged_scroll_command(self.notes_tree, notes_scrollbar))
         
         self.notes_tree.pack(side='left', fill='both', expand=True)
         notes_scrollbar.pack(side='right', fill='y')
@@ -747,27 +779,30 @@ class StudyTrackerApp:
 
     def refresh_notes_list(self):
         """Refresh the notes list"""
-        for item in self.notes_tree.get_children():
-            self.notes_tree.delete(item)
-        
-        notes = self.app_logic.get_user_notes()
-        for note in notes:
-            try:
-                date_obj = datetime.strptime(note.get('created_at', ''), '%Y-%m-%d %H:%M:%S')
-                formatted_date = date_obj.strftime('%Y-%m-%d %H:%M')
-            except Exception:
-                formatted_date = note.get('created_at', '')
-            
-            tag_id = str(note['note_id'])
-            note_preview = (note.get('note_text') or '')[:100]
-            if len(note.get('note_text', '')) > 100:
-                note_preview += '...'
-            
-            self.notes_tree.insert('', 'end', values=(
-                formatted_date,
-                note.get('topic_name', 'General'),
-                note_preview
-            ), tags=(tag_id,))
+        self._load_tree_page(
+            self.notes_tree,
+            lambda cursor: self.app_logic.get_user_notes_page(cursor=cursor),
+            self._insert_note_row
+        )
+    
+    def _insert_note_row(self, note):
+        """Append one note to the notes list"""
+        try:
+            date_obj = datetime.strptime(note.get('created_at', ''), '%Y-%m-%d %H:%M:%S')
+            formatted_date = date_obj.strftime('%Y-%m-%d %H:%M')
+        except Exception:
+            formatted_date = note.get('created_at', '')
+        
+        tag_id = str(note['note_id'])
+        note_preview = (note.get('note_text') or '')[:100]
+        if len(note.get('note_text', '')) > 100:
+            note_preview += '...'
+        
+        self.notes_tree.insert('', 'end', values=(
+            formatted_date,
+            note.get('topic_name', 'General'),
+            note_preview
+        ), tags=(tag_id,))
 
     def handle_add_note(self):
         """Handle add note button"""
@@ -902,7 +937,7 @@ class StudyTrackerApp:
                 self.tasks_tree.column(col, width=300)
         
         scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tasks_tree.yview)
-        self.tasks_tree.configure(yscrollcommand=scrollbar.set)
+        self.tasks_tree.configure(yscrollcommand=self._paged_scroll_command(self.tasks_tree, scrollbar))
         
         self.tasks_tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
@@ -1006,21 +1041,24 @@ class StudyTrackerApp:
 
     def refresh_tasks_list(self):
         """Refresh the tasks list"""
-        for item in self.tasks_tree.get_children():
-            self.tasks_tree.delete(item)
-        
-        tasks = self.app_logic.get_tasks(include_completed=True)
-        for task in tasks:
-            tag_id = str(task['task_id'])
-            status = "✓ Done" if task.get('is_completed') else "○ Pending"
-            priority = task.get('priority', 'medium').capitalize()
-            
-            self.tasks_tree.insert('', 'end', values=(
-                status,
-                task.get('task_text'),
-                task.get('due_date') or 'Not set',
-                priority
-            ), tags=(tag_id,))
+        self._load_tree_page(
+            self.tasks_tree,
+            lambda cursor: self.app_logic.get_tasks_page(include_completed=True, cursor=cursor),
+            self._insert_task_row
+        )
+    
+    def _insert_task_row(self, task):
+        """Append one task to the tasks list"""
+        tag_id = str(task['task_id'])
+        status = "✓ Done" if task.get('is_completed') else "○ Pending"
+        priority = task.get('priority', 'medium').capitalize()
+        
+        self.tasks_tree.insert('', 'end', values=(
+            status,
+            task.get('task_text'),
+            task.get('due_date') or 'Not set',
+            priority
+        ), tags=(tag_id,))
     
     # ========== EXAM MANAGEMENT ==========
     
@@ -1087,6 +1125,11 @@ class StudyTrackerApp:
         )
         gen_btn.grid(row=3, column=1, pady=15, sticky='e')
         
+        self.exam_progress_label = tk.Label(form_frame, text="", font=('Ubuntu', 10, 'italic'),
+                                            bg=self.colors['bg_secondary'], fg=self.colors['text_dark'],
+                                            wraplength=500, justify='left')
+        self.exam_progress_label.grid(row=4, column=0, columnspan=2, sticky='w', padx=10)
+        
         history_frame = tk.LabelFrame(
             self.current_frame, 
             text="Exam History", 
@@ -1098,6 +1141,18 @@ class StudyTrackerApp:
         )
         history_frame.pack(fill='both', expand=True, padx=30, pady=15)
         
+        stats = self.app_logic.get_exam_stats()
+        if stats['exam_count']:
+            recent = ', '.join(f"{s:.0f}%" for s in stats['recent_scores'][-5:])
+            tk.Label(
+                history_frame,
+                text=f"Exams: {stats['exam_count']}   Average: {stats['average_score']:.1f}%   "
+                     f"Best: {stats['best_score']:.1f}%   Recent: {recent}",
+                font=('Ubuntu', 10),
+                bg=self.colors['bg_secondary'],
+                fg=self.colors['text_dark']
+            ).pack(anchor='w', padx=15, pady=(10, 0))
+        
         tree_frame = tk.Frame(history_frame, bg=self.colors['bg_secondary'])
         tree_frame.pack(fill='both', expand=True, padx=15, pady=15)
         
@@ -1115,7 +1170,7 @@ class StudyTrackerApp:
                 self.exam_tree.column(col, width=150)
         
         scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.exam_tree.yview)
-        self.exam_tree.configure(yscrollcommand=scrollbar.set)
+        self.exam_tree.configure(yscrollcommand=self._paged_scroll_command(self.exam_tree, scrollbar))
         
         self.exam_tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
@@ -1152,9 +1207,15 @@ class StudyTrackerApp:
         count = int(self.count_spin.get())
         difficulty = self.diff_var.get()
         
-        messagebox.showinfo("Generating...", "Generating exam questions. This may take a moment...")
+        self.exam_progress_label.config(text="Generating exam questions. This may take a moment...")
+        self.root.update_idletasks()
+        
+        def show_progress(exam_id, position, question):
+            self.exam_progress_label.config(text=f"Generated {position + 1}/{count}: {question['question']}")
+            self.root.update_idletasks()
         
-        success, message, exam_id = self.app_logic.start_exam(topic_id, count, difficulty)
+        success, message, exam_id = self.app_logic.start_exam(topic_id, count, difficulty, on_question=show_progress)
+        self.exam_progress_label.config(text="")
         
         if success:
             messagebox.showinfo("Success", message)
@@ -1376,24 +1437,27 @@ class StudyTrackerApp:
     
     def refresh_exam_history(self):
         """Refresh exam history list"""
-        for item in self.exam_tree.get_children():
-            self.exam_tree.delete(item)
-        
-        exams = self.app_logic.get_exam_history()
-        for exam in exams:
-            try:
-                date_obj = datetime.strptime(exam['exam_date'], '%Y-%m-%d %H:%M:%S')
-                formatted_date = date_obj.strftime('%Y-%m-%d %H:%M')
-            except Exception:
-                formatted_date = exam['exam_date']
-            
-            self.exam_tree.insert('', 'end', values=(
-                formatted_date,
-                exam.get('topic_name') or 'N/A',
-                exam.get('subject') or 'N/A',
-                f"{(exam.get('score') or 0):.1f}%",
-                exam.get('total_questions') or 0
-            ), tags=(str(exam['exam_id']),))
+        self._load_tree_page(
+            self.exam_tree,
+            lambda cursor: self.app_logic.get_exam_history_page(cursor=cursor),
+            self._insert_exam_row
+        )
+    
+    def _insert_exam_row(self, exam):
+        """Append one exam to the history list"""
+        try:
+            date_obj = datetime.strptime(exam['exam_date'], '%Y-%m-%d %H:%M:%S')
+            formatted_date = date_obj.strftime('%Y-%m-%d %H:%M')
+        except Exception:
+            formatted_date = exam['exam_date']
+        
+        self.exam_tree.insert('', 'end', values=(
+            formatted_date,
+            exam.get('topic_name') or 'N/A',
+            exam.get('subject') or 'N/A',
+            f"{(exam.get('score') or 0):.1f}%",
+            exam.get('total_questions') or 0
+        ), tags=(str(exam['exam_id']),))
     
     def handle_view_exam_results(self):
         """Handle view exam results button"""
@@ -2044,8 +2108,8 @@ def array_sum(arr):
         )
         header.pack(pady=20)
         
-        streak_info = self.app_logic.get_streak_data()
-        current_streak = self.app_logic.get_current_streak()
+        streak_summary = self.app_logic.get_streak_summary()
+        current_streak = streak_summary['current_streak']
         
         stats_frame = tk.Frame(self.current_frame, bg=self.colors['bg_primary'])
         stats_frame.pack(pady=20)
@@ -2059,6 +2123,15 @@ def array_sum(arr):
         )
         current_streak_label.pack(pady=10)
         
+        longest_streak_label = tk.Label(
+            stats_frame,
+            text=f"Longest Streak: {streak_summary['longest_streak']} days",
+            font=('Ubuntu', 12),
+            bg=self.colors['bg_primary'],
+            fg=self.colors['text_dark']
+        )
+        longest_streak_label.pack()
+        
         calendar_frame = tk.LabelFrame(
             self.current_frame,
             text="Recent Activity",
@@ -2082,19 +2155,14 @@ def array_sum(arr):
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
         
-        study_days = list(streak_info.keys())
-        today = date.today()
-        
-        for i in range(30):
-            day = today - timedelta(days=29-i)
-            day_str = day.strftime('%Y-%m-%d')
-            
+        for day in self.app_logic.get_recent_activity(30):
+            studied = day['active']
             day_frame = tk.Frame(scrollable_frame, bg=self.colors['bg_secondary'])
             day_frame.pack(fill='x', padx=20, pady=5)
             
             date_label = tk.Label(
                 day_frame,
-                text=day.strftime('%b %d'),
+                text=date.fromisoformat(day['date']).strftime('%b %d'),
                 font=('Ubuntu', 10),
                 bg=self.colors['bg_secondary'],
                 fg=self.colors['text_dark'],
@@ -2102,7 +2170,7 @@ def array_sum(arr):
             )
             date_label.pack(side='left')
             
-            if day_str in study_days:
+            if studied:
                 status_text = "✓ Studied"
                 color = self.colors['success']
             else:
@@ -2137,7 +2205,10 @@ def array_sum(arr):
 
     def run(self):
         """Start the application"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.app_logic.close()
 
 if __name__ == "__main__":
     app = StudyTrackerApp()
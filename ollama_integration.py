@@ -1,27 +1,366 @@
 import requests
 import json
+import queue
 import random
-from typing import List, Dict, Any, Optional
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Dict, Any, Callable, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from response_cache import cache_key
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# (connect, read) timeouts in seconds for each kind of call
+DEFAULT_TIMEOUTS = {
+    'health': (3, 5),
+    'exam': (5, 400),
+    'exam_stream': (5, 60),  # read timeout between streamed chunks
+    'study_guide': (5, 60),
+    'explain': (5, 30),
+    'code_practice': (5, 60),
+}
+
+EXAM_OPTIONS = {"temperature": 0.7, "top_p": 0.9}
+
+# Call kinds whose responses are served from the response cache, when one is
+# configured. Coding problems are left out: asking again should give a new one.
+CACHED_KINDS = frozenset({'exam', 'exam_stream', 'study_guide', 'explain'})
+
+# Exams larger than CHUNK_SIZE are split into chunks generated concurrently,
+# each steered towards a different aspect of the topic so they overlap less.
+CHUNK_SIZE = 10
+TOPIC_ASPECTS = (
+    "core definitions and terminology",
+    "underlying principles and how it works",
+    "practical applications and examples",
+    "common mistakes and misconceptions",
+    "problem solving and worked scenarios",
+    "comparisons with related concepts",
+    "edge cases and limitations",
+    "history, context and motivation",
+)
+# Question stems whose word sets overlap at least this much (Jaccard) are
+# treated as the same question.
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+# When a round yields fewer valid questions than asked, generate_exam and
+# generate_exam_stream ask again for the shortfall at most TOP_UP_ROUNDS times within EXAM_DEADLINE
+# seconds, quoting up to AVOID_STEMS earlier stems so they are not repeated;
+# the offline generator supplies whatever is still missing.
+TOP_UP_ROUNDS = 2
+EXAM_DEADLINE = 600.0
+AVOID_STEMS = 30
+
+# Health results younger than HEALTH_TTL seconds are trusted without a new
+# probe; the background prober refreshes them every PROBE_INTERVAL seconds.
+HEALTH_TTL = 30.0
+PROBE_INTERVAL = 15.0
+
+
+class HealthState(NamedTuple):
+    """Outcome of the most recent health probe or request"""
+    available: bool
+    latency: Optional[float]
+    checked_at: float
+    error: Optional[str] = None
+
+
+def iter_json_objects(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield each top-level JSON object as soon as its closing brace arrives.
+
+    ``chunks`` may split tokens anywhere; braces inside strings are ignored.
+    Text between objects (prose, array punctuation) is skipped without
+    tracking quotes, so a stray quote there cannot hide what follows.
+    Objects that fail to parse are skipped.
+    """
+    depth, in_string, escaped, buf = 0, False, False, []
+    for chunk in chunks:
+        for ch in chunk:
+            if not depth:
+                if ch == '{':
+                    depth, buf = 1, [ch]
+                continue
+            buf.append(ch)
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == '\\':
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == '{':
+                depth += 1
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    try:
+                        obj = json.loads(''.join(buf))
+                    except ValueError:
+                        continue
+                    if isinstance(obj, dict):
+                        yield obj
+
+
+def plan_chunks(count: int, chunk_size: int = CHUNK_SIZE) -> List[tuple]:
+    """Split ``count`` questions into balanced (size, aspect) chunks of at most ``chunk_size``"""
+    if count <= chunk_size:
+        return [(count, None)]
+    chunks = -(-count // chunk_size)
+    base, extra = divmod(count, chunks)
+    return [(base + (i < extra), TOPIC_ASPECTS[i % len(TOPIC_ASPECTS)]) for i in range(chunks)]
+
+
+def stem_words(text: str) -> frozenset:
+    """Lower-cased words of a question stem, ignoring punctuation and order"""
+    return frozenset(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def is_near_duplicate(words: frozenset, seen: Iterable[frozenset],
+                      threshold: float = NEAR_DUPLICATE_THRESHOLD) -> bool:
+    """Whether ``words`` overlaps any stem in ``seen`` by at least ``threshold``"""
+    for other in seen:
+        union = len(words | other)
+        if not union or len(words & other) / union >= threshold:
+            return True
+    return False
+
+
+def dedupe_questions(questions: Iterable[Dict[str, Any]],
+                     seen: Optional[List[frozenset]] = None) -> List[Dict[str, Any]]:
+    """Drop questions whose stem nearly repeats an earlier one.
+
+    ``seen`` holds stems already used and is extended in place, so it can
+    be carried across calls.
+    """
+    seen = [] if seen is None else seen
+    unique = []
+    for question in questions:
+        words = stem_words(question['question'])
+        if is_near_duplicate(words, seen):
+            continue
+        seen.append(words)
+        unique.append(question)
+    return unique
+
 
 class OllamaIntegration:
-    def __init__(self, base_url: str = "http://localhost:11434"):
-        """Initialize Ollama integration"""
-        self.base_url = base_url
+    def __init__(self, base_url: str = "http://localhost:11434", pool_size: int = DEFAULT_POOL_SIZE,
+                 retries: int = DEFAULT_RETRIES, backoff_factor: float = DEFAULT_BACKOFF,
+                 timeouts: Optional[Dict[str, Any]] = None, health_ttl: float = HEALTH_TTL, cache=None):
+        """Initialize Ollama integration with a pooled keep-alive session.
+
+        ``cache`` is an optional response_cache.ResponseCache.
+        """
+        self.base_url = base_url.rstrip('/')
         self.model = "mistral"
+        self.chunk_size = CHUNK_SIZE
+        self.max_parallel = pool_size
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.cache = cache
+        self.session = self._build_session(pool_size, retries, backoff_factor)
+        # Probes fail fast; the next probe is the retry
+        self.session.mount(f"{self.base_url}/api/tags", HTTPAdapter(max_retries=0))
+
+        self.health_ttl = health_ttl
+        self._health: Optional[HealthState] = None
+        self._health_lock = threading.Lock()
+        self._prober: Optional[threading.Thread] = None
+        self._stop_probe = threading.Event()
+
+    @staticmethod
+    def _build_session(pool_size: int, retries: int, backoff_factor: float) -> requests.Session:
+        """Session whose adapter keeps up to ``pool_size`` connections alive.
+
+        Connection failures and overload statuses are retried with
+        exponential backoff. Read timeouts are not: generation is not
+        idempotent in cost, and a retry would repeat minutes of work.
+        """
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'POST'}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        """Stop background probing and release pooled connections"""
+        self.stop_health_probe()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _post_generate(self, prompt: str, kind: str, options: Optional[Dict[str, Any]] = None,
+                       stream: bool = False, timeout: Optional[tuple] = None) -> requests.Response:
+        payload = {"model": self.model, "prompt": prompt, "stream": stream}
+        if options:
+            payload["options"] = options
+
+        self._require_available()
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/generate", json=payload, timeout=timeout or self.timeouts[kind], stream=stream
+            )
+        except requests.ConnectionError as e:
+            self._set_health(False, None, str(e))
+            raise
+        if response.status_code != 200:
+            response.close()
+            raise RuntimeError(f"Ollama API error: {response.status_code}")
+        return response
 
-    def check_connection(self) -> bool:
-        """Check if Ollama is running"""
-        response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-        return response.status_code == 200
+    def _cache_key(self, prompt: str, kind: str, options: Optional[Dict[str, Any]]) -> Optional[str]:
+        if self.cache is None or kind not in CACHED_KINDS:
+            return None
+        # Streamed text may stop early, so kinds never share entries
+        return cache_key(self.model, prompt, dict(options or {}, kind=kind))
+
+    def _generate(self, prompt: str, kind: str, options: Optional[Dict[str, Any]] = None,
+                  timeout: Optional[tuple] = None, fresh: bool = False,
+                  complete: Optional[Callable[[str], bool]] = None) -> str:
+        """POST one non-streaming prompt and return the generated text.
+
+        Cacheable kinds are answered from the response cache unless
+        ``fresh`` is set; fresh answers still replace the cached one.
+        When given, ``complete`` decides whether a new answer is worth
+        caching, so partial answers are asked for again next time.
+        """
+        key = self._cache_key(prompt, kind, options)
+        if key and not fresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        text = self._post_generate(prompt, kind, options, timeout=timeout).json().get('response', '')
+        if key and text and (complete is None or complete(text)):
+            self.cache.put(key, self.model, kind, text)
+        return text
+
+    def _stream(self, prompt: str, kind: str, options: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """POST a streaming prompt and yield text fragments as Ollama emits them"""
+        with self._post_generate(prompt, kind, options, stream=True) as response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                if message.get('error'):
+                    raise RuntimeError(f"Ollama API error: {message['error']}")
+                yield message.get('response', '')
+                if message.get('done'):
+                    return
+
+    # ---------- health ----------
+
+    def _set_health(self, available: bool, latency: Optional[float], error: Optional[str] = None) -> HealthState:
+        with self._health_lock:
+            if latency is None and available and self._health:
+                latency = self._health.latency
+            self._health = HealthState(available, latency, time.monotonic(), error)
+            return self._health
+
+    def probe(self) -> HealthState:
+        """Run one health check now and record its outcome"""
+        started = time.monotonic()
+        try:
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=self.timeouts['health'])
+        except requests.RequestException as e:
+            return self._set_health(False, None, str(e))
+        if response.status_code != 200:
+            return self._set_health(False, None, f"HTTP {response.status_code}")
+        return self._set_health(True, time.monotonic() - started)
 
-    def generate_exam(self, topic: str, subject: str, count: int = 20, difficulty: str = "medium") -> List[Dict[str, Any]]:
-        """Generate objective-type exam questions using Ollama"""
-        if not self.check_connection():
+    def check_connection(self) -> bool:
+        """Check if Ollama is running, probing synchronously"""
+        return self.probe().available
+
+    def health(self) -> Optional[HealthState]:
+        """Last known health state, or None before the first check"""
+        with self._health_lock:
+            return self._health
+
+    def health_status(self) -> Dict[str, Any]:
+        """Last known availability, probe latency and age for display"""
+        state = self.health()
+        if state is None:
+            return {'available': None, 'latency_ms': None, 'age_seconds': None, 'error': None}
+        return {
+            'available': state.available,
+            'latency_ms': None if state.latency is None else state.latency * 1000,
+            'age_seconds': time.monotonic() - state.checked_at,
+            'error': state.error
+        }
+
+    def is_available(self) -> bool:
+        """Cached availability; probes synchronously only when nothing fresh is known.
+
+        While the background prober runs, the last known state is used even
+        when older than the TTL, so callers never wait on a probe.
+        """
+        state = self.health()
+        fresh = state is not None and time.monotonic() - state.checked_at < self.health_ttl
+        if state is None or (not fresh and not self.probing):
+            state = self.probe()
+        return state.available
+
+    def _require_available(self):
+        if not self.is_available():
             raise ConnectionError("Ollama is not running. Please start Ollama service.")
 
-        prompt = f"""Generate {count} multiple-choice questions about {topic} in {subject}.
+    @property
+    def probing(self) -> bool:
+        """Whether the background prober is running"""
+        return self._prober is not None and self._prober.is_alive()
+
+    def start_health_probe(self, interval: float = PROBE_INTERVAL):
+        """Refresh the health state every ``interval`` seconds on a daemon thread"""
+        if self.probing:
+            return
+        self._stop_probe.clear()
+
+        def run():
+            while not self._stop_probe.wait(interval):
+                self.probe()
+
+        self._prober = threading.Thread(target=run, name="ollama-health-probe", daemon=True)
+        self._prober.start()
+
+    def stop_health_probe(self):
+        """Stop the background prober, if running"""
+        self._stop_probe.set()
+        if self._prober is not None:
+            self._prober.join(timeout=self.timeouts['health'][1] + 1)
+            self._prober = None
+
+    def _exam_prompt(self, topic: str, subject: str, count: int, difficulty: str,
+                     aspect: Optional[str] = None, avoid: Sequence[str] = ()) -> str:
+        focus = f"\nFocus on this aspect of {topic}: {aspect}\n" if aspect else ""
+        if avoid:
+            focus += "\nDo not repeat or rephrase these existing questions:\n"
+            focus += "".join(f"- {stem}\n" for stem in avoid)
+        return f"""Generate {count} multiple-choice questions about {topic} in {subject}.
 Difficulty level: {difficulty}
-
+{focus}
 For each question, provide:
 1. The question text
 2. Four options (A, B, C, D)
@@ -41,35 +380,208 @@ Format your response as JSON array with this structure:
 Make sure questions are diverse, accurate, and test understanding rather than just memorization.
 Ensure all {count} questions are unique and cover different aspects of {topic}."""
 
-        response = requests.post(
-            f"{self.base_url}/api/generate",
-            json={
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0.7, "top_p": 0.9}
-            },
-            timeout=400
-        )
+    def _generate_chunks(self, topic: str, subject: str, difficulty: str, chunks: List[tuple],
+                         avoid: Sequence[str] = (), timeout: Optional[tuple] = None,
+                         fresh: bool = False) -> List[Dict[str, Any]]:
+        """Generate each (size, aspect) chunk concurrently; results keep chunk order.
+
+        A failed chunk only loses its own questions; the first error is
+        raised when every chunk failed.
+        """
+        def run(chunk):
+            size, aspect = chunk
+            prompt = self._exam_prompt(topic, subject, size, difficulty, aspect, avoid)
+
+            def complete(text):
+                try:
+                    return len(self._parse_questions(text)) >= size
+                except ValueError:
+                    return False
+
+            return self._parse_questions(self._generate(prompt, 'exam', EXAM_OPTIONS, timeout, fresh, complete))
+
+        if len(chunks) == 1:
+            return run(chunks[0])
+
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(chunks)),
+                                thread_name_prefix="ollama-chunk") as pool:
+            futures = [pool.submit(run, chunk) for chunk in chunks]
+
+        questions, errors = [], []
+        for future in futures:
+            try:
+                questions.extend(future.result())
+            except Exception as e:
+                errors.append(e)
+        if errors and not questions:
+            raise errors[0]
+        return questions
+
+    def generate_exam(self, topic: str, subject: str, count: int = 20, difficulty: str = "medium",
+                      deadline: float = EXAM_DEADLINE, fresh: bool = False) -> List[Dict[str, Any]]:
+        """Generate objective-type exam questions using Ollama.
+
+        Large exams are planned as concurrent chunks (see plan_chunks), so
+        wall time follows the slowest chunk rather than the total length.
+        Shortfalls from malformed output are topped up iteratively (see
+        TOP_UP_ROUNDS); once the budget, the deadline or the server gives
+        out, the offline generator fills the rest. Top-up rounds always
+        bypass the response cache; ``fresh`` bypasses it for the first too.
+        """
+        expires = time.monotonic() + deadline
+        questions: List[Dict[str, Any]] = []
+        seen: List[frozenset] = []
+
+        for round_number in range(TOP_UP_ROUNDS + 1):
+            missing = count - len(questions)
+            remaining = expires - time.monotonic()
+            if missing <= 0 or remaining <= 0:
+                break
+            connect, read = self.timeouts['exam']
+            avoid = [q['question'] for q in questions][-AVOID_STEMS:]
+            try:
+                batch = self._generate_chunks(topic, subject, difficulty, plan_chunks(missing, self.chunk_size),
+                                              avoid, (connect, min(read, remaining)), fresh or round_number > 0)
+            except ValueError:
+                continue  # malformed JSON; spend another round
+            except (ConnectionError, RuntimeError, requests.RequestException):
+                if not questions:
+                    raise
+                break
+            for q in dedupe_questions(batch, seen)[:missing]:
+                self._shuffle_question_options(q)
+                questions.append(q)
 
-        if response.status_code != 200:
-            raise RuntimeError(f"Ollama API error: {response.status_code}")
-
-        result = response.json()
-        generated_text = result.get('response', '')
-        questions = self._parse_questions(generated_text)
-
-        # Re-generate if not enough valid questions
         if len(questions) < count:
-            additional = self.generate_exam(topic, subject, count - len(questions), difficulty)
-            questions.extend(additional)
-
-        # Shuffle each question’s options
-        for q in questions:
-            self._shuffle_question_options(q)
-
+            questions.extend(self._offline_questions(topic, subject, count - len(questions), difficulty))
         return questions[:count]
 
+    @staticmethod
+    def _offline_questions(topic: str, subject: str, count: int, difficulty: str) -> List[Dict[str, Any]]:
+        """Template questions for the part of an exam Ollama could not supply"""
+        from offline_exam_generator import OfflineExamGenerator
+        return OfflineExamGenerator().generate_exam(topic, subject, count, difficulty)
+
+    def _stream_chunk(self, topic: str, subject: str, count: int, difficulty: str,
+                      aspect: Optional[str] = None, avoid: Sequence[str] = (),
+                      fresh: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield up to ``count`` valid questions from one streamed prompt.
+
+        Questions repeating an ``avoid`` stem do not count towards ``count``.
+        The text is cached once it holds ``count`` questions, before the last
+        one is handed out, since callers stop reading as soon as they have
+        enough. Streams that end short are not cached.
+        """
+        prompt = self._exam_prompt(topic, subject, count, difficulty, aspect, avoid)
+        key = self._cache_key(prompt, 'exam_stream', EXAM_OPTIONS)
+        cached = self.cache.get(key) if key and not fresh else None
+        text: List[str] = []
+
+        def fragments():
+            if cached is not None:
+                yield cached
+                return
+            for fragment in self._stream(prompt, 'exam_stream', EXAM_OPTIONS):
+                text.append(fragment)
+                yield fragment
+
+        avoided = [stem_words(stem) for stem in avoid]
+        produced = 0
+        for question in iter_json_objects(fragments()):
+            if not self._validate_question(question):
+                continue
+            if avoided and is_near_duplicate(stem_words(question['question']), avoided):
+                continue
+            produced += 1
+            if produced >= count:
+                if key and cached is None:
+                    self.cache.put(key, self.model, 'exam_stream', ''.join(text))
+                yield question
+                return
+            yield question
+
+    def _merge_chunk_streams(self, topic: str, subject: str, difficulty: str, chunks: List[tuple],
+                             avoid: Sequence[str] = (), fresh: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield questions from concurrently streamed chunks in arrival order"""
+        if len(chunks) == 1:
+            yield from self._stream_chunk(topic, subject, chunks[0][0], difficulty, chunks[0][1], avoid, fresh)
+            return
+
+        arrivals: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        finished = object()
+
+        def run(size, aspect):
+            if stop.is_set():  # consumer already gone; skip queued chunks
+                return
+            stream = self._stream_chunk(topic, subject, size, difficulty, aspect, avoid, fresh)
+            try:
+                for question in stream:
+                    if stop.is_set():
+                        break
+                    arrivals.put(question)
+            except Exception as e:
+                arrivals.put(e)
+            finally:
+                stream.close()
+                arrivals.put(finished)
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_parallel, len(chunks)),
+                                  thread_name_prefix="ollama-chunk")
+        try:
+            for size, aspect in chunks:
+                pool.submit(run, size, aspect)
+            pending, errors, produced = len(chunks), [], False
+            while pending:
+                item = arrivals.get()
+                if item is finished:
+                    pending -= 1
+                elif isinstance(item, Exception):
+                    errors.append(item)
+                else:
+                    produced = True
+                    yield item
+            if errors and not produced:
+                raise errors[0]
+        finally:
+            # Workers notice between questions and close their streams
+            stop.set()
+            pool.shutdown(wait=False)
+
+    def generate_exam_stream(self, topic: str, subject: str, count: int = 20, difficulty: str = "medium",
+                             deadline: float = EXAM_DEADLINE, fresh: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield validated, shuffled questions while Ollama is still generating.
+
+        Large exams stream their chunks concurrently and near-duplicate
+        stems are dropped. Streams that end short are topped up like
+        generate_exam, but nothing is filled in offline: the generator just
+        stops early, after ``count`` questions or once the budget or the
+        deadline runs out. Closing it early closes the connections.
+        """
+        expires = time.monotonic() + deadline
+        seen: List[frozenset] = []
+        stems: List[str] = []
+
+        for round_number in range(TOP_UP_ROUNDS + 1):
+            missing = count - len(stems)
+            if missing <= 0 or time.monotonic() >= expires:
+                return
+            chunks = plan_chunks(missing, self.chunk_size)
+            try:
+                for question in self._merge_chunk_streams(topic, subject, difficulty, chunks,
+                                                          stems[-AVOID_STEMS:], fresh or round_number > 0):
+                    if not dedupe_questions([question], seen):
+                        continue
+                    self._shuffle_question_options(question)
+                    stems.append(question['question'])
+                    yield question
+                    if len(stems) >= count or time.monotonic() >= expires:
+                        return
+            except (ConnectionError, RuntimeError, requests.RequestException):
+                if not stems:
+                    raise
+                return
+
     def _parse_questions(self, text: str) -> List[Dict[str, Any]]:
         """Parse questions from Ollama response"""
         start = text.find('[')
@@ -100,11 +612,8 @@ Ensure all {count} questions are unique and cover different aspects of {topic}."
         new_idx = question['options'].index(correct_text)
         question['correct_answer'] = chr(ord('A') + new_idx)
 
-    def generate_study_guide(self, topic: str, subject: str) -> str:
+    def generate_study_guide(self, topic: str, subject: str, fresh: bool = False) -> str:
         """Generate a comprehensive study guide for a topic"""
-        if not self.check_connection():
-            raise ConnectionError("Ollama is not running. Please start Ollama service.")
-
         prompt = f"""Create a comprehensive study guide for {topic} in {subject}.
 
 Include:
@@ -116,26 +625,10 @@ Include:
 
 Make it clear, concise, and student-friendly."""
 
-        response = requests.post(
-            f"{self.base_url}/api/generate",
-            json={
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False
-            },
-            timeout=60
-        )
-
-        if response.status_code != 200:
-            raise RuntimeError(f"Ollama API error: {response.status_code}")
-
-        return response.json().get('response', '')
+        return self._generate(prompt, 'study_guide', fresh=fresh)
 
-    def explain_concept(self, concept: str, context: str = "") -> str:
+    def explain_concept(self, concept: str, context: str = "", fresh: bool = False) -> str:
         """Get AI explanation for a specific concept"""
-        if not self.check_connection():
-            raise ConnectionError("Ollama is not running. Please start Ollama service.")
-
         prompt = f"""Explain the concept of "{concept}" in simple terms.
 {"Context: " + context if context else ""}
 
@@ -146,26 +639,10 @@ Provide:
 
 Keep the explanation concise and easy to understand."""
 
-        response = requests.post(
-            f"{self.base_url}/api/generate",
-            json={
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False
-            },
-            timeout=30
-        )
-
-        if response.status_code != 200:
-            raise RuntimeError(f"Ollama API error: {response.status_code}")
-
-        return response.json().get('response', '')
+        return self._generate(prompt, 'explain', fresh=fresh)
 
     def generate_code_practice(self, topic: str, difficulty: str = 'easy', language: str = 'python') -> Optional[Dict[str, Any]]:
         """Generate a coding practice problem using Ollama."""
-        if not self.check_connection():
-            raise ConnectionError("Ollama is not running. Please start Ollama service.")
-
         prompt = f"""Create a single coding practice problem about {topic} targeting {difficulty} difficulty for the {language} programming language.
 
 Return a JSON object with the following fields:
@@ -176,21 +653,7 @@ Return a JSON object with the following fields:
 
 Make sure tests are deterministic and there are at least 3 tests. Output only the JSON object, without extra explanation."""
 
-        response = requests.post(
-            f"{self.base_url}/api/generate",
-            json={
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0.2}
-            },
-            timeout=60
-        )
-
-        if response.status_code != 200:
-            raise RuntimeError(f"Ollama API error: {response.status_code}")
-
-        text = response.json().get('response', '')
+        text = self._generate(prompt, 'code_practice', {"temperature": 0.2})
         start = text.find('{')
         end = text.rfind('}') + 1
 
@@ -0,0 +1,124 @@
+import base64
+import json
+import sqlite3
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class SortKey(NamedTuple):
+    """One ORDER BY term; the last key of a page query must be unique"""
+    expr: str
+    field: str
+    descending: bool = False
+    nullable: bool = False
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    """Pack the sort values of the last row into an opaque token"""
+    raw = json.dumps([scope, list(values)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(scope: str, token: str) -> List[Any]:
+    """Unpack a token produced by encode_cursor for the same query"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        token_scope, values = json.loads(raw)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid page cursor")
+    if token_scope != scope or not isinstance(values, list):
+        raise ValueError("Page cursor belongs to a different listing")
+    return values
+
+
+def _after(key: SortKey, value: Any) -> Tuple[Optional[str], List[Any]]:
+    # SQLite sorts NULL before every other value.
+    if key.descending:
+        if value is None:
+            return None, []
+        if key.nullable:
+            return f"({key.expr} < ? OR {key.expr} IS NULL)", [value]
+        return f"{key.expr} < ?", [value]
+    if value is None:
+        return f"{key.expr} IS NOT NULL", []
+    return f"{key.expr} > ?", [value]
+
+
+def _equal(key: SortKey, value: Any) -> Tuple[str, List[Any]]:
+    if value is None:
+        return f"{key.expr} IS NULL", []
+    return f"{key.expr} = ?", [value]
+
+
+def keyset_condition(keys: Sequence[SortKey], values: Sequence[Any]) -> Tuple[str, List[Any]]:
+    """WHERE fragment selecting rows that sort strictly after ``values``.
+
+    Uses a row-value comparison, which SQLite can seek on an index, whenever
+    NULLs cannot change the answer; otherwise the lexicographic expansion.
+    """
+    directions = {key.descending for key in keys}
+    if (len(directions) == 1 and None not in values
+            and not (keys[0].descending and any(key.nullable for key in keys))):
+        op = '<' if keys[0].descending else '>'
+        columns = ', '.join(key.expr for key in keys)
+        marks = ', '.join('?' for _ in keys)
+        return f"({columns}) {op} ({marks})", list(values)
+
+    terms, params = [], []
+    for i, key in enumerate(keys):
+        after, after_params = _after(key, values[i])
+        if after is None:
+            continue
+        parts, part_params = [], []
+        for prefix_key, prefix_value in zip(keys[:i], values[:i]):
+            clause, clause_params = _equal(prefix_key, prefix_value)
+            parts.append(clause)
+            part_params.extend(clause_params)
+        parts.append(after)
+        part_params.extend(after_params)
+        terms.append('(' + ' AND '.join(parts) + ')')
+        params.extend(part_params)
+    if not terms:
+        return "0", []
+    return '(' + ' OR '.join(terms) + ')', params
+
+
+def fetch_page(conn: sqlite3.Connection, scope: str, sql: str, params: Sequence[Any],
+               keys: Sequence[SortKey], limit: int = DEFAULT_PAGE_SIZE,
+               cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """Run one page of a keyset-paginated query.
+
+    ``sql`` is a SELECT ending in a WHERE clause and without ORDER BY; the
+    cursor condition, ordering and LIMIT are appended here. Returns the rows
+    and the token for the next page, or None on the last page. Raises
+    ValueError for a bad limit or cursor.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    params = list(params)
+    if cursor:
+        values = decode_cursor(scope, cursor)
+        if len(values) != len(keys):
+            raise ValueError("Invalid page cursor")
+        condition, condition_params = keyset_condition(keys, values)
+        sql += f" AND {condition}"
+        params.extend(condition_params)
+
+    order = ', '.join(f"{key.expr} {'DESC' if key.descending else 'ASC'}" for key in keys)
+    result = conn.execute(f"{sql} ORDER BY {order} LIMIT ?", params + [limit + 1])
+    names = [column[0] for column in result.description]
+    rows = result.fetchall()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(scope, [last[names.index(key.field)] for key in keys])
+
+
+def page_result(items: List[Dict[str, Any]], next_cursor: Optional[str]) -> Dict[str, Any]:
+    """Shape returned by every ``*_page`` method"""
+    return {'items': items, 'next_cursor': next_cursor}
@@ -0,0 +1,124 @@
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Every KEYFRAME_INTERVAL-th sample of a topic also stores its absolute
+# progress, so reconstructing a value never sums more than that many deltas.
+KEYFRAME_INTERVAL = 32
+DEFAULT_MAX_POINTS = 200
+
+# Samples are numbered per topic by seq. delta is the change from the
+# previous sample; keyframe is NULL except on every KEYFRAME_INTERVAL-th row.
+PROGRESS_HISTORY_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS topic_progress_history (
+        topic_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        recorded_at INTEGER NOT NULL,
+        delta INTEGER NOT NULL,
+        keyframe INTEGER,
+        PRIMARY KEY (topic_id, seq)
+    ) WITHOUT ROWID
+'''
+
+PROGRESS_HISTORY_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_progress_history_time ON topic_progress_history (topic_id, recorded_at)"
+)
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[int]:
+    return None if value is None else int(value.timestamp())
+
+
+def append_progress(conn: sqlite3.Connection, topic_id: int, old_progress: Optional[int], new_progress: int,
+                    recorded_at: Optional[datetime] = None):
+    """Append one sample; call in the transaction that updates the topic"""
+    old_progress = old_progress or 0
+    last = conn.execute(
+        "SELECT seq FROM topic_progress_history WHERE topic_id = ? ORDER BY seq DESC LIMIT 1",
+        (topic_id,)
+    ).fetchone()
+    if last is not None and new_progress == old_progress:
+        return
+
+    seq = last[0] + 1 if last else 0
+    conn.execute(
+        "INSERT INTO topic_progress_history (topic_id, seq, recorded_at, delta, keyframe) VALUES (?, ?, ?, ?, ?)",
+        (
+            topic_id, seq, _timestamp(recorded_at) or int(time.time()), new_progress - old_progress,
+            new_progress if seq % KEYFRAME_INTERVAL == 0 else None
+        )
+    )
+
+
+def seed_progress_history(conn: sqlite3.Connection):
+    """Record each topic's current progress as its first keyframe"""
+    conn.execute('''
+        INSERT OR IGNORE INTO topic_progress_history (topic_id, seq, recorded_at, delta, keyframe)
+        SELECT topic_id, 0, CAST(strftime('%s', 'now') AS INTEGER), COALESCE(progress, 0), COALESCE(progress, 0)
+        FROM subtopics
+    ''')
+
+
+def _downsample(points: List[tuple], max_points: int) -> List[tuple]:
+    """Keep the last sample in each of ``max_points`` equal time buckets"""
+    if len(points) <= max_points:
+        return points
+    first, last = points[0][0], points[-1][0]
+    span = max(last - first, 1)
+    buckets: Dict[int, tuple] = {}
+    for point in points:
+        buckets[min(int((point[0] - first) * max_points / span), max_points - 1)] = point
+    return [buckets[b] for b in sorted(buckets)]
+
+
+def progress_series(conn: sqlite3.Connection, topic_id: int, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None, max_points: int = DEFAULT_MAX_POINTS) -> List[Dict[str, Any]]:
+    """Progress samples of a topic between two times, downsampled for charting.
+
+    Reads only the samples in range plus those back to the nearest keyframe.
+    When history exists before ``since``, the series starts with the value
+    carried into the range at ``since``.
+    """
+    if max_points < 2:
+        raise ValueError("max_points must be at least 2")
+    start, end = _timestamp(since), _timestamp(until)
+
+    bounds = conn.execute('''
+        SELECT MIN(seq), MAX(seq) FROM topic_progress_history
+        WHERE topic_id = ? AND (? IS NULL OR recorded_at >= ?) AND (? IS NULL OR recorded_at <= ?)
+    ''', (topic_id, start, start, end, end)).fetchone()
+    first_seq, last_seq = bounds if bounds[0] is not None else (None, None)
+
+    # Decoding starts from the newest keyframe at or before the range
+    anchor_limit = first_seq if first_seq is not None else conn.execute('''
+        SELECT MAX(seq) FROM topic_progress_history WHERE topic_id = ? AND (? IS NULL OR recorded_at < ?)
+    ''', (topic_id, start, start)).fetchone()[0]
+    if anchor_limit is None:
+        return []
+    anchor = conn.execute('''
+        SELECT MAX(seq) FROM topic_progress_history
+        WHERE topic_id = ? AND seq <= ? AND keyframe IS NOT NULL
+    ''', (topic_id, anchor_limit)).fetchone()[0] or 0
+
+    rows = conn.execute('''
+        SELECT seq, recorded_at, delta, keyframe FROM topic_progress_history
+        WHERE topic_id = ? AND seq BETWEEN ? AND ?
+        ORDER BY seq
+    ''', (topic_id, anchor, last_seq if last_seq is not None else anchor_limit)).fetchall()
+
+    points, value, carried = [], 0, None
+    for seq, recorded_at, delta, keyframe in rows:
+        value = keyframe if keyframe is not None else value + delta
+        if first_seq is None or seq < first_seq:
+            carried = value
+        else:
+            points.append((recorded_at, value))
+
+    if carried is not None and start is not None:
+        points.insert(0, (start, carried))
+
+    return [
+        {'timestamp': datetime.fromtimestamp(ts).isoformat(sep=' ', timespec='seconds'), 'progress': progress}
+        for ts, progress in _downsample(points, max_points)
+    ]
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from db_pool import ConnectionPool
+from exam_store import decode_payload, encode_payload
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# Generated text keyed by cache_key (model, prompt hash and options). size is
+# the stored payload length, so the LRU bound is checked with one SUM; rows
+# past it are evicted oldest last_used first.
+RESPONSE_CACHE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS llm_response_cache (
+        cache_key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        response BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    )
+'''
+
+RESPONSE_CACHE_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_lru ON llm_response_cache (last_used)"
+)
+
+
+def cache_key(model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Identity of a generation request: model, prompt hash and options"""
+    prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    payload = json.dumps([model, prompt_hash, options or {}], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of LLM responses stored in SQLite.
+
+    Shares the app's connection pool, so cached answers survive restarts.
+    Hit and miss counters cover this process only.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.pool = pool
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for ``key``, marking it recently used; None on a miss"""
+        try:
+            with self.pool.transaction() as conn:
+                row = conn.execute(
+                    "SELECT response FROM llm_response_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE llm_response_cache SET last_used = ?, hits = hits + 1 WHERE cache_key = ?",
+                        (time.time(), key)
+                    )
+        except sqlite3.Error:
+            row = None
+        self._count(row is not None)
+        return decode_payload(row[0]) if row else None
+
+    def put(self, key: str, model: str, kind: str, response: str):
+        """Store a response, then evict least recently used entries beyond max_bytes"""
+        payload = encode_payload(response)
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        now = time.time()
+        try:
+            with self.pool.transaction() as conn:
+                conn.execute('''
+                    INSERT INTO llm_response_cache (cache_key, model, kind, response, size, created_at, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(cache_key) DO UPDATE SET
+                        response = excluded.response, size = excluded.size,
+                        created_at = excluded.created_at, last_used = excluded.last_used
+                ''', (key, model, kind, payload, len(payload), now, now))
+                self._evict(conn)
+        except sqlite3.Error:
+            pass  # a cache that cannot write just misses next time
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_response_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        conn.execute('''
+            DELETE FROM llm_response_cache WHERE cache_key IN (
+                SELECT cache_key FROM (
+                    SELECT cache_key, SUM(size) OVER (ORDER BY last_used DESC, cache_key) AS kept
+                    FROM llm_response_cache
+                ) WHERE kept > ?
+            )
+        ''', (self.max_bytes,))
+
+    def clear(self):
+        """Drop every cached response"""
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM llm_response_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Entries, stored bytes and this process's hit/miss counts"""
+        with self.pool.connection() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_response_cache"
+            ).fetchone()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
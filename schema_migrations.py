@@ -0,0 +1,114 @@
+import sqlite3
+import hashlib
+from typing import NamedTuple, Sequence, Callable, Optional
+
+
+class SchemaDriftError(RuntimeError):
+    """Raised when a migration the database already applied has since been edited"""
+
+
+class Migration(NamedTuple):
+    """One schema step; applied when ``PRAGMA user_version`` is below ``version``"""
+    version: int
+    description: str
+    statements: Sequence[str] = ()
+    upgrade: Optional[Callable[[sqlite3.Connection], None]] = None
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Read the schema version stored in the database header"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_version(migrations: Sequence[Migration]) -> int:
+    """Highest version in a migration list"""
+    return max((m.version for m in migrations), default=0)
+
+
+def schema_fingerprint(migrations: Sequence[Migration]) -> str:
+    """Stable hash of a migration list, so edits to any step change it"""
+    digest = hashlib.sha256()
+    for migration in sorted(migrations, key=lambda m: m.version):
+        digest.update(f"{migration.version}\0{migration.description}\0".encode())
+        for statement in migration.statements:
+            digest.update(" ".join(statement.split()).encode() + b"\0")
+        if migration.upgrade is not None:
+            digest.update(migration.upgrade.__qualname__.encode())
+    return digest.hexdigest()[:32]
+
+
+def _stored_fingerprint(conn: sqlite3.Connection) -> Optional[str]:
+    """Read the recorded fingerprint without taking a write lock"""
+    try:
+        row = conn.execute("SELECT value FROM schema_meta WHERE key = 'fingerprint'").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def _check_drift(conn: sqlite3.Connection, ordered: Sequence[Migration], current: int):
+    """Fail if the steps up to ``current`` differ from the ones that were applied.
+
+    Applied steps never run again, so an edit to one would otherwise be
+    silently ignored. The recorded fingerprint covers every step up to the
+    version it was written at, i.e. the database's current version.
+    """
+    stored = _stored_fingerprint(conn)
+    if stored is None:
+        return
+    applied = [m for m in ordered if m.version <= current]
+    if stored != schema_fingerprint(applied):
+        raise SchemaDriftError(
+            f"Migrations up to version {current} changed after they were applied; "
+            "add a new migration instead of editing an applied one"
+        )
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> int:
+    """Bring a database up to the newest migration and return its version.
+
+    Pending steps run in one ``BEGIN IMMEDIATE`` transaction, so a process that
+    races us either sees the old schema or the fully upgraded one; each step
+    bumps ``user_version`` so existing files are upgraded in place. The
+    migration list fingerprint is recorded in the same transaction.
+
+    Raises SchemaDriftError if an already-applied step has been edited.
+    """
+    ordered = sorted(migrations, key=lambda m: m.version)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = get_schema_version(conn)
+        _check_drift(conn, ordered, current)
+        for migration in ordered:
+            if migration.version <= current:
+                continue
+            for statement in migration.statements:
+                conn.execute(statement)
+            if migration.upgrade is not None:
+                migration.upgrade(conn)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            current = migration.version
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('fingerprint', ?)",
+            (schema_fingerprint(ordered),)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return current
+
+
+def ensure_schema(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> bool:
+    """Migrate only when the recorded fingerprint is stale.
+
+    When the database already carries the fingerprint of ``migrations`` this is
+    a single read with no write lock; returns True if any work was done.
+    Any other fingerprint goes through apply_migrations, which raises
+    SchemaDriftError when it comes from edited, already-applied steps.
+    """
+    if _stored_fingerprint(conn) == schema_fingerprint(migrations):
+        return False
+    apply_migrations(conn, migrations)
+    return True
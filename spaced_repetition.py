@@ -0,0 +1,186 @@
+import hashlib
+import json
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from exam_store import decode_payload, encode_payload, load_questions
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+CORRECT_QUALITY = 4
+INCORRECT_QUALITY = 1
+DEFAULT_REVIEW_LIMIT = 20
+
+# One card per distinct question a user has answered, keyed by card_key so
+# repeats across exams update the same card. Cards keep their own copy of
+# the question, so they outlive the exam that introduced them.
+REVIEW_CARDS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS review_cards (
+        card_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        topic_id INTEGER,
+        card_key TEXT NOT NULL,
+        question TEXT NOT NULL,
+        options TEXT NOT NULL,
+        correct_answer TEXT NOT NULL,
+        explanation TEXT,
+        ease REAL NOT NULL DEFAULT 2.5,
+        interval_days INTEGER NOT NULL DEFAULT 0,
+        repetitions INTEGER NOT NULL DEFAULT 0,
+        lapses INTEGER NOT NULL DEFAULT 0,
+        due DATE NOT NULL,
+        last_reviewed DATE,
+        UNIQUE (user_id, card_key)
+    )
+'''
+
+# Orders the due-card range user_id = ? AND due <= ? by due, then ease (and
+# card_id, the rowid), which is exactly the review ranking.
+REVIEW_CARDS_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_review_cards_due ON review_cards (user_id, due, ease)"
+)
+
+DUE_CARDS_QUERY = '''
+    SELECT card_id, topic_id, question, options, correct_answer, explanation,
+           ease, interval_days, repetitions, lapses, due
+    FROM review_cards
+    WHERE user_id = ? AND due <= ?
+    ORDER BY due, ease, card_id
+    LIMIT ?
+'''
+
+
+def sm2(ease: float, interval_days: int, repetitions: int, quality: int) -> tuple:
+    """Next (ease, interval_days, repetitions) after one SM-2 review graded 0-5"""
+    if not 0 <= quality <= 5:
+        raise ValueError("quality must be between 0 and 5")
+
+    if quality < 3:
+        repetitions, interval_days = 0, 1
+    else:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = max(round(interval_days * ease), interval_days + 1)
+        repetitions += 1
+
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return ease, interval_days, repetitions
+
+
+def card_key(question: str, options: List[str]) -> str:
+    """Stable identity of a question, independent of option order"""
+    payload = json.dumps([question.strip(), sorted(options or [])])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _apply_review(conn: sqlite3.Connection, user_id: int, topic_id: Optional[int], question: Dict[str, Any],
+                  quality: int, day: date):
+    key = card_key(question['question'], question.get('options', []))
+    row = conn.execute(
+        "SELECT ease, interval_days, repetitions FROM review_cards WHERE user_id = ? AND card_key = ?",
+        (user_id, key)
+    ).fetchone()
+    ease, interval_days, repetitions = sm2(*(tuple(row) if row else (DEFAULT_EASE, 0, 0)), quality)
+
+    conn.execute('''
+        INSERT INTO review_cards (user_id, topic_id, card_key, question, options, correct_answer, explanation,
+                                  ease, interval_days, repetitions, lapses, due, last_reviewed)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, card_key) DO UPDATE SET
+            ease = excluded.ease, interval_days = excluded.interval_days, repetitions = excluded.repetitions,
+            lapses = lapses + excluded.lapses, due = excluded.due, last_reviewed = excluded.last_reviewed
+    ''', (
+        user_id, topic_id, key, question['question'], encode_payload(json.dumps(question.get('options', []))),
+        question['correct_answer'], encode_payload(question.get('explanation') or ''),
+        ease, interval_days, repetitions, int(quality < 3),
+        (day + timedelta(days=interval_days)).isoformat(), day.isoformat()
+    ))
+
+
+def schedule_exam_answers(conn: sqlite3.Connection, user_id: int, topic_id: Optional[int], exam_id: int,
+                          day: Optional[date] = None) -> int:
+    """Turn each answered question of a graded exam into a review; returns cards touched"""
+    day = day or date.today()
+    questions = [q for q in load_questions(conn, exam_id, include_answers=True) if q['user_answer'] is not None]
+    for question in questions:
+        quality = CORRECT_QUALITY if question['user_answer'] == question['correct_answer'] else INCORRECT_QUALITY
+        _apply_review(conn, user_id, topic_id, question, quality, day)
+    return len(questions)
+
+
+def review_card(conn: sqlite3.Connection, user_id: int, card_id: int, quality: int,
+                day: Optional[date] = None) -> Optional[str]:
+    """Grade one review of a card; returns its next due date, or None if not found"""
+    day = day or date.today()
+    row = conn.execute(
+        "SELECT ease, interval_days, repetitions FROM review_cards WHERE card_id = ? AND user_id = ?",
+        (card_id, user_id)
+    ).fetchone()
+    if not row:
+        return None
+
+    ease, interval_days, repetitions = sm2(*tuple(row), quality)
+    due = (day + timedelta(days=interval_days)).isoformat()
+    conn.execute('''
+        UPDATE review_cards
+        SET ease = ?, interval_days = ?, repetitions = ?, lapses = lapses + ?, due = ?, last_reviewed = ?
+        WHERE card_id = ?
+    ''', (ease, interval_days, repetitions, int(quality < 3), due, day.isoformat(), card_id))
+    return due
+
+
+def due_cards(conn: sqlite3.Connection, user_id: int, limit: int = DEFAULT_REVIEW_LIMIT,
+              day: Optional[date] = None) -> List[Dict[str, Any]]:
+    """The ``limit`` most urgent due cards: most overdue first, then lowest ease.
+
+    The ordering matches idx_review_cards_due, so SQLite walks the index
+    range in order and stops after ``limit`` cards; the cost does not grow
+    with the number of due cards.
+    """
+    day = day or date.today()
+    rows = conn.execute(DUE_CARDS_QUERY, (user_id, day.isoformat(), limit)).fetchall()
+    return [{
+        'card_id': r[0],
+        'topic_id': r[1],
+        'question': r[2],
+        'options': json.loads(decode_payload(r[3])),
+        'correct_answer': r[4],
+        'explanation': decode_payload(r[5]),
+        'ease': r[6],
+        'interval_days': r[7],
+        'repetitions': r[8],
+        'lapses': r[9],
+        'due': r[10]
+    } for r in rows]
+
+
+def due_count(conn: sqlite3.Connection, user_id: int, day: Optional[date] = None) -> int:
+    """Number of cards due on or before ``day``"""
+    day = day or date.today()
+    return conn.execute(
+        "SELECT COUNT(*) FROM review_cards WHERE user_id = ? AND due <= ?",
+        (user_id, day.isoformat())
+    ).fetchone()[0]
+
+
+def backfill_review_cards(conn: sqlite3.Connection, exam_taken: str) -> int:
+    """Replay every graded exam, oldest first, into review_cards.
+
+    ``exam_taken`` is a predicate template such as user_stats.EXAM_TAKEN_FLAG.
+    """
+    rows = conn.execute(
+        f"SELECT exam_id, user_id, topic_id, exam_date FROM exams WHERE {exam_taken.format(row='exams')} "
+        "ORDER BY exam_date, exam_id"
+    ).fetchall()
+
+    for exam_id, user_id, topic_id, exam_date in rows:
+        try:
+            day = datetime.strptime(str(exam_date)[:10], '%Y-%m-%d').date()
+        except ValueError:
+            day = date.today()
+        schedule_exam_answers(conn, user_id, topic_id, exam_id, day)
+    return len(rows)
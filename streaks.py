@@ -0,0 +1,134 @@
+import sqlite3
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+# current_streak is the length of the run of active days ending at
+# last_active_date; whether it is still alive is decided when it is read.
+STREAK_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS user_streaks (
+        user_id INTEGER PRIMARY KEY,
+        current_streak INTEGER NOT NULL DEFAULT 0,
+        longest_streak INTEGER NOT NULL DEFAULT 0,
+        last_active_date DATE
+    )
+'''
+
+
+def record_active_day(conn: sqlite3.Connection, user_id: int, day: Optional[date] = None):
+    """Extend or restart a user's streak for an active day; idempotent per day"""
+    day = day or date.today()
+    row = conn.execute(
+        "SELECT current_streak, longest_streak, last_active_date FROM user_streaks WHERE user_id = ?",
+        (user_id,)
+    ).fetchone()
+
+    if row is None or row[2] is None:
+        current, longest = 1, max(1, row[1] if row else 0)
+    else:
+        last = date.fromisoformat(row[2])
+        if day <= last:
+            # Same day, or a late write for a day already behind us
+            return
+        current = row[0] + 1 if day - last == timedelta(days=1) else 1
+        longest = max(row[1], current)
+
+    conn.execute('''
+        INSERT INTO user_streaks (user_id, current_streak, longest_streak, last_active_date)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            current_streak = excluded.current_streak,
+            longest_streak = excluded.longest_streak,
+            last_active_date = excluded.last_active_date
+    ''', (user_id, current, longest, day.isoformat()))
+
+
+def read_streak(conn: sqlite3.Connection, user_id: int, grace_days: int = 0,
+                today: Optional[date] = None) -> Dict[str, Any]:
+    """Single-row streak read.
+
+    The stored run counts as current while its last day is at most
+    ``grace_days`` before today; otherwise the current streak is 0.
+    """
+    today = today or date.today()
+    row = conn.execute(
+        "SELECT current_streak, longest_streak, last_active_date FROM user_streaks WHERE user_id = ?",
+        (user_id,)
+    ).fetchone()
+    if row is None or row[2] is None:
+        return {'current_streak': 0, 'longest_streak': 0, 'last_active_date': None}
+
+    alive = 0 <= (today - date.fromisoformat(row[2])).days <= grace_days
+    return {
+        'current_streak': row[0] if alive else 0,
+        'longest_streak': row[1],
+        'last_active_date': row[2]
+    }
+
+
+def backfill_streaks(conn: sqlite3.Connection, activity_table: str) -> int:
+    """Recompute user_streaks from an activity table in one ordered pass"""
+    conn.execute("DELETE FROM user_streaks")
+    rows = conn.execute(
+        f"SELECT DISTINCT user_id, activity_date FROM {activity_table} "
+        "WHERE activity_date IS NOT NULL ORDER BY user_id, activity_date"
+    )
+
+    streaks = {}
+    for user_id, day_str in rows:
+        try:
+            day = date.fromisoformat(day_str)
+        except (TypeError, ValueError):
+            continue
+        current, longest, last = streaks.get(user_id, (0, 0, None))
+        current = current + 1 if last is not None and day - last == timedelta(days=1) else 1
+        streaks[user_id] = (current, max(longest, current), day)
+
+    conn.executemany(
+        "INSERT INTO user_streaks (user_id, current_streak, longest_streak, last_active_date) VALUES (?, ?, ?, ?)",
+        [(user_id, current, longest, last.isoformat()) for user_id, (current, longest, last) in streaks.items()]
+    )
+    return len(streaks)
+
+
+def streak_history(conn: sqlite3.Connection, activity_table: str, user_id: int) -> Dict[str, Any]:
+    """Every streak run plus per-month coverage, computed set-based in SQL.
+
+    Consecutive days share ``julianday(day) - row_number``, so grouping on
+    that difference yields one row per run (gaps and islands).
+    """
+    days = f"SELECT DISTINCT activity_date AS day FROM {activity_table} WHERE user_id = ? AND activity_date IS NOT NULL"
+
+    runs = [
+        {'start': r[0], 'end': r[1], 'length': r[2]}
+        for r in conn.execute(f'''
+            WITH days AS ({days}),
+            islands AS (
+                SELECT day, julianday(day) - ROW_NUMBER() OVER (ORDER BY day) AS grp
+                FROM days
+            )
+            SELECT MIN(day), MAX(day), COUNT(*)
+            FROM islands
+            GROUP BY grp
+            ORDER BY MIN(day)
+        ''', (user_id,))
+    ]
+
+    months = [
+        {'month': r[0], 'active_days': r[1], 'days_in_month': r[2], 'coverage': r[1] / r[2]}
+        for r in conn.execute(f'''
+            WITH days AS ({days})
+            SELECT strftime('%Y-%m', day) AS month,
+                   COUNT(*),
+                   CAST(strftime('%d', MIN(day), 'start of month', '+1 month', '-1 day') AS INTEGER)
+            FROM days
+            GROUP BY month
+            ORDER BY month
+        ''', (user_id,))
+    ]
+
+    return {
+        'runs': runs,
+        'run_count': len(runs),
+        'longest_streak': max((run['length'] for run in runs), default=0),
+        'monthly_coverage': months
+    }
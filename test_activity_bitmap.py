@@ -0,0 +1,86 @@
+"""
+Unit Tests for Activity Bitmaps
+Tests bit operations, the year heatmap layout and the backfill job.
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+from datetime import date
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from activity_bitmap import (
+    ACTIVITY_BITMAP_SCHEMA, BITMAP_BYTES, activity_flags, backfill_bitmaps, load_year,
+    empty_heatmap, mark_active_day, popcount, to_bytes, union, year_heatmap
+)
+
+
+class TestActivityBitmap(unittest.TestCase):
+    """Test suite for the activity_bitmaps helpers."""
+
+    def setUp(self):
+        """Create an in-memory database with the bitmap table."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(ACTIVITY_BITMAP_SCHEMA)
+
+    def tearDown(self):
+        """Close the connection."""
+        self.conn.close()
+
+    def test_mark_sets_one_bit_per_day(self):
+        """Test that repeated marks of a day count once."""
+        for day in (date(2024, 1, 1), date(2024, 1, 1), date(2024, 12, 31)):
+            mark_active_day(self.conn, 1, day)
+
+        bitmap = load_year(self.conn, 1, 2024)
+        self.assertEqual(len(bitmap), BITMAP_BYTES)
+        self.assertEqual(popcount(bitmap), 2)
+
+    def test_union_and_popcount(self):
+        """Test combining bitmaps."""
+        self.assertEqual(popcount(union([to_bytes(0b1011), to_bytes(0b0110)])), 4)
+
+    def test_flags_across_year_boundary(self):
+        """Test per-day flags for a range spanning two years."""
+        mark_active_day(self.conn, 1, date(2023, 12, 31))
+        mark_active_day(self.conn, 1, date(2024, 1, 2))
+
+        flags = activity_flags(self.conn, 1, date(2023, 12, 30), date(2024, 1, 2))
+        self.assertEqual(flags, [False, True, False, True])
+
+    def test_year_heatmap_layout(self):
+        """Test week columns, padding and weekly counts."""
+        # 2023 starts on a Sunday, so the first column has six padding cells
+        mark_active_day(self.conn, 1, date(2023, 1, 1))
+        mark_active_day(self.conn, 1, date(2023, 1, 2))
+        mark_active_day(self.conn, 1, date(2023, 1, 4))
+
+        heatmap = year_heatmap(self.conn, 1, 2023)
+        self.assertEqual(heatmap['weeks'][0], [None] * 6 + [1])
+        self.assertEqual(heatmap['weeks'][1], [1, 0, 1, 0, 0, 0, 0])
+        self.assertEqual(heatmap['weekly_counts'][:2], [1, 2])
+        self.assertEqual(heatmap['active_days'], 3)
+        self.assertEqual(heatmap['total_days'], 365)
+        self.assertEqual(sum(cell is not None for week in heatmap['weeks'] for cell in week), 365)
+
+    def test_empty_heatmap_matches_idle_user(self):
+        """Test that the empty heatmap has the same layout as a user without activity."""
+        self.assertEqual(empty_heatmap(2024), year_heatmap(self.conn, 99, 2024))
+
+    def test_backfill_from_activity_table(self):
+        """Test rebuilding bitmaps from raw activity rows."""
+        self.conn.execute("CREATE TABLE activity (user_id INTEGER, activity_date DATE)")
+        self.conn.executemany("INSERT INTO activity VALUES (?, ?)", [
+            (1, '2023-06-01'), (1, '2023-06-01'), (1, '2024-02-29'), (2, '2024-01-01')
+        ])
+
+        self.assertEqual(backfill_bitmaps(self.conn, 'activity'), 3)
+        self.assertEqual(popcount(load_year(self.conn, 1, 2023)), 1)
+        self.assertEqual(activity_flags(self.conn, 1, date(2024, 2, 28), date(2024, 3, 1)), [False, True, False])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
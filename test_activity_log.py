@@ -0,0 +1,84 @@
+"""
+Unit Tests for the Activity Event Log
+Tests typed event recording, incremental rollups and legacy import.
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+from datetime import date
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from activity_log import (
+    ACTIVITY_EVENTS_SCHEMA, ACTIVITY_ROLLUPS_SCHEMA, import_legacy_activity, period_start, read_rollups,
+    rebuild_rollups, record_event
+)
+
+
+class TestActivityLog(unittest.TestCase):
+    """Test suite for activity_events and activity_rollups."""
+
+    def setUp(self):
+        """Create an in-memory database with the event tables."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(ACTIVITY_EVENTS_SCHEMA)
+        self.conn.execute(ACTIVITY_ROLLUPS_SCHEMA)
+
+    def tearDown(self):
+        """Close the connection."""
+        self.conn.close()
+
+    def _counts(self, period, **kwargs):
+        return [(r['period_start'], r['activity_type'], r['count'])
+                for r in read_rollups(self.conn, 1, period, **kwargs)]
+
+    def test_period_start(self):
+        """Test bucket boundaries for each period."""
+        day = date(2024, 5, 16)  # a Thursday
+        self.assertEqual(period_start(day, 'day'), day)
+        self.assertEqual(period_start(day, 'week'), date(2024, 5, 13))
+        self.assertEqual(period_start(day, 'month'), date(2024, 5, 1))
+        with self.assertRaises(ValueError):
+            period_start(day, 'year')
+
+    def test_every_event_is_counted_by_type(self):
+        """Test that repeated events on one day all reach the rollups."""
+        record_event(self.conn, 1, 'add_task', date(2024, 5, 13))
+        record_event(self.conn, 1, 'add_task', date(2024, 5, 13))
+        record_event(self.conn, 1, 'complete_exam', date(2024, 5, 19))
+        record_event(self.conn, 1, 'add_task', date(2024, 6, 1))
+
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM activity_events").fetchone()[0], 4)
+        self.assertEqual(self._counts('week'), [
+            ('2024-05-13', 'add_task', 2), ('2024-05-13', 'complete_exam', 1), ('2024-05-27', 'add_task', 1)
+        ])
+        self.assertEqual(self._counts('month', activity_type='add_task'), [
+            ('2024-05-01', 'add_task', 2), ('2024-06-01', 'add_task', 1)
+        ])
+        self.assertEqual(self._counts('day', since=date(2024, 5, 14)), [
+            ('2024-05-19', 'complete_exam', 1), ('2024-06-01', 'add_task', 1)
+        ])
+
+    def test_rebuild_matches_incremental(self):
+        """Test that rebuilding from the log reproduces the rollups."""
+        for day in (date(2024, 1, 31), date(2024, 2, 1), date(2024, 2, 1)):
+            record_event(self.conn, 1, 'update_progress', day)
+        before = self.conn.execute("SELECT * FROM activity_rollups ORDER BY 1, 2, 3, 4").fetchall()
+
+        rebuild_rollups(self.conn)
+        self.assertEqual(self.conn.execute("SELECT * FROM activity_rollups ORDER BY 1, 2, 3, 4").fetchall(), before)
+
+    def test_import_legacy_counters(self):
+        """Test seeding events from a table that only kept daily counters."""
+        self.conn.execute("CREATE TABLE legacy (user_id INTEGER, activity_date DATE, activity_count INTEGER)")
+        self.conn.executemany("INSERT INTO legacy VALUES (?, ?, ?)", [(1, '2024-03-04', 3), (1, '2024-03-05', 1)])
+
+        import_legacy_activity(self.conn, "SELECT user_id, NULL, activity_date, activity_count FROM legacy")
+        self.assertEqual(self._counts('week'), [('2024-03-04', 'activity', 4)])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
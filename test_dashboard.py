@@ -0,0 +1,142 @@
+"""
+Unit Tests for the Dashboard Summary
+Tests the aggregated counts returned by get_dashboard_summary and the
+activity views shared by both layers.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+# Mock torch and transformers
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from datetime import date
+
+from enhanced_app_logic import EnhancedAppLogic
+from enhanced_database_manager import EnhancedDatabaseManager
+
+
+class AppLogicTestCase(unittest.TestCase):
+    """Logged-in app logic on a temporary database, without Ollama."""
+
+    def setUp(self):
+        """Create a logged-in user on a temporary database."""
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix='.db')
+        self.app_logic = EnhancedAppLogic(db_path=self.test_db_path)
+        if self.app_logic.ollama:
+            self.app_logic.ollama.close()
+        self.app_logic.ollama = None
+
+        self.app_logic.register_user("testuser", "testpass123", "test@example.com")
+        self.app_logic.login_user("testuser", "testpass123")
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.app_logic.close()
+        os.close(self.test_db_fd)
+        os.unlink(self.test_db_path)
+
+
+class TestDashboardSummary(AppLogicTestCase):
+    """Test suite for get_dashboard_summary."""
+
+    def _seed(self):
+        self.app_logic.add_subtopic("Heaps", "CS")
+        self.app_logic.add_subtopic("Limits", "Math")
+        topics = {t['topic_name']: t['topic_id'] for t in self.app_logic.get_user_subtopics()}
+        self.app_logic.update_topic_progress(topics["Heaps"], 40)
+        self.app_logic.update_topic_progress(topics["Limits"], 80)
+
+        for text in ("Read chapter", "Do exercises", "Review notes"):
+            self.app_logic.add_task(text)
+        self.app_logic.toggle_task(self.app_logic.get_tasks()[0]['task_id'])
+
+        self.app_logic.add_goal("Finish heaps")
+        self.app_logic.add_goal("Pass calculus")
+        self.app_logic.toggle_goal(self.app_logic.get_user_goals()[0]['goal_id'])
+
+        _, _, graded = self.app_logic.start_exam(topics["Heaps"], 3, 'easy')
+        self.app_logic.start_exam(topics["Limits"], 3, 'easy')
+        self.app_logic.submit_exam(graded, {0: 'A'})
+
+    def test_summary_counts(self):
+        """Test that the summary matches the seeded rows."""
+        self._seed()
+        self.assertEqual(self.app_logic.get_dashboard_summary(), {
+            'topic_count': 2,
+            'average_progress': 60,
+            'exams_taken': 1,
+            'pending_tasks': 2,
+            'completed_goals': 1,
+            'current_streak': 1
+        })
+
+    def test_summary_new_user(self):
+        """Test that a user without data gets zeros apart from today's login."""
+        summary = self.app_logic.get_dashboard_summary()
+        self.assertEqual(summary['topic_count'], 0)
+        self.assertEqual(summary['average_progress'], 0)
+        self.assertEqual(summary['current_streak'], 1)
+
+    def test_summary_no_user(self):
+        """Test that logged-out callers get the all-zero summary."""
+        self._seed()
+        self.app_logic.logout_user()
+        summary = self.app_logic.get_dashboard_summary()
+        self.assertEqual(set(summary.values()), {0})
+        self.assertEqual(len(summary), 6)
+
+
+class TestActivityViews(AppLogicTestCase):
+    """Test that both layers return the same activity shapes."""
+
+    def setUp(self):
+        """Also open a database manager with a user active today."""
+        super().setUp()
+        self.manager_db_fd, self.manager_db_path = tempfile.mkstemp(suffix='.db')
+        self.db_manager = EnhancedDatabaseManager(db_name=self.manager_db_path)
+        self.db_manager.create_user("manager", "testpass123", "manager@example.com")
+        self.manager_user_id = self.db_manager.get_user_by_username("manager")['user_id']
+        self.db_manager.update_streak(self.manager_user_id)
+
+    def tearDown(self):
+        """Close the manager too."""
+        self.db_manager.close()
+        os.close(self.manager_db_fd)
+        os.unlink(self.manager_db_path)
+        super().tearDown()
+
+    def test_recent_activity_shape(self):
+        """Test that both layers return date/active dicts, oldest first."""
+        expected = [
+            {'date': date.fromordinal(date.today().toordinal() - 2).isoformat(), 'active': False},
+            {'date': date.fromordinal(date.today().toordinal() - 1).isoformat(), 'active': False},
+            {'date': date.today().isoformat(), 'active': True}
+        ]
+        self.assertEqual(self.app_logic.get_recent_activity(3), expected)
+        self.assertEqual(self.db_manager.get_recent_activity(self.manager_user_id, days=3), expected)
+
+        self.app_logic.logout_user()
+        self.assertEqual(self.app_logic.get_recent_activity(3), [dict(d, active=False) for d in expected])
+
+    def test_heatmap_shape(self):
+        """Test that both layers return the same heatmap, also without a user."""
+        app_heatmap = self.app_logic.get_activity_heatmap()
+        self.assertEqual(app_heatmap, self.db_manager.get_activity_heatmap(self.manager_user_id))
+        self.assertEqual(app_heatmap['active_days'], 1)
+
+        self.app_logic.logout_user()
+        heatmap = self.app_logic.get_activity_heatmap()
+        self.assertEqual(set(heatmap), set(app_heatmap))
+        self.assertEqual(heatmap['active_days'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,181 @@
+"""
+Unit Tests for ConnectionPool
+Tests connection reuse, pool bounds, health checks, transactions and shutdown.
+"""
+
+import unittest
+import os
+import sqlite3
+import tempfile
+import threading
+import sys
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from db_pool import ConnectionPool, PoolClosedError
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Test suite for the ConnectionPool class."""
+
+    def setUp(self):
+        """Create a temporary database and pool."""
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix='.db')
+        self.pool = ConnectionPool(self.test_db_path, size=2, timeout=0.5)
+        with self.pool.transaction() as conn:
+            conn.execute("CREATE TABLE items (item_id INTEGER PRIMARY KEY, name TEXT)")
+
+    def tearDown(self):
+        """Close the pool and remove the database."""
+        self.pool.close()
+        try:
+            os.close(self.test_db_fd)
+            os.unlink(self.test_db_path)
+        except Exception:
+            pass
+
+    def test_connection_is_reused(self):
+        """Test that a released connection is handed out again."""
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+
+    def test_foreign_keys_enabled(self):
+        """Test that pooled connections enforce foreign keys."""
+        with self.pool.connection() as conn:
+            enabled = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        self.assertEqual(enabled, 1)
+
+    def test_pool_is_bounded(self):
+        """Test that checkouts beyond the pool size time out."""
+        a = self.pool.acquire()
+        b = self.pool.acquire()
+        with self.assertRaises(TimeoutError):
+            self.pool.acquire(timeout=0.1)
+        self.pool.release(a)
+        self.pool.release(b)
+
+    def test_waiter_receives_released_connection(self):
+        """Test that a blocked checkout is served when a connection returns."""
+        a = self.pool.acquire()
+        b = self.pool.acquire()
+        received = []
+
+        def waiter():
+            conn = self.pool.acquire(timeout=2)
+            received.append(conn)
+            self.pool.release(conn)
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        self.pool.release(a)
+        thread.join()
+        self.pool.release(b)
+        self.assertIs(received[0], a)
+
+    def test_transaction_commits(self):
+        """Test that a successful transaction is committed."""
+        with self.pool.transaction() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('a')")
+
+        with self.pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_transaction_rolls_back_on_error(self):
+        """Test that a failed transaction is rolled back."""
+        with self.assertRaises(ValueError):
+            with self.pool.transaction() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('a')")
+                raise ValueError("boom")
+
+        with self.pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_nested_transactions_share_one_commit(self):
+        """Test that an inner transaction joins the outer unit of work."""
+        with self.pool.transaction() as outer:
+            outer.execute("INSERT INTO items (name) VALUES ('a')")
+            with self.pool.transaction() as inner:
+                self.assertIs(inner, outer)
+                inner.execute("INSERT INTO items (name) VALUES ('b')")
+            self.assertTrue(outer.in_transaction)
+
+        with self.pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        self.assertEqual(count, 2)
+
+    def test_nested_failure_rolls_back_whole_unit(self):
+        """Test that an error after a nested block discards all its writes."""
+        with self.assertRaises(ValueError):
+            with self.pool.transaction() as outer:
+                with self.pool.transaction() as inner:
+                    inner.execute("INSERT INTO items (name) VALUES ('a')")
+                raise ValueError("boom")
+
+        with self.pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        self.assertEqual(count, 0)
+        self.assertFalse(self.pool.in_transaction)
+
+    def test_swallowed_nested_failure_keeps_outer_writes_only(self):
+        """Test that a nested block that fails halfway leaves none of its writes behind."""
+        with self.pool.transaction() as outer:
+            outer.execute("INSERT INTO items (name) VALUES ('outer')")
+            try:
+                with self.pool.transaction() as inner:
+                    inner.execute("INSERT INTO items (name) VALUES ('partial')")
+                    raise ValueError("halfway")
+            except ValueError:
+                pass
+            self.assertTrue(outer.in_transaction)
+
+        with self.pool.connection() as conn:
+            names = [r[0] for r in conn.execute("SELECT name FROM items")]
+        self.assertEqual(names, ['outer'])
+
+    def test_nested_block_before_any_write_commits_with_outer(self):
+        """Test that a nested block opened before the first write does not commit on its own."""
+        with self.assertRaises(ValueError):
+            with self.pool.transaction():
+                with self.pool.transaction() as inner:
+                    inner.execute("INSERT INTO items (name) VALUES ('a')")
+                raise ValueError("boom")
+
+        with self.pool.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_unhealthy_connection_is_replaced(self):
+        """Test that a broken idle connection is discarded on checkout."""
+        self.pool.health_check_interval = 0
+        with self.pool.connection() as conn:
+            pass
+        conn.close()
+
+        with self.pool.connection() as fresh:
+            self.assertIsNot(fresh, conn)
+            fresh.execute("SELECT 1")
+
+    def test_close_refuses_checkout(self):
+        """Test that a closed pool raises on checkout."""
+        self.pool.close()
+        self.assertTrue(self.pool.closed)
+        with self.assertRaises(PoolClosedError):
+            self.pool.acquire()
+
+    def test_row_factory_applied(self):
+        """Test that the configured row factory is set on new connections."""
+        pool = ConnectionPool(self.test_db_path, row_factory=sqlite3.Row)
+        with pool.connection() as conn:
+            row = conn.execute("SELECT 1 AS one").fetchone()
+        pool.close()
+        self.assertEqual(row['one'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
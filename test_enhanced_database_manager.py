@@ -7,13 +7,15 @@ import unittest
 import os
 import tempfile
 import json
-from datetime import date
+from datetime import date, timedelta
 import sys
 
 # Add project directory to path
 sys.path.insert(0, '/mnt/project')
 
 from enhanced_database_manager import EnhancedDatabaseManager
+from exam_store import PAYLOAD_MAGIC
+from bulk_ops import insert_rows
 
 
 class TestEnhancedDatabaseManager(unittest.TestCase):
@@ -158,6 +160,17 @@ class TestEnhancedDatabaseManager(unittest.TestCase):
         subtopics = self.db_manager.get_subtopics_by_user(self.test_user_id)
         self.assertEqual(subtopics[0]['progress'], 75)
     
+    def test_progress_history_follows_updates(self):
+        """Test that each progress change is appended to the history."""
+        self.db_manager.add_subtopic(self.test_user_id, "Graphs", "Computer Science")
+        topic_id = self.db_manager.get_subtopics_by_user(self.test_user_id)[0]['topic_id']
+        
+        for progress in (20, 20, 45, 80):
+            self.db_manager.update_subtopic_progress(topic_id, progress)
+        
+        history = self.db_manager.get_progress_history(topic_id)
+        self.assertEqual([p['progress'] for p in history], [20, 45, 80])
+    
     # ========== EXAM TESTS ==========
     
     def test_create_exam_success(self):
@@ -263,6 +276,90 @@ class TestEnhancedDatabaseManager(unittest.TestCase):
         self.assertEqual(len(history), 1)
         self.assertEqual(history[0]['score'], 100.0)
     
+    def test_exam_questions_stored_as_rows(self):
+        """Test that questions and answers live in exam_questions."""
+        questions = [
+            {'question': 'Q1?', 'options': ['a', 'b', 'c', 'd'], 'correct_answer': 'A', 'explanation': 'E1'},
+            {'question': 'Q2?', 'options': ['a', 'b', 'c', 'd'], 'correct_answer': 'D', 'explanation': 'E2'}
+        ]
+        exam_id = self.db_manager.create_exam(self.test_user_id, None, questions)
+        self.db_manager.submit_exam(exam_id, {'1': 'D'})
+        
+        with self.db_manager.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT position, user_answer FROM exam_questions WHERE exam_id = ? ORDER BY position",
+                (exam_id,)
+            ).fetchall()
+        self.assertEqual([tuple(r) for r in rows], [(0, None), (1, 'D')])
+        
+        exam = self.db_manager.get_exam_by_id(exam_id)
+        self.assertEqual(exam['questions'], questions)
+        self.assertEqual(exam['user_answers'], {'1': 'D'})
+        self.assertEqual(exam['score'], 50.0)
+    
+    def test_exam_analytics_refresh_after_submit(self):
+        """Test that submitting an exam invalidates cached analytics."""
+        questions = [{'question': 'Q?', 'options': ['a', 'b'], 'correct_answer': 'A', 'explanation': ''}]
+        first = self.db_manager.create_exam(self.test_user_id, None, questions)
+        self.db_manager.submit_exam(first, {'0': 'B'})
+        self.assertEqual(self.db_manager.get_exam_analytics(self.test_user_id)['overall']['attempts'], 1)
+        
+        second = self.db_manager.create_exam(self.test_user_id, None, questions)
+        self.db_manager.submit_exam(second, {'0': 'A'})
+        analytics = self.db_manager.get_exam_analytics(self.test_user_id)
+        self.assertEqual(analytics['overall']['attempts'], 2)
+        self.assertAlmostEqual(analytics['topics'][0]['slope'], 100.0)
+    
+    def test_exam_stats_follow_submissions(self):
+        """Test that submit_exam keeps the cached exam stats current."""
+        self.db_manager.add_subtopic(self.test_user_id, "Arrays", "DSA")
+        questions = [{'question': 'Q?', 'options': ['a', 'b'], 'correct_answer': 'A', 'explanation': ''}]
+        first = self.db_manager.create_exam(self.test_user_id, 1, questions)
+        self.db_manager.submit_exam(first, {'0': 'B'})
+        second = self.db_manager.create_exam(self.test_user_id, None, questions)
+        self.db_manager.submit_exam(second, {'0': 'A'})
+        self.db_manager.submit_exam(first, {'0': 'A'})
+        
+        stats = self.db_manager.get_exam_stats(self.test_user_id)
+        self.assertEqual((stats['exam_count'], stats['best_score']), (2, 100.0))
+        self.assertEqual(stats['by_subject']['DSA']['recent_scores'], [100.0])
+        self.assertEqual(self.db_manager.rebuild_exam_stats(), 3)
+        self.assertEqual(self.db_manager.get_exam_stats(self.test_user_id), stats)
+    
+    def test_submitted_answers_become_review_cards(self):
+        """Test that graded questions are scheduled for review."""
+        questions = [
+            {'question': 'Q1?', 'options': ['a', 'b'], 'correct_answer': 'A', 'explanation': ''},
+            {'question': 'Q2?', 'options': ['a', 'b'], 'correct_answer': 'B', 'explanation': ''}
+        ]
+        exam_id = self.db_manager.create_exam(self.test_user_id, None, questions)
+        self.db_manager.submit_exam(exam_id, {'0': 'A', '1': 'A'})
+        
+        self.assertEqual(self.db_manager.get_due_review_count(self.test_user_id), 0)
+        with self.db_manager.pool.transaction() as conn:
+            conn.execute("UPDATE review_cards SET due = ?", (date.today().isoformat(),))
+        cards = self.db_manager.get_due_reviews(self.test_user_id)
+        self.assertEqual([c['question'] for c in cards], ['Q2?', 'Q1?'])
+        
+        self.db_manager.review_card(self.test_user_id, cards[0]['card_id'], 5)
+        self.assertEqual(self.db_manager.get_due_review_count(self.test_user_id), 1)
+        with self.assertRaises(ValueError):
+            self.db_manager.review_card(self.test_user_id + 1, cards[0]['card_id'], 5)
+    
+    def test_long_explanations_stored_compressed(self):
+        """Test that bulky payloads are compressed and decoded on read."""
+        explanation = "Arrays store elements contiguously. " * 40
+        questions = [{'question': 'Q?', 'options': ['a', 'b'], 'correct_answer': 'A', 'explanation': explanation}]
+        exam_id = self.db_manager.create_exam(self.test_user_id, None, questions)
+        
+        with self.db_manager.pool.connection() as conn:
+            stored = conn.execute(
+                "SELECT explanation FROM exam_questions WHERE exam_id = ?", (exam_id,)
+            ).fetchone()[0]
+        self.assertTrue(stored.startswith(PAYLOAD_MAGIC))
+        self.assertLess(len(stored), len(explanation))
+        self.assertEqual(self.db_manager.get_exam_by_id(exam_id)['questions'], questions)
+    
     # ========== TASK TESTS ==========
     
     def test_add_task_success(self):
@@ -350,6 +447,32 @@ class TestEnhancedDatabaseManager(unittest.TestCase):
         streak = self.db_manager.get_current_streak(self.test_user_id)
         self.assertEqual(streak, 1)
     
+    def test_streak_summary_after_backfill(self):
+        """Test that backfilled streaks count a run ending yesterday."""
+        today = date.today()
+        with self.db_manager.pool.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO activity_streak (user_id, activity_date) VALUES (?, ?)",
+                [(self.test_user_id, (today - timedelta(days=d)).isoformat()) for d in (1, 2, 3, 6)]
+            )
+        self.db_manager.backfill_streaks()
+        
+        summary = self.db_manager.get_streak_summary(self.test_user_id)
+        self.assertEqual(summary['current_streak'], 3)
+        self.assertEqual(summary['longest_streak'], 3)
+        
+        self.db_manager.update_streak(self.test_user_id)
+        self.assertEqual(self.db_manager.get_current_streak(self.test_user_id), 4)
+    
+    def test_recent_activity_and_heatmap(self):
+        """Test that update_streak marks today in the activity bitmap."""
+        self.db_manager.update_streak(self.test_user_id)
+        
+        recent = self.db_manager.get_recent_activity(self.test_user_id, days=3)
+        self.assertEqual([r['active'] for r in recent], [False, False, True])
+        self.assertEqual(recent[-1]['date'], date.today().isoformat())
+        self.assertEqual(self.db_manager.get_activity_heatmap(self.test_user_id)['active_days'], 1)
+    
     # ========== CODE SNIPPET TESTS ==========
     
     def test_save_snippet(self):
@@ -392,6 +515,180 @@ class TestEnhancedDatabaseManager(unittest.TestCase):
         self.assertEqual(len(python_snippets), 1)
         self.assertEqual(python_snippets[0]['language'], "python")
 
+    
+    # ========== BULK INSERT TESTS ==========
+    
+    def test_add_tasks_bulk_returns_ids(self):
+        """Test that bulk task insert returns one id per row."""
+        result = self.db_manager.add_tasks_bulk(self.test_user_id, [
+            {'task_text': 'Read chapter 1', 'due_date': '2025-09-01', 'priority': 'high'},
+            {'task_text': 'Read chapter 2'},
+            {'task_text': 'Read chapter 3', 'priority': 'low'}
+        ])
+        
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(len(result['ids']), 3)
+        
+        tasks = {t['task_id']: t['task_text'] for t in self.db_manager.get_tasks(self.test_user_id)}
+        self.assertEqual(tasks[result['ids'][1]], 'Read chapter 2')
+    
+    def test_add_tasks_bulk_reports_invalid_rows(self):
+        """Test that invalid rows are reported without aborting the batch."""
+        result = self.db_manager.add_tasks_bulk(self.test_user_id, [
+            {'task_text': 'Valid'},
+            {'task_text': ''},
+            {'task_text': 'Bad date', 'due_date': '31/12/2025'},
+            {'task_text': 'Also valid', 'priority': 'medium'}
+        ])
+        
+        self.assertIsNone(result['ids'][1])
+        self.assertIsNone(result['ids'][2])
+        self.assertEqual([e['index'] for e in result['errors']], [1, 2])
+        self.assertEqual(len(self.db_manager.get_tasks(self.test_user_id)), 2)
+    
+    def test_add_notes_bulk_isolates_constraint_failures(self):
+        """Test that a foreign key violation only rejects its own row."""
+        result = self.db_manager.add_notes_bulk(self.test_user_id, [
+            {'note_text': 'General note'},
+            {'note_text': 'Orphan note', 'topic_id': 9999}
+        ])
+        
+        self.assertIsNotNone(result['ids'][0])
+        self.assertEqual([e['index'] for e in result['errors']], [1])
+        self.assertEqual(len(self.db_manager.get_notes_by_user(self.test_user_id)), 1)
+    
+    def test_add_subtopics_and_goals_bulk(self):
+        """Test bulk topic import followed by goals referencing them."""
+        topics = self.db_manager.add_subtopics_bulk(self.test_user_id, [
+            {'topic_name': 'Graphs', 'subject': 'Algorithms'},
+            {'topic_name': 'Heaps', 'subject': 'Algorithms'}
+        ])
+        goals = self.db_manager.add_goals_bulk(self.test_user_id, [
+            {'goal_text': 'Master BFS', 'topic_id': topics['ids'][0]},
+            {'goal_text': 'Implement a heap', 'topic_id': topics['ids'][1], 'target_date': '2025-10-01'}
+        ])
+        
+        self.assertEqual(goals['errors'], [])
+        names = sorted(g['topic_name'] for g in self.db_manager.get_goals_by_user(self.test_user_id))
+        self.assertEqual(names, ['Graphs', 'Heaps'])
+    
+    def test_save_snippets_bulk(self):
+        """Test bulk snippet save."""
+        result = self.db_manager.save_snippets_bulk(self.test_user_id, [
+            {'title': 'Hello', 'language': 'python', 'code': "print('hi')"},
+            {'title': 'Missing code', 'language': 'python'}
+        ])
+        
+        self.assertEqual([e['index'] for e in result['errors']], [1])
+        self.assertEqual(len(self.db_manager.get_snippets(self.test_user_id)), 1)
+    
+    def test_bulk_rejects_non_text_optional_fields(self):
+        """Test that a subject or description sqlite cannot bind only rejects its own row."""
+        topics = self.db_manager.add_subtopics_bulk(self.test_user_id, [
+            {'topic_name': 'Graphs', 'subject': 'Algorithms'},
+            {'topic_name': 'Heaps', 'subject': {'name': 'Algorithms'}},
+            {'topic_name': 'Tries', 'subject': 'Algorithms'}
+        ])
+        snippets = self.db_manager.save_snippets_bulk(self.test_user_id, [
+            {'title': 'Hello', 'language': 'python', 'code': "print('hi')", 'description': ['greeting']}
+        ])
+        
+        self.assertEqual(topics['errors'], [{'index': 1, 'error': 'subject must be text'}])
+        self.assertIsNotNone(topics['ids'][2])
+        self.assertEqual(snippets['errors'], [{'index': 0, 'error': 'description must be text'}])
+    
+    def test_bulk_unbindable_value_is_isolated(self):
+        """Test that a value that passes validation but cannot be bound is reported per row."""
+        with self.db_manager.pool.transaction() as conn:
+            result = insert_rows(
+                conn, "INSERT INTO tasks (user_id, task_text) VALUES (?, ?)",
+                ['Plain task', {'not': 'bindable'}], lambda row: (row,), (self.test_user_id,)
+            )
+        
+        self.assertIsNotNone(result['ids'][0])
+        self.assertEqual([e['index'] for e in result['errors']], [1])
+        self.assertEqual(len(self.db_manager.get_tasks(self.test_user_id)), 1)
+    
+    # ========== PAGINATION TESTS ==========
+    
+    def test_notes_pages_cover_all_notes(self):
+        """Test that following cursors yields every note once, newest first."""
+        self.db_manager.add_notes_bulk(self.test_user_id, [{'note_text': f'Note {i}'} for i in range(7)])
+        
+        seen, cursor = [], None
+        while True:
+            page = self.db_manager.get_notes_page(self.test_user_id, limit=3, cursor=cursor)
+            seen.extend(n['note_text'] for n in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        
+        self.assertEqual(seen, [f'Note {i}' for i in reversed(range(7))])
+    
+    def test_tasks_page_rejects_foreign_cursor(self):
+        """Test that a cursor from another listing is refused."""
+        self.db_manager.add_notes_bulk(self.test_user_id, [{'note_text': 'a'}, {'note_text': 'b'}])
+        cursor = self.db_manager.get_notes_page(self.test_user_id, limit=1)['next_cursor']
+        with self.assertRaises(ValueError):
+            self.db_manager.get_tasks_page(self.test_user_id, cursor=cursor)
+    
+    def test_tasks_page_follows_get_tasks_order(self):
+        """Test that walking task pages yields exactly the get_tasks listing."""
+        self.db_manager.add_tasks_bulk(self.test_user_id, [
+            {'task_text': f'Task {i}', 'due_date': [None, '2024-03-01', '2024-02-01'][i % 3],
+             'priority': ['low', 'medium', 'high'][i % 2 * 2]}
+            for i in range(11)
+        ])
+        self.db_manager.toggle_task(2)
+        
+        seen, cursor = [], None
+        while True:
+            page = self.db_manager.get_tasks_page(self.test_user_id, limit=3, cursor=cursor)
+            seen.extend(t['task_id'] for t in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        
+        self.assertEqual(seen, [t['task_id'] for t in self.db_manager.get_tasks(self.test_user_id)])
+    
+    # ========== USER STATS TESTS ==========
+    
+    def test_user_stats_follow_writes(self):
+        """Test that triggers keep user_stats in step with the source tables."""
+        self.db_manager.add_subtopic(self.test_user_id, "Arrays", "DSA")
+        self.db_manager.add_subtopic(self.test_user_id, "Graphs", "DSA")
+        self.db_manager.update_subtopic_progress(1, 60)
+        self.db_manager.add_tasks_bulk(self.test_user_id, [{'task_text': 'a'}, {'task_text': 'b'}])
+        self.db_manager.toggle_task(1)
+        self.db_manager.add_goal(self.test_user_id, "Finish")
+        self.db_manager.toggle_goal_completion(1)
+        exam_id = self.db_manager.create_exam(self.test_user_id, 1, [
+            {'question': 'Q?', 'options': ['a', 'b'], 'correct_answer': 'A', 'explanation': ''}
+        ])
+        self.db_manager.submit_exam(exam_id, {'0': 'A'})
+        self.db_manager.delete_task(2)
+        
+        stats = self.db_manager.get_user_stats(self.test_user_id)
+        self.assertEqual(stats['topic_count'], 2)
+        self.assertEqual(stats['average_progress'], 30)
+        self.assertEqual(stats['pending_tasks'], 0)
+        self.assertEqual(stats['completed_goals'], 1)
+        self.assertEqual(stats['exams_taken'], 1)
+        self.assertEqual(self.db_manager.check_user_stats(), [])
+    
+    def test_rebuild_repairs_drifted_stats(self):
+        """Test that the checker reports drift and rebuild clears it."""
+        self.db_manager.add_task(self.test_user_id, "Pending")
+        with self.db_manager.pool.transaction() as conn:
+            conn.execute("UPDATE user_stats SET pending_tasks = 5")
+        
+        drift = self.db_manager.check_user_stats(self.test_user_id)
+        self.assertEqual([(d['column'], d['stored'], d['expected']) for d in drift], [('pending_tasks', 5, 1)])
+        
+        self.db_manager.rebuild_user_stats()
+        self.assertEqual(self.db_manager.check_user_stats(), [])
+        self.assertEqual(self.db_manager.get_user_stats(self.test_user_id)['pending_tasks'], 1)
+
 
 class TestDatabaseIntegrity(unittest.TestCase):
     """
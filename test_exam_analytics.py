@@ -0,0 +1,95 @@
+"""
+Unit Tests for Exam Analytics
+Tests per-topic trend statistics, the NumPy/pure Python parity and caching.
+"""
+
+import unittest
+import os
+import sys
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+import exam_analytics
+from exam_analytics import AnalyticsCache, compute_exam_analytics
+
+ROWS = [
+    (None, None, 40.0),
+    (1, 'Arrays', 50.0), (1, 'Arrays', 60.0), (1, 'Arrays', 70.0), (1, 'Arrays', 90.0),
+    (2, 'Graphs', 80.0), (2, 'Graphs', 60.0),
+]
+
+
+class TestExamAnalytics(unittest.TestCase):
+    """Test suite for compute_exam_analytics."""
+
+    def test_per_topic_statistics(self):
+        """Test means, slopes, moving averages and quartiles."""
+        result = compute_exam_analytics(ROWS, window=2, use_numpy=False)
+        topics = {t['topic_name']: t for t in result['topics']}
+
+        arrays = topics['Arrays']
+        self.assertEqual(arrays['attempts'], 4)
+        self.assertAlmostEqual(arrays['mean'], 67.5)
+        self.assertAlmostEqual(arrays['slope'], 13.0)
+        self.assertEqual(arrays['moving_average'], [50.0, 55.0, 65.0, 80.0])
+        self.assertAlmostEqual(arrays['percentiles']['p50'], 65.0)
+        self.assertAlmostEqual(arrays['percentiles']['p25'], 57.5)
+
+        self.assertAlmostEqual(topics['Graphs']['slope'], -20.0)
+        self.assertEqual(topics['General']['slope'], 0.0)
+
+    def test_weak_topics_ranked_by_recent_average(self):
+        """Test that the lowest recent average ranks weakest."""
+        result = compute_exam_analytics(ROWS, window=2, use_numpy=False)
+        self.assertEqual(result['weak_topics'], ['General', 'Graphs', 'Arrays'])
+        self.assertEqual(result['overall']['attempts'], 7)
+
+    def test_empty_history(self):
+        """Test the result for a user without completed exams."""
+        result = compute_exam_analytics([], use_numpy=False)
+        self.assertEqual((result['topics'], result['weak_topics']), ([], []))
+        self.assertEqual(result['overall']['mean'], 0.0)
+
+    @unittest.skipIf(exam_analytics.np is None, "NumPy not installed")
+    def test_numpy_matches_python(self):
+        """Test that both backends agree."""
+        fast = compute_exam_analytics(ROWS, window=3, use_numpy=True)
+        slow = compute_exam_analytics(ROWS, window=3, use_numpy=False)
+        self.assertEqual(fast['weak_topics'], slow['weak_topics'])
+        for a, b in zip(fast['topics'], slow['topics']):
+            self.assertAlmostEqual(a['slope'], b['slope'])
+            for x, y in zip(a['moving_average'], b['moving_average']):
+                self.assertAlmostEqual(x, y)
+            for q in a['percentiles']:
+                self.assertAlmostEqual(a['percentiles'][q], b['percentiles'][q])
+
+
+class TestAnalyticsCache(unittest.TestCase):
+    """Test suite for AnalyticsCache."""
+
+    def test_hit_and_invalidate(self):
+        """Test that results are reused until the user is invalidated."""
+        cache = AnalyticsCache()
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+
+        self.assertEqual(cache.get(1, 3, compute), 1)
+        self.assertEqual(cache.get(1, 3, compute), 1)
+        cache.invalidate(1)
+        self.assertEqual(cache.get(1, 3, compute), 2)
+
+    def test_stale_result_not_stored(self):
+        """Test that a value computed across an invalidation is not cached."""
+        cache = AnalyticsCache()
+
+        def compute():
+            cache.invalidate(1)
+            return 'stale'
+
+        self.assertEqual(cache.get(1, 3, compute), 'stale')
+        self.assertEqual(cache.get(1, 3, lambda: 'fresh'), 'fresh')
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
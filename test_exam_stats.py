@@ -0,0 +1,102 @@
+"""
+Unit Tests for Exam Score Statistics
+Tests incremental updates, resubmission and rebuilding of exam_score_stats.
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from exam_stats import EXAM_STATS_SCHEMA, RECENT_SCORES, read_exam_stats, rebuild_exam_stats, record_exam_score
+from user_stats import EXAM_TAKEN_SCORE
+
+
+class TestExamStats(unittest.TestCase):
+    """Test suite for exam_score_stats."""
+
+    def setUp(self):
+        """Create an in-memory database with exams and subtopics."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("CREATE TABLE subtopics (topic_id INTEGER PRIMARY KEY, subject TEXT)")
+        self.conn.execute('''
+            CREATE TABLE exams (exam_id INTEGER PRIMARY KEY, user_id INTEGER, topic_id INTEGER,
+                                exam_date TIMESTAMP, score REAL)
+        ''')
+        self.conn.execute(EXAM_STATS_SCHEMA)
+        self.conn.executemany("INSERT INTO subtopics VALUES (?, ?)", [(1, 'Math'), (2, 'CS')])
+
+    def tearDown(self):
+        """Close the connection."""
+        self.conn.close()
+
+    def _submit(self, exam_id, topic_id, score, user_id=1):
+        previous = self.conn.execute("SELECT score FROM exams WHERE exam_id = ?", (exam_id,)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO exams VALUES (?, ?, ?, ?, ?)",
+            (exam_id, user_id, topic_id, f"2024-01-{exam_id:02d} 10:00:00", score)
+        )
+        record_exam_score(self.conn, EXAM_TAKEN_SCORE, user_id, topic_id, score,
+                          previous is not None and previous[0] is not None)
+
+    def test_incremental_totals(self):
+        """Test count, mean, best and recent scores overall and per subject."""
+        self._submit(1, 1, 60.0)
+        self._submit(2, 2, 90.0)
+        self._submit(3, 1, 75.0)
+        self._submit(4, None, 30.0)
+
+        stats = read_exam_stats(self.conn, 1)
+        self.assertEqual(stats['exam_count'], 4)
+        self.assertAlmostEqual(stats['average_score'], 63.75)
+        self.assertEqual(stats['best_score'], 90.0)
+        self.assertEqual(stats['recent_scores'], [60.0, 90.0, 75.0, 30.0])
+        self.assertEqual(sorted(stats['by_subject']), ['CS', 'General', 'Math'])
+        self.assertAlmostEqual(stats['by_subject']['Math']['average_score'], 67.5)
+
+    def test_recent_scores_are_bounded(self):
+        """Test that only the last RECENT_SCORES scores are kept."""
+        for exam_id in range(1, RECENT_SCORES + 4):
+            self._submit(exam_id, 1, float(exam_id))
+        recent = read_exam_stats(self.conn, 1)['recent_scores']
+        self.assertEqual(recent, [float(i) for i in range(4, RECENT_SCORES + 4)])
+
+    def test_resubmission_replaces_score(self):
+        """Test that grading an exam again does not double count it."""
+        self._submit(1, 1, 40.0)
+        self._submit(2, 1, 80.0)
+        self._submit(1, 1, 100.0)
+
+        stats = read_exam_stats(self.conn, 1)
+        self.assertEqual(stats['exam_count'], 2)
+        self.assertEqual((stats['average_score'], stats['best_score']), (90.0, 100.0))
+
+    def test_rebuild_matches_incremental(self):
+        """Test that rebuilding from exams reproduces the cached rows."""
+        self._submit(1, 1, 60.0)
+        self._submit(2, 2, 90.0, user_id=2)
+        self._submit(3, 1, 75.0)
+        before = self.conn.execute("SELECT * FROM exam_score_stats ORDER BY 1, 2").fetchall()
+
+        self.assertEqual(rebuild_exam_stats(self.conn, EXAM_TAKEN_SCORE), 4)
+        self.assertEqual(self.conn.execute("SELECT * FROM exam_score_stats ORDER BY 1, 2").fetchall(), before)
+        self.assertEqual(read_exam_stats(self.conn, 3)['exam_count'], 0)
+
+    def test_blank_subject_counts_as_general(self):
+        """Test that rebuild and incremental updates agree for a topic without a subject."""
+        self.conn.execute("INSERT INTO subtopics VALUES (3, '')")
+        self._submit(1, 3, 70.0)
+        before = self.conn.execute("SELECT * FROM exam_score_stats ORDER BY 1, 2").fetchall()
+
+        rebuild_exam_stats(self.conn, EXAM_TAKEN_SCORE)
+        self.assertEqual(self.conn.execute("SELECT * FROM exam_score_stats ORDER BY 1, 2").fetchall(), before)
+        stats = read_exam_stats(self.conn, 1)
+        self.assertEqual(stats['exam_count'], 1)
+        self.assertEqual(list(stats['by_subject']), ['General'])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,148 @@
+"""
+Unit Tests for Item Analysis
+Tests p-values, discrimination, distractor frequencies and flagging, and
+how exam generation sets flagged questions aside.
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+from unittest.mock import MagicMock, patch
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+import item_analysis
+from exam_store import EXAM_QUESTIONS_SCHEMA, insert_questions, record_answers
+from item_analysis import ITEM_STATS_SCHEMA, OMITTED, analyze_items, flagged_item_keys, item_key, read_item_stats
+from user_stats import EXAM_TAKEN_SCORE
+
+# Mock torch and transformers
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from enhanced_app_logic import EnhancedAppLogic
+
+EASY = {'question': 'Easy?', 'options': ['yes', 'no'], 'correct_answer': 'A', 'explanation': ''}
+GOOD = {'question': 'Good?', 'options': ['right', 'wrong'], 'correct_answer': 'A', 'explanation': ''}
+BAD = {'question': 'Bad?', 'options': ['keyed', 'actual'], 'correct_answer': 'A', 'explanation': ''}
+FILLER = [{'question': f'F{i}?', 'options': ['a', 'b'], 'correct_answer': 'A', 'explanation': ''} for i in range(4)]
+
+
+class TestItemAnalysis(unittest.TestCase):
+    """Test suite for analyze_items and item_stats."""
+
+    def setUp(self):
+        """Create an in-memory database with exams answered by strong and weak examinees."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("CREATE TABLE exams (exam_id INTEGER PRIMARY KEY, score REAL)")
+        self.conn.execute(EXAM_QUESTIONS_SCHEMA)
+        self.conn.execute(ITEM_STATS_SCHEMA)
+
+        questions = [EASY, GOOD, BAD] + FILLER
+        for exam_id in range(1, 21):
+            strong = exam_id <= 10
+            answers = {'0': 'A', '1': 'A' if strong else 'B', '2': 'B' if strong else 'A'}
+            answers.update({str(3 + i): 'A' if strong or i < 1 else 'B' for i in range(len(FILLER))})
+            if exam_id == 20:
+                del answers['1']
+            insert_questions(self.conn, exam_id, questions)
+            correct = record_answers(self.conn, exam_id, answers)
+            self.conn.execute("INSERT INTO exams VALUES (?, ?)", (exam_id, correct / len(questions) * 100))
+        self.conn.execute("INSERT INTO exams VALUES (99, NULL)")
+        insert_questions(self.conn, 99, questions)
+
+    def tearDown(self):
+        """Close the connection."""
+        self.conn.close()
+
+    def _stats(self, use_numpy=False):
+        analyze_items(self.conn, EXAM_TAKEN_SCORE, use_numpy=use_numpy)
+        return {s['question']: s for s in read_item_stats(self.conn)}
+
+    def test_difficulty_and_discrimination(self):
+        """Test that p-values and point-biserials separate good and bad items."""
+        stats = self._stats()
+        self.assertEqual(stats['Good?']['attempts'], 20)
+        self.assertAlmostEqual(stats['Good?']['p_value'], 0.5)
+        self.assertGreater(stats['Good?']['discrimination'], 0.8)
+        self.assertLess(stats['Bad?']['discrimination'], 0)
+        self.assertEqual(stats['Easy?']['discrimination'], 0.0)
+
+    def test_flags(self):
+        """Test that only too easy or non-discriminating items are flagged."""
+        stats = self._stats()
+        self.assertEqual(stats['Good?']['flags'], [])
+        self.assertIn('too_easy', stats['Easy?']['flags'])
+        self.assertEqual(stats['Bad?']['flags'], ['low_discrimination'])
+        flagged = {s['question'] for s in read_item_stats(self.conn, flagged_only=True)}
+        self.assertEqual(flagged, {'Easy?', 'Bad?', 'F0?'})
+
+        keys = [item_key(q) for q in (EASY, GOOD, BAD)]
+        self.assertEqual(flagged_item_keys(self.conn, keys), {keys[0], keys[2]})
+
+    def test_option_frequencies(self):
+        """Test distractor selection shares, including omitted answers."""
+        frequencies = self._stats()['Good?']['option_frequencies']
+        self.assertEqual(frequencies, {OMITTED: 0.05, 'right': 0.5, 'wrong': 0.45})
+
+    def test_item_key_ignores_option_order(self):
+        """Test that reshuffled options map to the same item."""
+        shuffled = dict(GOOD, options=['wrong', 'right'], correct_answer='B')
+        self.assertEqual(item_key(shuffled), item_key(GOOD))
+
+    @unittest.skipIf(item_analysis.np is None, "NumPy not installed")
+    def test_numpy_matches_python(self):
+        """Test that both backends agree."""
+        slow, fast = self._stats(use_numpy=False), self._stats(use_numpy=True)
+        for question, item in slow.items():
+            self.assertAlmostEqual(item['p_value'], fast[question]['p_value'])
+            self.assertAlmostEqual(item['discrimination'], fast[question]['discrimination'])
+
+
+class TestFlaggedQuestionScreening(unittest.TestCase):
+    """Test suite for setting flagged questions aside during exam generation."""
+
+    def setUp(self):
+        """Create app logic on a temporary database with BAD flagged."""
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix='.db')
+        self.app_logic = EnhancedAppLogic(db_path=self.test_db_path)
+        if self.app_logic.ollama:
+            self.app_logic.ollama.close()
+        self.app_logic.ollama = None
+        self.app_logic.offline_exam_gen = MagicMock()
+        self.app_logic.offline_exam_gen.generate_exam.return_value = [dict(BAD), dict(GOOD)]
+
+        with self.app_logic.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO item_stats (item_key, question, attempts, p_value, discrimination, "
+                "option_frequencies, flags) VALUES (?, ?, 20, 0.5, -0.8, '{}', 'low_discrimination')",
+                (item_key(BAD), BAD['question'])
+            )
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.app_logic.close()
+        os.close(self.test_db_fd)
+        os.unlink(self.test_db_path)
+
+    def _generate(self, fallback):
+        seen = []
+        with patch.object(self.app_logic, '_generate_fallback_questions', return_value=fallback):
+            questions = self.app_logic.generate_exam_questions('Heaps', 'DSA', 2, 'easy', on_question=seen.append)
+        self.assertEqual(seen, questions)
+        return [q['question'] for q in questions]
+
+    def test_flagged_question_is_replaced(self):
+        """Test that a sound question from the next generator takes the flagged one's place."""
+        self.assertEqual(self._generate([dict(EASY)]), ['Good?', 'Easy?'])
+
+    def test_flagged_question_fills_last(self):
+        """Test that a flagged question is used only when nothing else fills the exam."""
+        self.assertEqual(self._generate([]), ['Good?', 'Bad?'])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
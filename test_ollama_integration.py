@@ -0,0 +1,511 @@
+"""
+Unit Tests for Ollama Integration
+Runs OllamaIntegration against a small local HTTP server speaking the Ollama API.
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from db_pool import ConnectionPool
+from enhanced_app_logic import EnhancedAppLogic
+from response_cache import RESPONSE_CACHE_SCHEMA, ResponseCache
+from ollama_integration import OllamaIntegration, dedupe_questions, iter_json_objects, plan_chunks
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Answers /api/tags and /api/generate from the server's script."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.record(self, None)
+        self._reply(200, {'models': []})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.record(self, body)
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.peak_in_flight = max(self.server.peak_in_flight, self.server.in_flight)
+        try:
+            self._generate(body)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _generate(self, body):
+        time.sleep(self.server.delay)
+        if self.server.reply:
+            text = self.server.reply(body['prompt'])
+            if body.get('stream'):
+                tokens = [text[i:i + 5] for i in range(0, len(text), 5)]
+            else:
+                self._reply(200, {'response': text, 'done': True})
+                return
+        else:
+            tokens = self.server.stream_tokens
+        if body.get('stream'):
+            lines = [{'response': token, 'done': False} for token in tokens]
+            data = '\n'.join(json.dumps(line) for line in lines + [{'response': '', 'done': True}]).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        status, text = self.server.responses.pop(0) if self.server.responses else (200, self.server.default)
+        self._reply(status, {'response': text, 'done': True})
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """Local stand-in for an Ollama server that records each request."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeOllamaHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.client_ports = set()  # of generate calls
+        self.responses = []
+        self.default = 'ok'
+        self.stream_tokens = []
+        self.reply = None  # prompt -> response text, overrides the above
+        self.delay = 0.0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def record(self, handler, body):
+        with self.lock:
+            self.requests.append((handler.command, handler.path, body))
+            if handler.command == 'POST':
+                self.client_ports.add(handler.client_address[1])
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class OllamaTestCase(unittest.TestCase):
+    """Starts a fake Ollama server per test."""
+
+    def setUp(self):
+        """Start the server and a client pointed at it."""
+        self.server = FakeOllamaServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        self.ollama = OllamaIntegration(self.server.url, backoff_factor=0)
+
+    def tearDown(self):
+        """Close the client and stop the server."""
+        self.ollama.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestOllamaSession(OllamaTestCase):
+    """Test suite for the pooled session."""
+
+    def test_connections_are_reused(self):
+        """Test that repeated calls share one keep-alive connection."""
+        for _ in range(3):
+            self.assertEqual(self.ollama.explain_concept("recursion"), 'ok')
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_overload_is_retried(self):
+        """Test that a 503 is retried before the call succeeds."""
+        self.server.responses = [(503, ''), (200, 'guide')]
+        self.assertEqual(self.ollama.generate_study_guide("Heaps", "DSA"), 'guide')
+
+    def test_persistent_error_raises(self):
+        """Test that errors outliving the retry budget surface as RuntimeError."""
+        self.server.responses = [(500, '')]
+        with self.assertRaises(RuntimeError):
+            self.ollama.explain_concept("graphs")
+
+    def test_generation_options_are_sent(self):
+        """Test that per-call options reach the API."""
+        self.server.default = json.dumps({
+            'title': 'T', 'description': 'D', 'template': 'print()',
+            'tests': [{'input': '1', 'expected': '1'}, {'bad': True}]
+        })
+        problem = self.ollama.generate_code_practice("loops")
+        self.assertEqual(problem['tests'], [{'input': '1', 'expected': '1'}])
+        body = self.server.requests[-1][2]
+        self.assertEqual((body['stream'], body['options']), (False, {'temperature': 0.2}))
+
+
+class TestOllamaHealth(OllamaTestCase):
+    """Test suite for the cached health state."""
+
+    def _probes(self):
+        return sum(1 for method, path, _ in self.server.requests if path == '/api/tags')
+
+    def test_fresh_state_skips_probe(self):
+        """Test that generation reuses a fresh health result."""
+        self.assertTrue(self.ollama.check_connection())
+        for _ in range(3):
+            self.ollama.explain_concept("stacks")
+        self.assertEqual(self._probes(), 1)
+
+        status = self.ollama.health_status()
+        self.assertTrue(status['available'])
+        self.assertIsNotNone(status['latency_ms'])
+
+    def test_down_server_fails_fast(self):
+        """Test that a known-down server is reported without another request."""
+        self.server.shutdown()
+        self.server.server_close()
+        down = OllamaIntegration(self.server.url, backoff_factor=0)
+        self.addCleanup(down.close)
+
+        self.assertFalse(down.check_connection())
+        self.assertIsNotNone(down.health().error)
+        started = time.monotonic()
+        with self.assertRaises(ConnectionError):
+            down.explain_concept("queues")
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_background_probe_refreshes(self):
+        """Test that the prober keeps checking without callers asking."""
+        self.ollama.start_health_probe(interval=0.02)
+        self.assertTrue(self.ollama.probing)
+        deadline = time.monotonic() + 2
+        while self._probes() < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.ollama.stop_health_probe()
+
+        self.assertGreaterEqual(self._probes(), 2)
+        self.assertFalse(self.ollama.probing)
+        self.assertTrue(self.ollama.is_available())
+
+
+def _question(text, options=('w', 'x', 'y', 'z')):
+    return {'question': text, 'options': list(options), 'correct_answer': 'A', 'explanation': 'e'}
+
+
+class TestExamStreaming(OllamaTestCase):
+    """Test suite for streamed exam generation."""
+
+    def test_objects_are_cut_from_arbitrary_chunks(self):
+        """Test extraction across chunk boundaries and braces inside strings."""
+        text = 'Sure! [{"question": "Is {x} a set?", "n": {"a": 1}}, {"broken": }, {"question": "Q\\"}"}]'
+        chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+        self.assertEqual(list(iter_json_objects(chunks)), [
+            {'question': 'Is {x} a set?', 'n': {'a': 1}}, {'question': 'Q"}'}
+        ])
+
+        preamble = 'Here are 2 "questions: [{"question": "A?"}, {"question": "B?"}]'
+        self.assertEqual(list(iter_json_objects([preamble])), [{'question': 'A?'}, {'question': 'B?'}])
+
+    def test_stream_yields_valid_questions(self):
+        """Test that streamed questions are validated and shuffled as they arrive."""
+        body = json.dumps([_question('Q1?'), _question('Bad?', ('a', 'b')), _question('Q2?')])
+        self.server.stream_tokens = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+        questions = list(self.ollama.generate_exam_stream('Heaps', 'DSA', count=5))
+        self.assertEqual([q['question'] for q in questions], ['Q1?', 'Q2?'])
+        for q in questions:
+            self.assertEqual(q['options'][ord(q['correct_answer']) - ord('A')], 'w')
+        self.assertTrue(self.server.requests[-1][2]['stream'])
+
+    def test_stream_stops_at_count(self):
+        """Test that the generator ends once enough questions arrived."""
+        self.server.stream_tokens = [json.dumps([_question(f'Q{i}?') for i in range(4)])]
+        self.assertEqual(len(list(self.ollama.generate_exam_stream('Heaps', 'DSA', count=2))), 2)
+
+
+def _aspect_reply(prompt):
+    """Two questions per prompt, worded after the aspect it asks for."""
+    aspect = prompt.split('Focus on this aspect of Heaps: ')[1].split('\n')[0] if 'Focus on' in prompt else 'all'
+    return json.dumps([_question(f'{verb} the {aspect}?') for verb in ('Define', 'Contrast')])
+
+
+class TestChunkedGeneration(OllamaTestCase):
+    """Test suite for the chunk planner and near-duplicate removal."""
+
+    def test_plan_balances_chunks(self):
+        """Test that large counts split into even chunks with distinct aspects."""
+        self.assertEqual(plan_chunks(8), [(8, None)])
+        chunks = plan_chunks(25)
+        self.assertEqual([size for size, _ in chunks], [9, 8, 8])
+        self.assertEqual(len({aspect for _, aspect in chunks}), 3)
+
+    def test_near_duplicates_are_dropped(self):
+        """Test that rewordings of an earlier stem are removed."""
+        questions = [_question('What is a binary heap?'), _question('What is a binary heap'),
+                     _question('what IS a Binary Heap?!'), _question('How does heapify work?')]
+        self.assertEqual([q['question'] for q in dedupe_questions(questions)],
+                         ['What is a binary heap?', 'How does heapify work?'])
+
+    def test_chunks_run_concurrently(self):
+        """Test that a large exam is generated as parallel, aspect-seeded chunks."""
+        self.ollama.chunk_size = 2
+        self.server.reply = _aspect_reply
+        self.server.delay = 0.2
+
+        started = time.monotonic()
+        questions = self.ollama.generate_exam('Heaps', 'DSA', count=8)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(len(questions), 8)
+        self.assertEqual(len({q['question'] for q in questions}), 8)
+        prompts = [body['prompt'] for method, path, body in self.server.requests if method == 'POST']
+        self.assertEqual(len(prompts), 4)
+        self.assertEqual(len(set(prompts)), 4)
+        self.assertGreater(self.server.peak_in_flight, 1)
+        self.assertLess(elapsed, 0.6)
+
+    def test_failed_chunk_is_skipped(self):
+        """Test that one failing chunk does not sink the others."""
+        self.ollama.chunk_size = 2
+        self.server.reply = lambda prompt: 'not json' if 'core definitions' in prompt else _aspect_reply(prompt)
+        questions = self.ollama._generate_chunks('Heaps', 'DSA', 'easy', plan_chunks(6, 2))
+        self.assertEqual(len(questions), 4)
+
+    def test_chunk_streams_are_merged(self):
+        """Test that streamed chunks are interleaved and deduplicated."""
+        self.ollama.chunk_size = 2
+        self.server.reply = lambda prompt: json.dumps(
+            [_question('What is a heap?')] + json.loads(_aspect_reply(prompt))[:1]
+        )
+
+        questions = list(self.ollama.generate_exam_stream('Heaps', 'DSA', count=6))
+        stems = [q['question'] for q in questions]
+        self.assertEqual(stems.count('What is a heap?'), 1)
+        # Three chunks give four unique stems; two top-up rounds add one more
+        self.assertEqual(len(stems), 5)
+        self.assertEqual(sum(1 for method, _, body in self.server.requests if method == 'POST'), 5)
+
+
+class TestExamTopUp(OllamaTestCase):
+    """Test suite for the bounded top-up in generate_exam and generate_exam_stream."""
+
+    def _prompts(self):
+        return [body['prompt'] for method, _, body in self.server.requests if method == 'POST']
+
+    def test_shortfall_is_requested_with_known_stems(self):
+        """Test that later rounds ask only for the missing questions and quote earlier stems."""
+        self.server.responses = [
+            (200, 'not json ['),
+            (200, json.dumps([_question('What is a min-heap?'), _question('Why is heap insertion logarithmic?')])),
+            (200, json.dumps([_question('What is a min heap'), _question('When is a heap better than a BST?')]))
+        ]
+        questions = self.ollama.generate_exam('Heaps', 'DSA', count=3)
+
+        self.assertEqual([q['question'] for q in questions], [
+            'What is a min-heap?', 'Why is heap insertion logarithmic?', 'When is a heap better than a BST?'
+        ])
+        prompts = self._prompts()
+        self.assertEqual(len(prompts), 3)
+        self.assertTrue(prompts[2].startswith('Generate 1 multiple-choice'))
+        self.assertIn('- Why is heap insertion logarithmic?', prompts[2])
+
+    def test_exhausted_budget_falls_back_offline(self):
+        """Test that a model that keeps failing is abandoned for template questions."""
+        self.server.default = 'no questions here'
+        questions = self.ollama.generate_exam('Heaps', 'DSA', count=4)
+        self.assertEqual(len(questions), 4)
+        self.assertEqual(len(self._prompts()), 3)
+
+    def test_deadline_bounds_generation(self):
+        """Test that the last round is cut short by the overall deadline."""
+        self.server.default = json.dumps([_question('What is a heap?')])
+        self.server.delay = 0.15
+        started = time.monotonic()
+        questions = self.ollama.generate_exam('Heaps', 'DSA', count=5, deadline=0.25)
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(len(questions), 5)
+        self.assertEqual(questions[0]['question'], 'What is a heap?')
+        self.assertEqual(len(self._prompts()), 2)
+
+    def test_start_exam_tops_up_short_stream(self):
+        """Test that start_exam streams the shortfall again before using template questions."""
+        fd, path = tempfile.mkstemp(suffix='.db')
+        self.addCleanup(os.remove, path)
+        self.addCleanup(os.close, fd)
+        app_logic = EnhancedAppLogic(db_path=path)
+        self.addCleanup(app_logic.close)
+        app_logic.ollama.close()
+        app_logic.ollama = self.ollama
+        app_logic.offline_exam_gen = None
+        app_logic.register_user("testuser", "testpass123", "test@example.com")
+        app_logic.login_user("testuser", "testpass123")
+        app_logic.add_subtopic("Heaps", "DSA")
+        topic_id = app_logic.get_user_subtopics()[0]['topic_id']
+
+        self.server.reply = lambda prompt: json.dumps(
+            [_question('What is a min-heap?'), _question('When is a heap better than a BST?')]
+            if 'Do not repeat' in prompt else [_question('What is a min-heap?')]
+        )
+        success, _, exam_id = app_logic.start_exam(topic_id, 2, 'easy')
+
+        self.assertTrue(success)
+        self.assertEqual([q['question'] for q in app_logic.get_exam(exam_id)['questions']], [
+            'What is a min-heap?', 'When is a heap better than a BST?'
+        ])
+        prompts = self._prompts()
+        self.assertEqual(len(prompts), 2)
+        self.assertTrue(prompts[1].startswith('Generate 1 multiple-choice'))
+        self.assertIn('- What is a min-heap?', prompts[1])
+
+
+class TestResponseCaching(OllamaTestCase):
+    """Test suite for serving repeated prompts from the response cache."""
+
+    def setUp(self):
+        """Attach a cache backed by a temporary database."""
+        super().setUp()
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.pool = ConnectionPool(path)
+        self.addCleanup(os.remove, path)
+        self.addCleanup(self.pool.close)
+        with self.pool.transaction() as conn:
+            conn.execute(RESPONSE_CACHE_SCHEMA)
+        self.ollama.cache = ResponseCache(self.pool)
+
+    def _posts(self):
+        return sum(1 for method, _, _ in self.server.requests if method == 'POST')
+
+    def test_repeated_prompt_is_served_from_cache(self):
+        """Test that a second identical call makes no request, unless fresh."""
+        self.server.responses = [(200, 'first'), (200, 'second')]
+        self.assertEqual(self.ollama.explain_concept('recursion'), 'first')
+        self.assertEqual(self.ollama.explain_concept('recursion'), 'first')
+        self.assertEqual(self._posts(), 1)
+
+        self.assertEqual(self.ollama.explain_concept('recursion', fresh=True), 'second')
+        self.assertEqual(self.ollama.explain_concept('recursion'), 'second')
+        self.assertEqual(self._posts(), 2)
+        self.assertEqual(self.ollama.cache.stats()['hits'], 2)
+
+    def test_options_and_kinds_are_respected(self):
+        """Test that coding problems are never cached."""
+        self.server.default = json.dumps({'title': 'T', 'description': 'D', 'template': '', 'tests': []})
+        self.ollama.generate_code_practice('loops')
+        self.ollama.generate_code_practice('loops')
+        self.assertEqual(self._posts(), 2)
+
+    def test_completed_stream_is_replayed(self):
+        """Test that a streamed exam read to the end is replayed from cache."""
+        self.server.stream_tokens = [json.dumps([_question('Q1?'), _question('Q2?')])]
+        first = [q['question'] for q in self.ollama.generate_exam_stream('Heaps', 'DSA', count=2)]
+        again = [q['question'] for q in self.ollama.generate_exam_stream('Heaps', 'DSA', count=2)]
+        self.assertEqual(first, again)
+        self.assertEqual(self._posts(), 1)
+
+    def test_short_stream_is_not_replayed(self):
+        """Test that a stream ending with fewer questions than asked is not cached."""
+        self.server.stream_tokens = [json.dumps([_question('Q1?')])]
+        for _ in range(2):
+            self.assertEqual(len(list(self.ollama.generate_exam_stream('Heaps', 'DSA', count=5))), 1)
+        self.assertEqual(self._posts(), 2 * 3)
+        self.assertEqual(self.ollama.cache.stats()['entries'], 0)
+
+    def test_short_exam_answer_is_not_replayed(self):
+        """Test that a blocking exam answer with too few questions is not cached."""
+        self.server.responses = [
+            (200, json.dumps([_question('What is a heap?')])),
+            (200, json.dumps([_question('What is a heap?'), _question('Why is heap insertion logarithmic?')]))
+        ]
+        self.assertEqual(len(self.ollama._generate_chunks('Heaps', 'DSA', 'easy', [(2, None)])), 1)
+        self.assertEqual(len(self.ollama._generate_chunks('Heaps', 'DSA', 'easy', [(2, None)])), 2)
+        self.assertEqual(len(self.ollama._generate_chunks('Heaps', 'DSA', 'easy', [(2, None)])), 2)
+        self.assertEqual(self._posts(), 2)
+        self.assertEqual(self.ollama.cache.stats()['entries'], 1)
+
+    def test_top_up_rounds_bypass_cache(self):
+        """Test that a cached malformed answer is not replayed by top-up rounds."""
+        self.server.responses = [(200, 'not json ['), (200, json.dumps([_question('What is a heap?')]))]
+        questions = self.ollama.generate_exam('Heaps', 'DSA', count=1)
+        self.assertEqual(questions[0]['question'], 'What is a heap?')
+        self.assertEqual(self._posts(), 2)
+
+
+class TestExamRetakes(unittest.TestCase):
+    """Test suite for bypassing cached exams on retakes."""
+
+    def setUp(self):
+        """Create app logic on a temporary database with a stand-in Ollama client."""
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix='.db')
+        self.app_logic = EnhancedAppLogic(db_path=self.test_db_path)
+        if self.app_logic.ollama:
+            self.app_logic.ollama.close()
+        self.app_logic.ollama = MagicMock()
+        self.app_logic.ollama.generate_exam_stream.side_effect = lambda *args, **kwargs: iter(
+            [_question('Q1?'), _question('Q2?')]
+        )
+        self.app_logic.register_user("testuser", "testpass123", "test@example.com")
+        self.app_logic.login_user("testuser", "testpass123")
+        self.app_logic.add_subtopic("Heaps", "DSA")
+        self.topic_id = self.app_logic.get_user_subtopics()[0]['topic_id']
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.app_logic.close()
+        os.close(self.test_db_fd)
+        os.unlink(self.test_db_path)
+
+    def _fresh_flags(self):
+        return [call.kwargs['fresh'] for call in self.app_logic.ollama.generate_exam_stream.call_args_list]
+
+    def test_retake_bypasses_cache(self):
+        """Test that only the first exam on a topic may come from the cache."""
+        for _ in range(2):
+            self.assertTrue(self.app_logic.start_exam(self.topic_id, 2, 'easy')[0])
+        self.assertEqual(self._fresh_flags(), [False, True])
+
+    def test_fresh_can_be_forced(self):
+        """Test that callers can ask for a fresh first exam."""
+        self.app_logic.start_exam(self.topic_id, 2, 'easy', fresh=True)
+        self.assertEqual(self._fresh_flags(), [True])
+
+
+class TestHealthProbeLifecycle(unittest.TestCase):
+    """Test suite for the app's background health probe."""
+
+    def setUp(self):
+        """Create a temporary database path."""
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix='.db')
+
+    def tearDown(self):
+        """Remove the temporary database."""
+        os.close(self.test_db_fd)
+        os.unlink(self.test_db_path)
+
+    def test_probe_runs_until_close(self):
+        """Test that the probe is opt-in and stopped by close()."""
+        app_logic = EnhancedAppLogic(db_path=self.test_db_path)
+        self.assertFalse(app_logic.ollama.probing)
+        app_logic.start_health_probe()
+        self.assertTrue(app_logic.ollama.probing)
+        app_logic.close()
+        self.assertFalse(app_logic.ollama.probing)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
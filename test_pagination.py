@@ -0,0 +1,84 @@
+"""
+Unit Tests for Keyset Pagination
+Tests cursor encoding and that walking pages matches a single ordered query.
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from pagination import SortKey, decode_cursor, encode_cursor, fetch_page
+
+
+class TestKeysetPagination(unittest.TestCase):
+    """Test suite for fetch_page."""
+
+    def setUp(self):
+        """Create an in-memory table with duplicate and NULL sort values."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("CREATE TABLE items (item_id INTEGER PRIMARY KEY, owner INTEGER, done INTEGER, due TEXT)")
+        rows = []
+        for i in range(1, 38):
+            due = None if i % 4 == 0 else f"2024-01-{i % 5 + 1:02d}"
+            rows.append((i, 1 if i % 9 else 2, i % 2, due))
+        self.conn.executemany("INSERT INTO items VALUES (?, ?, ?, ?)", rows)
+
+    def tearDown(self):
+        """Close the connection."""
+        self.conn.close()
+
+    def _walk(self, keys, limit):
+        ids, cursor = [], None
+        while True:
+            rows, cursor = fetch_page(
+                self.conn, 'items', "SELECT item_id, done, due FROM items WHERE owner = ?", (1,),
+                keys, limit, cursor
+            )
+            ids.extend(r[0] for r in rows)
+            if cursor is None:
+                return ids
+
+    def _expected(self, order):
+        return [r[0] for r in self.conn.execute(f"SELECT item_id FROM items WHERE owner = 1 ORDER BY {order}")]
+
+    def test_ascending_with_nulls(self):
+        """Test paging over a nullable ascending key."""
+        keys = (SortKey('done', 'done'), SortKey('due', 'due', nullable=True), SortKey('item_id', 'item_id'))
+        self.assertEqual(self._walk(keys, 4), self._expected("done, due, item_id"))
+
+    def test_descending_with_nulls(self):
+        """Test paging over a nullable descending key."""
+        keys = (SortKey('due', 'due', descending=True, nullable=True),
+                SortKey('item_id', 'item_id', descending=True))
+        self.assertEqual(self._walk(keys, 5), self._expected("due DESC, item_id DESC"))
+
+    def test_mixed_directions(self):
+        """Test paging when keys sort in different directions."""
+        keys = (SortKey('done', 'done', descending=True), SortKey('item_id', 'item_id'))
+        self.assertEqual(self._walk(keys, 3), self._expected("done DESC, item_id"))
+
+    def test_last_page_has_no_cursor(self):
+        """Test that a page covering the rest of the rows ends the walk."""
+        rows, cursor = fetch_page(
+            self.conn, 'items', "SELECT item_id FROM items WHERE owner = ?", (2,),
+            (SortKey('item_id', 'item_id'),), 10
+        )
+        self.assertEqual([r[0] for r in rows], [9, 18, 27, 36])
+        self.assertIsNone(cursor)
+
+    def test_cursor_scoped_to_listing(self):
+        """Test that tokens are rejected by other listings or when corrupted."""
+        token = encode_cursor('notes', ['2024-01-01', 3])
+        self.assertEqual(decode_cursor('notes', token), ['2024-01-01', 3])
+        with self.assertRaises(ValueError):
+            decode_cursor('tasks', token)
+        with self.assertRaises(ValueError):
+            decode_cursor('notes', 'not-a-cursor')
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
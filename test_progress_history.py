@@ -0,0 +1,94 @@
+"""
+Unit Tests for Topic Progress History
+Tests delta encoding, keyframe decoding, range queries and downsampling.
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from progress_history import (
+    KEYFRAME_INTERVAL, PROGRESS_HISTORY_SCHEMA, append_progress, progress_series, seed_progress_history
+)
+
+START = datetime(2024, 1, 1, 9, 0, 0)
+
+
+class TestProgressHistory(unittest.TestCase):
+    """Test suite for topic_progress_history."""
+
+    def setUp(self):
+        """Create an in-memory database with the history table."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(PROGRESS_HISTORY_SCHEMA)
+
+    def tearDown(self):
+        """Close the connection."""
+        self.conn.close()
+
+    def _record(self, values, topic_id=1):
+        """Append one sample per hour, starting at START."""
+        previous = None
+        for hour, value in enumerate(values):
+            append_progress(self.conn, topic_id, previous, value, START + timedelta(hours=hour))
+            previous = value
+
+    def test_values_decode_across_keyframes(self):
+        """Test that a long history decodes to the recorded values."""
+        values = [(i * 7) % 101 for i in range(KEYFRAME_INTERVAL * 2 + 5)]
+        self._record(values)
+
+        keyframes = self.conn.execute(
+            "SELECT COUNT(*) FROM topic_progress_history WHERE keyframe IS NOT NULL"
+        ).fetchone()[0]
+        self.assertEqual(keyframes, 3)
+        series = progress_series(self.conn, 1, max_points=len(values))
+        self.assertEqual([p['progress'] for p in series], values)
+        self.assertEqual(series[0]['timestamp'], '2024-01-01 09:00:00')
+
+    def test_range_starts_with_carried_value(self):
+        """Test that a range query starts with the value in effect at since."""
+        self._record([10, 20, 30, 40, 50])
+
+        series = progress_series(self.conn, 1, since=START + timedelta(minutes=90),
+                                 until=START + timedelta(hours=3))
+        self.assertEqual([p['progress'] for p in series], [20, 30, 40])
+        self.assertEqual(series[0]['timestamp'], '2024-01-01 10:30:00')
+
+        after = progress_series(self.conn, 1, since=START + timedelta(days=1))
+        self.assertEqual([p['progress'] for p in after], [50])
+        self.assertEqual(progress_series(self.conn, 1, until=START - timedelta(days=1)), [])
+
+    def test_downsampling_keeps_latest_value(self):
+        """Test that downsampling bounds the points and keeps the newest."""
+        values = list(range(100))
+        self._record(values)
+
+        series = progress_series(self.conn, 1, max_points=10)
+        self.assertLessEqual(len(series), 10)
+        self.assertEqual(series[-1]['progress'], 99)
+
+    def test_unchanged_progress_is_skipped(self):
+        """Test that re-saving the same value adds no sample."""
+        self.conn.execute("CREATE TABLE subtopics (topic_id INTEGER, progress INTEGER)")
+        self.conn.execute("INSERT INTO subtopics VALUES (1, 40)")
+        seed_progress_history(self.conn)
+
+        append_progress(self.conn, 1, 40, 40)
+        append_progress(self.conn, 1, 40, 55)
+        rows = self.conn.execute("SELECT seq, delta, keyframe FROM topic_progress_history").fetchall()
+        self.assertEqual(rows, [(0, 40, 40), (1, 15, None)])
+
+    def test_invalid_max_points(self):
+        """Test that max_points below two is rejected."""
+        with self.assertRaises(ValueError):
+            progress_series(self.conn, 1, max_points=1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,77 @@
+"""
+Unit Tests for the LLM Response Cache
+Tests keys, hit/miss counting and size-bounded LRU eviction.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from db_pool import ConnectionPool
+from response_cache import RESPONSE_CACHE_INDEX, RESPONSE_CACHE_SCHEMA, ResponseCache, cache_key
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test suite for ResponseCache."""
+
+    def setUp(self):
+        """Create a pooled database with the cache table."""
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.pool = ConnectionPool(self.path, size=2)
+        with self.pool.transaction() as conn:
+            conn.execute(RESPONSE_CACHE_SCHEMA)
+            conn.execute(RESPONSE_CACHE_INDEX)
+        self.cache = ResponseCache(self.pool, max_bytes=300)
+
+    def tearDown(self):
+        """Close the pool and remove the database."""
+        self.pool.close()
+        os.remove(self.path)
+
+    def test_key_covers_model_prompt_and_options(self):
+        """Test that any part of the request changes the key."""
+        base = cache_key('mistral', 'Explain heaps', {'temperature': 0.7})
+        self.assertEqual(base, cache_key('mistral', 'Explain heaps', {'temperature': 0.7}))
+        self.assertNotEqual(base, cache_key('llama2', 'Explain heaps', {'temperature': 0.7}))
+        self.assertNotEqual(base, cache_key('mistral', 'Explain stacks', {'temperature': 0.7}))
+        self.assertNotEqual(base, cache_key('mistral', 'Explain heaps', {'temperature': 0.2}))
+
+    def test_hits_and_misses_are_counted(self):
+        """Test round-tripping a response and the counters."""
+        self.assertIsNone(self.cache.get('k'))
+        self.cache.put('k', 'mistral', 'explain', 'A heap is a tree.')
+        self.assertEqual(self.cache.get('k'), 'A heap is a tree.')
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that entries past max_bytes go, oldest use first."""
+        for key in ('a', 'b', 'c'):
+            self.cache.put(key, 'mistral', 'explain', key * 100)
+            time.sleep(0.01)
+        self.cache.get('a')
+        self.cache.put('d', 'mistral', 'explain', 'd' * 100)
+
+        self.assertIsNone(self.cache.get('b'))
+        for key in ('a', 'c', 'd'):
+            self.assertEqual(self.cache.get(key), key * 100)
+        self.assertLessEqual(self.cache.stats()['bytes'], 300)
+
+    def test_large_responses_are_compressed(self):
+        """Test that bulky text is stored compressed and read back intact."""
+        text = 'heap property ' * 500
+        self.cache.put('big', 'mistral', 'study_guide', text)
+        self.assertLess(self.cache.stats()['bytes'], 300)
+        self.assertEqual(self.cache.get('big'), text)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
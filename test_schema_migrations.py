@@ -0,0 +1,206 @@
+"""
+Unit Tests for Schema Migrations
+Tests the user_version-keyed migration engine and the index set it installs.
+"""
+
+import unittest
+import os
+import json
+import sqlite3
+import tempfile
+import sys
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from schema_migrations import (
+    Migration, SchemaDriftError, apply_migrations, ensure_schema, get_schema_version, latest_version,
+    schema_fingerprint
+)
+from enhanced_database_manager import EnhancedDatabaseManager, SCHEMA_MIGRATIONS
+
+
+class TestMigrationEngine(unittest.TestCase):
+    """Test suite for apply_migrations."""
+
+    def setUp(self):
+        """Create an empty temporary database."""
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix='.db')
+        self.conn = sqlite3.connect(self.test_db_path)
+
+    def tearDown(self):
+        """Remove the temporary database."""
+        self.conn.close()
+        try:
+            os.close(self.test_db_fd)
+            os.unlink(self.test_db_path)
+        except Exception:
+            pass
+
+    def test_applies_pending_in_order(self):
+        """Test that migrations run in version order and bump user_version."""
+        migrations = [
+            Migration(2, "add column", ("ALTER TABLE t ADD COLUMN b TEXT",)),
+            Migration(1, "create", ("CREATE TABLE t (a INTEGER)",)),
+        ]
+        version = apply_migrations(self.conn, migrations)
+
+        self.assertEqual(version, 2)
+        self.assertEqual(get_schema_version(self.conn), 2)
+        columns = [r[1] for r in self.conn.execute("PRAGMA table_info(t)")]
+        self.assertEqual(columns, ['a', 'b'])
+
+    def test_skips_applied_versions(self):
+        """Test that re-running only applies newer steps."""
+        apply_migrations(self.conn, [Migration(1, "create", ("CREATE TABLE t (a INTEGER)",))])
+        version = apply_migrations(self.conn, [
+            Migration(1, "create", ("CREATE TABLE t (a INTEGER)",)),
+            Migration(2, "seed", (), lambda c: c.execute("INSERT INTO t VALUES (7)")),
+        ])
+
+        self.assertEqual(version, 2)
+        self.assertEqual(self.conn.execute("SELECT a FROM t").fetchall(), [(7,)])
+
+    def test_failed_step_rolls_back(self):
+        """Test that a failing migration leaves the schema untouched."""
+        with self.assertRaises(sqlite3.OperationalError):
+            apply_migrations(self.conn, [
+                Migration(1, "create", ("CREATE TABLE t (a INTEGER)",)),
+                Migration(2, "broken", ("ALTER TABLE missing ADD COLUMN x",)),
+            ])
+
+        self.assertEqual(get_schema_version(self.conn), 0)
+        tables = self.conn.execute("SELECT name FROM sqlite_master WHERE name = 't'").fetchall()
+        self.assertEqual(tables, [])
+
+    def test_ensure_schema_is_read_only_when_current(self):
+        """Test that a current database is verified without a write lock."""
+        migrations = [Migration(1, "create", ("CREATE TABLE t (a INTEGER)",))]
+        self.assertTrue(ensure_schema(self.conn, migrations))
+
+        writer = sqlite3.connect(self.test_db_path)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            reader = sqlite3.connect(self.test_db_path, timeout=0.1)
+            self.assertFalse(ensure_schema(reader, migrations))
+            reader.close()
+        finally:
+            writer.rollback()
+            writer.close()
+
+    def test_changed_migrations_change_fingerprint(self):
+        """Test that editing a step invalidates the recorded fingerprint."""
+        original = [Migration(1, "create", ("CREATE TABLE t (a INTEGER)",))]
+        edited = original + [Migration(2, "index", ("CREATE INDEX idx_t ON t (a)",))]
+        self.assertNotEqual(schema_fingerprint(original), schema_fingerprint(edited))
+
+        ensure_schema(self.conn, original)
+        self.assertTrue(ensure_schema(self.conn, edited))
+        self.assertEqual(get_schema_version(self.conn), 2)
+
+    def test_edited_applied_migration_is_reported(self):
+        """Test that editing an already-applied step raises instead of being skipped."""
+        ensure_schema(self.conn, [Migration(1, "create", ("CREATE TABLE t (a INTEGER)",))])
+        edited = [Migration(1, "create", ("CREATE TABLE t (a INTEGER, b TEXT)",))]
+
+        with self.assertRaises(SchemaDriftError):
+            ensure_schema(self.conn, edited)
+        with self.assertRaises(SchemaDriftError):
+            ensure_schema(self.conn, edited + [Migration(2, "index", ("CREATE INDEX idx_t ON t (a)",))])
+        self.assertEqual(get_schema_version(self.conn), 1)
+        self.assertFalse(self.conn.in_transaction)
+
+
+class TestDatabaseManagerMigrations(unittest.TestCase):
+    """Test suite for the EnhancedDatabaseManager migration set."""
+
+    def setUp(self):
+        """Create a temporary database path."""
+        self.test_db_fd, self.test_db_path = tempfile.mkstemp(suffix='.db')
+
+    def tearDown(self):
+        """Remove the temporary database."""
+        try:
+            os.close(self.test_db_fd)
+            os.unlink(self.test_db_path)
+        except Exception:
+            pass
+
+    def test_fresh_database_is_current(self):
+        """Test that a new database ends at the latest version."""
+        db_manager = EnhancedDatabaseManager(db_name=self.test_db_path)
+        with db_manager.pool.connection() as conn:
+            self.assertEqual(get_schema_version(conn), latest_version(SCHEMA_MIGRATIONS))
+        db_manager.close()
+
+    def test_legacy_database_upgraded_in_place(self):
+        """Test that an unversioned database keeps its rows and gains indexes."""
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute('''
+            CREATE TABLE tasks (
+                task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                task_text TEXT NOT NULL,
+                is_completed INTEGER DEFAULT 0,
+                due_date DATE,
+                priority TEXT DEFAULT 'medium',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_at TIMESTAMP
+            )
+        ''')
+        conn.execute("INSERT INTO tasks (user_id, task_text) VALUES (1, 'legacy')")
+        conn.commit()
+        conn.close()
+
+        db_manager = EnhancedDatabaseManager(db_name=self.test_db_path)
+        self.assertEqual(db_manager.get_tasks(1)[0]['task_text'], 'legacy')
+
+        with db_manager.pool.connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE user_id = ? AND is_completed = 0",
+                (1,)
+            ).fetchall()
+        db_manager.close()
+        self.assertIn('idx_tasks_user_status_due', ' '.join(str(row[-1]) for row in plan))
+
+    def test_legacy_exam_blobs_move_to_rows(self):
+        """Test that JSON exam blobs are migrated into exam_questions."""
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute('''
+            CREATE TABLE exams (
+                exam_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                topic_id INTEGER,
+                exam_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                questions TEXT NOT NULL,
+                user_answers TEXT,
+                score REAL,
+                total_questions INTEGER,
+                is_completed INTEGER DEFAULT 0
+            )
+        ''')
+        questions = [
+            {'question': 'Q1?', 'options': ['w', 'x', 'y', 'z'], 'correct_answer': 'B', 'explanation': 'E'},
+            {'question': 'Q2?', 'options': ['w', 'x', 'y', 'z'], 'correct_answer': 'C', 'explanation': 'E'}
+        ]
+        conn.execute(
+            "INSERT INTO exams (user_id, questions, user_answers, score, total_questions, is_completed) "
+            "VALUES (1, ?, ?, 50.0, 2, 1)",
+            (json.dumps(questions), json.dumps({'0': 'B', '1': 'A'}))
+        )
+        conn.commit()
+        conn.close()
+
+        db_manager = EnhancedDatabaseManager(db_name=self.test_db_path)
+        exam = db_manager.get_exam_by_id(1)
+        with db_manager.pool.connection() as conn:
+            blob = conn.execute("SELECT questions, user_answers FROM exams WHERE exam_id = 1").fetchone()
+        db_manager.close()
+
+        self.assertEqual(exam['questions'], questions)
+        self.assertEqual(exam['user_answers'], {'0': 'B', '1': 'A'})
+        self.assertEqual(tuple(blob), ('[]', None))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
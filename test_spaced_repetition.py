@@ -0,0 +1,200 @@
+"""
+Unit Tests for Spaced Repetition
+Tests SM-2 scheduling, exam-driven card creation and due-card ranking.
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+# Mock torch and transformers
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from enhanced_app_logic import EnhancedAppLogic
+from enhanced_database_manager import EnhancedDatabaseManager
+from exam_store import EXAM_QUESTIONS_SCHEMA, insert_questions, record_answers
+from spaced_repetition import (
+    DEFAULT_EASE, DUE_CARDS_QUERY, MIN_EASE, REVIEW_CARDS_INDEX, REVIEW_CARDS_SCHEMA, due_cards, due_count,
+    review_card, schedule_exam_answers, sm2
+)
+
+DAY = date(2024, 3, 1)
+QUESTIONS = [
+    {'question': 'Q1?', 'options': ['a', 'b'], 'correct_answer': 'A', 'explanation': 'because'},
+    {'question': 'Q2?', 'options': ['a', 'b'], 'correct_answer': 'B', 'explanation': ''},
+    {'question': 'Q3?', 'options': ['a', 'b'], 'correct_answer': 'A', 'explanation': ''},
+]
+
+
+class TestSM2(unittest.TestCase):
+    """Test suite for the SM-2 update rule."""
+
+    def test_intervals_grow_on_success(self):
+        """Test the 1, 6, then ease-multiplied interval sequence."""
+        state = (DEFAULT_EASE, 0, 0)
+        intervals = []
+        for _ in range(4):
+            state = sm2(*state, 5)
+            intervals.append(state[1])
+        self.assertEqual(intervals[:2], [1, 6])
+        self.assertGreater(intervals[3], intervals[2])
+        self.assertGreater(intervals[2], 6)
+
+    def test_lapse_resets_and_lowers_ease(self):
+        """Test that a failed review restarts the card."""
+        ease, interval, reps = sm2(DEFAULT_EASE, 15, 3, 1)
+        self.assertEqual((interval, reps), (1, 0))
+        self.assertLess(ease, DEFAULT_EASE)
+        self.assertEqual(sm2(MIN_EASE, 1, 0, 0)[0], MIN_EASE)
+
+    def test_quality_out_of_range(self):
+        """Test that grades outside 0-5 are rejected."""
+        with self.assertRaises(ValueError):
+            sm2(DEFAULT_EASE, 0, 0, 6)
+
+
+class TestReviewCards(unittest.TestCase):
+    """Test suite for review_cards."""
+
+    def setUp(self):
+        """Create an in-memory database with exam questions and review cards."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(EXAM_QUESTIONS_SCHEMA)
+        self.conn.execute(REVIEW_CARDS_SCHEMA)
+        self.conn.execute(REVIEW_CARDS_INDEX)
+
+    def tearDown(self):
+        """Close the connection."""
+        self.conn.close()
+
+    def _take_exam(self, exam_id, answers, day=DAY):
+        insert_questions(self.conn, exam_id, QUESTIONS)
+        record_answers(self.conn, exam_id, answers)
+        return schedule_exam_answers(self.conn, 1, 7, exam_id, day)
+
+    def test_answered_questions_become_cards(self):
+        """Test that each answered question is scheduled by correctness."""
+        self.assertEqual(self._take_exam(1, {'0': 'A', '1': 'A'}), 2)
+
+        due = dict(self.conn.execute("SELECT question, due FROM review_cards").fetchall())
+        self.assertEqual(due, {'Q1?': '2024-03-02', 'Q2?': '2024-03-02'})
+        lapses = dict(self.conn.execute("SELECT question, lapses FROM review_cards").fetchall())
+        self.assertEqual(lapses, {'Q1?': 0, 'Q2?': 1})
+
+    def test_repeat_question_updates_same_card(self):
+        """Test that a question seen again in a later exam reuses its card."""
+        self._take_exam(1, {'0': 'A'})
+        self._take_exam(2, {'0': 'A'}, DAY + timedelta(days=1))
+
+        rows = self.conn.execute("SELECT repetitions, interval_days FROM review_cards").fetchall()
+        self.assertEqual(rows, [(2, 6)])
+
+    def test_due_cards_rank_overdue_then_hardest(self):
+        """Test that due cards come back most overdue first, then lowest ease, within the limit."""
+        self._take_exam(1, {'0': 'A', '1': 'A', '2': 'A'})
+        later = DAY + timedelta(days=1)
+
+        cards = due_cards(self.conn, 1, limit=2, day=later)
+        self.assertEqual([c['question'] for c in cards], ['Q2?', 'Q1?'])
+        self.assertEqual(cards[1]['explanation'], 'because')
+        self.assertEqual(cards[1]['options'], ['a', 'b'])
+        self.assertEqual(due_count(self.conn, 1, later), 3)
+        self.assertEqual(due_cards(self.conn, 1, day=DAY), [])
+
+        self.conn.execute("UPDATE review_cards SET due = '2024-02-01' WHERE question = 'Q3?'")
+        self.assertEqual(due_cards(self.conn, 1, limit=1, day=later)[0]['question'], 'Q3?')
+
+    def test_due_cards_read_is_index_ordered(self):
+        """Test that the ranking is served by the index, without a sort step."""
+        plan = ' '.join(r[-1] for r in self.conn.execute(
+            "EXPLAIN QUERY PLAN " + DUE_CARDS_QUERY, (1, DAY.isoformat(), 20)
+        ))
+        self.assertIn('idx_review_cards_due', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_review_card_reschedules(self):
+        """Test grading a review moves the card out of the due range."""
+        self._take_exam(1, {'0': 'A'})
+        card_id = self.conn.execute("SELECT card_id FROM review_cards").fetchone()[0]
+        later = DAY + timedelta(days=1)
+
+        self.assertEqual(review_card(self.conn, 1, card_id, 4, later), '2024-03-08')
+        self.assertEqual(due_count(self.conn, 1, later), 0)
+        self.assertIsNone(review_card(self.conn, 2, card_id, 4, later))
+
+
+class TestExamResubmission(unittest.TestCase):
+    """Test that regrading an exam does not review its cards again."""
+
+    def setUp(self):
+        """Create temporary databases for both layers."""
+        self.app_db_fd, self.app_db_path = tempfile.mkstemp(suffix='.db')
+        self.manager_db_fd, self.manager_db_path = tempfile.mkstemp(suffix='.db')
+
+    def tearDown(self):
+        """Remove the temporary databases."""
+        for fd, path in ((self.app_db_fd, self.app_db_path), (self.manager_db_fd, self.manager_db_path)):
+            os.close(fd)
+            os.unlink(path)
+
+    @staticmethod
+    def _cards(conn):
+        return conn.execute(
+            "SELECT question, ease, interval_days, repetitions, lapses, due FROM review_cards ORDER BY question"
+        ).fetchall()
+
+    def test_manager_resubmission(self):
+        """Test submitting the same exam twice through the database manager."""
+        db_manager = EnhancedDatabaseManager(db_name=self.manager_db_path)
+        try:
+            db_manager.create_user("testuser", "testpass123", "test@example.com")
+            user_id = db_manager.get_user_by_username("testuser")['user_id']
+            exam_id = db_manager.create_exam(user_id, None, QUESTIONS)
+            db_manager.submit_exam(exam_id, {'0': 'A', '1': 'A'})
+            with db_manager.pool.connection() as conn:
+                first = [tuple(r) for r in self._cards(conn)]
+            db_manager.submit_exam(exam_id, {'0': 'A', '1': 'A'})
+            with db_manager.pool.connection() as conn:
+                second = [tuple(r) for r in self._cards(conn)]
+        finally:
+            db_manager.close()
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second, first)
+
+    def test_app_resubmission(self):
+        """Test submitting the same exam twice through the app logic."""
+        app_logic = EnhancedAppLogic(db_path=self.app_db_path)
+        try:
+            if app_logic.ollama:
+                app_logic.ollama.close()
+            app_logic.ollama = None
+            app_logic.register_user("testuser", "testpass123", "test@example.com")
+            app_logic.login_user("testuser", "testpass123")
+            app_logic.add_subtopic("Heaps", "CS")
+            topic_id = app_logic.get_user_subtopics()[0]['topic_id']
+
+            _, _, exam_id = app_logic.start_exam(topic_id, 3, 'easy')
+            app_logic.submit_exam(exam_id, {0: 'A', 1: 'B'})
+            with app_logic.db.connection() as conn:
+                first = self._cards(conn)
+            app_logic.submit_exam(exam_id, {0: 'A', 1: 'B'})
+            with app_logic.db.connection() as conn:
+                second = self._cards(conn)
+        finally:
+            app_logic.close()
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second, first)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,107 @@
+"""
+Unit Tests for Incremental Streak Tracking
+Tests record_active_day, read_streak and the backfill job.
+"""
+
+import unittest
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+# Add project directory to path
+sys.path.insert(0, os.path.abspath('.'))
+
+from streaks import STREAK_SCHEMA, backfill_streaks, read_streak, record_active_day, streak_history
+
+
+class TestStreakTracking(unittest.TestCase):
+    """Test suite for the user_streaks helpers."""
+
+    def setUp(self):
+        """Create an in-memory database with an activity table."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute(STREAK_SCHEMA)
+        self.conn.execute("CREATE TABLE activity (user_id INTEGER, activity_date DATE)")
+        self.start = date(2024, 3, 1)
+
+    def tearDown(self):
+        """Close the connection."""
+        self.conn.close()
+
+    def _record(self, user_id, *offsets):
+        for offset in offsets:
+            day = self.start + timedelta(days=offset)
+            self.conn.execute("INSERT INTO activity VALUES (?, ?)", (user_id, day.isoformat()))
+            record_active_day(self.conn, user_id, day)
+
+    def test_consecutive_days_extend_streak(self):
+        """Test that consecutive days grow the run and repeats are ignored."""
+        self._record(1, 0, 1, 1, 2)
+        streak = read_streak(self.conn, 1, today=self.start + timedelta(days=2))
+        self.assertEqual(streak['current_streak'], 3)
+        self.assertEqual(streak['longest_streak'], 3)
+
+    def test_gap_restarts_but_keeps_longest(self):
+        """Test that a missed day restarts the run without losing the record."""
+        self._record(1, 0, 1, 2, 5)
+        streak = read_streak(self.conn, 1, today=self.start + timedelta(days=5))
+        self.assertEqual((streak['current_streak'], streak['longest_streak']), (1, 3))
+
+    def test_stale_streak_reads_as_zero(self):
+        """Test that the grace window decides whether the run is still current."""
+        self._record(1, 0, 1)
+        yesterday_run = self.start + timedelta(days=2)
+        self.assertEqual(read_streak(self.conn, 1, today=yesterday_run)['current_streak'], 0)
+        self.assertEqual(read_streak(self.conn, 1, grace_days=1, today=yesterday_run)['current_streak'], 2)
+
+    def test_backfill_matches_incremental(self):
+        """Test that the backfill job reproduces incrementally kept rows."""
+        self._record(1, 0, 1, 2, 5, 6)
+        self._record(2, 3)
+        incremental = self.conn.execute("SELECT * FROM user_streaks ORDER BY user_id").fetchall()
+
+        self.assertEqual(backfill_streaks(self.conn, 'activity'), 2)
+        rebuilt = self.conn.execute("SELECT * FROM user_streaks ORDER BY user_id").fetchall()
+        self.assertEqual(rebuilt, incremental)
+
+
+class TestStreakHistory(unittest.TestCase):
+    """Test suite for the gaps-and-islands streak history."""
+
+    def setUp(self):
+        """Create an in-memory activity table."""
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute("CREATE TABLE activity (user_id INTEGER, activity_date DATE)")
+
+    def tearDown(self):
+        """Close the connection."""
+        self.conn.close()
+
+    def test_runs_and_monthly_coverage(self):
+        """Test that runs span month ends and duplicates count once."""
+        days = ['2024-01-30', '2024-01-31', '2024-02-01', '2024-02-01', '2024-02-05', '2024-02-10', '2024-02-11']
+        self.conn.executemany("INSERT INTO activity VALUES (1, ?)", [(d,) for d in days])
+        self.conn.execute("INSERT INTO activity VALUES (2, '2024-02-02')")
+
+        history = streak_history(self.conn, 'activity', 1)
+        self.assertEqual(history['runs'], [
+            {'start': '2024-01-30', 'end': '2024-02-01', 'length': 3},
+            {'start': '2024-02-05', 'end': '2024-02-05', 'length': 1},
+            {'start': '2024-02-10', 'end': '2024-02-11', 'length': 2},
+        ])
+        self.assertEqual(history['run_count'], 3)
+        self.assertEqual(history['longest_streak'], 3)
+        self.assertEqual(
+            [(m['month'], m['active_days'], m['days_in_month']) for m in history['monthly_coverage']],
+            [('2024-01', 2, 31), ('2024-02', 4, 29)]
+        )
+
+    def test_no_activity(self):
+        """Test the empty history shape."""
+        history = streak_history(self.conn, 'activity', 1)
+        self.assertEqual((history['runs'], history['run_count'], history['longest_streak']), ([], 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -35,6 +35,8 @@ class TestUserManagement(unittest.TestCase):
     
     def tearDown(self):
         """Clean up test fixtures."""
+        self.app_logic.db_manager.close()
+        self.app_logic.close()
         try:
             os.close(self.test_db_fd)
             os.unlink(self.test_db_path)
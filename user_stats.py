@@ -0,0 +1,149 @@
+import argparse
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+# Each counter maps to (source table, per-row contribution). "{row}" is
+# replaced by NEW/OLD inside triggers and by the table name when rebuilding.
+STAT_COLUMNS = (
+    ('topic_count', 'subtopics', "1"),
+    ('progress_total', 'subtopics', "COALESCE({row}.progress, 0)"),
+    ('pending_tasks', 'tasks', "(COALESCE({row}.is_completed, 0) = 0)"),
+    ('completed_goals', 'goals', "(COALESCE({row}.is_completed, 0) != 0)"),
+    ('exams_taken', 'exams', None),
+)
+
+# How each schema marks an exam as taken
+EXAM_TAKEN_FLAG = "(COALESCE({row}.is_completed, 0) != 0)"
+EXAM_TAKEN_SCORE = "({row}.score IS NOT NULL)"
+
+
+def _columns(exam_taken: str) -> List[Tuple[str, str, str]]:
+    return [(name, table, expr or exam_taken) for name, table, expr in STAT_COLUMNS]
+
+
+def user_stats_schema(exam_taken: str) -> Tuple[str, ...]:
+    """DDL for the user_stats table and the triggers that maintain it"""
+    statements = ['''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            topic_count INTEGER NOT NULL DEFAULT 0,
+            progress_total INTEGER NOT NULL DEFAULT 0,
+            pending_tasks INTEGER NOT NULL DEFAULT 0,
+            completed_goals INTEGER NOT NULL DEFAULT 0,
+            exams_taken INTEGER NOT NULL DEFAULT 0
+        )
+    ''']
+
+    by_table: Dict[str, List[Tuple[str, str]]] = {}
+    for name, table, expr in _columns(exam_taken):
+        by_table.setdefault(table, []).append((name, expr))
+
+    for table, counters in by_table.items():
+        def apply(row: str, sign: str) -> str:
+            sets = ', '.join(f"{name} = {name} {sign} {expr.format(row=row)}" for name, expr in counters)
+            return f"UPDATE user_stats SET {sets} WHERE user_id = {row}.user_id;"
+
+        ensure = "INSERT OR IGNORE INTO user_stats (user_id) VALUES (NEW.user_id);"
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_insert AFTER INSERT ON {table} "
+            f"BEGIN {ensure} {apply('NEW', '+')} END"
+        )
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_delete AFTER DELETE ON {table} "
+            f"BEGIN {apply('OLD', '-')} END"
+        )
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_update AFTER UPDATE ON {table} "
+            f"BEGIN {apply('OLD', '-')} {ensure} {apply('NEW', '+')} END"
+        )
+    return tuple(statements)
+
+
+def _expected_stats_sql(exam_taken: str, user_id: Optional[int]) -> Tuple[str, List[Any]]:
+    tables = sorted({table for _, table, _ in STAT_COLUMNS})
+    users = " UNION ".join(["SELECT user_id FROM users"] + [f"SELECT user_id FROM {t}" for t in tables])
+    selects = ', '.join(
+        f"(SELECT COALESCE(SUM({expr.format(row=table)}), 0) FROM {table} WHERE {table}.user_id = u.user_id)"
+        for _, table, expr in _columns(exam_taken)
+    )
+    sql = f"SELECT u.user_id, {selects} FROM ({users}) u WHERE u.user_id IS NOT NULL"
+    params: List[Any] = []
+    if user_id is not None:
+        sql += " AND u.user_id = ?"
+        params.append(user_id)
+    return sql, params
+
+
+def rebuild_user_stats(conn: sqlite3.Connection, exam_taken: str, user_id: Optional[int] = None) -> int:
+    """Recompute user_stats from the source tables; returns rows written"""
+    sql, params = _expected_stats_sql(exam_taken, user_id)
+    names = ', '.join(name for name, _, _ in STAT_COLUMNS)
+    if user_id is None:
+        conn.execute("DELETE FROM user_stats")
+    else:
+        conn.execute("DELETE FROM user_stats WHERE user_id = ?", (user_id,))
+    return conn.execute(f"INSERT INTO user_stats (user_id, {names}) {sql}", params).rowcount
+
+
+def check_user_stats(conn: sqlite3.Connection, exam_taken: str, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """List counters that disagree with the source tables; empty when consistent"""
+    sql, params = _expected_stats_sql(exam_taken, user_id)
+    names = [name for name, _, _ in STAT_COLUMNS]
+    stored = {
+        row[0]: row[1:]
+        for row in conn.execute(f"SELECT user_id, {', '.join(names)} FROM user_stats")
+    }
+
+    mismatches = []
+    for row in conn.execute(sql, params):
+        actual = stored.get(row[0], (0,) * len(names))
+        for name, expected, value in zip(names, row[1:], actual):
+            if expected != value:
+                mismatches.append({'user_id': row[0], 'column': name, 'stored': value, 'expected': expected})
+    return mismatches
+
+
+def read_user_stats(conn: sqlite3.Connection, user_id: int) -> Dict[str, Any]:
+    """Single-row read of one user's counters, with average progress derived"""
+    names = [name for name, _, _ in STAT_COLUMNS]
+    row = conn.execute(f"SELECT {', '.join(names)} FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+    stats = dict(zip(names, tuple(row) if row else (0,) * len(names)))
+    stats['average_progress'] = stats['progress_total'] / stats['topic_count'] if stats['topic_count'] else 0
+    return stats
+
+
+def detect_exam_taken(conn: sqlite3.Connection) -> str:
+    """Pick the exam predicate matching the schema of an existing database"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(exams)")}
+    return EXAM_TAKEN_FLAG if 'is_completed' in columns else EXAM_TAKEN_SCORE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or rebuild the user_stats table")
+    parser.add_argument('database', help="Path to tracker.db or study_tracker.db")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute every user's counters")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.database)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_stats'").fetchone():
+            print("user_stats table not found; open the database with the app once to migrate it")
+            return 2
+        exam_taken = detect_exam_taken(conn)
+        if args.rebuild:
+            with conn:
+                count = rebuild_user_stats(conn, exam_taken)
+            print(f"Rebuilt stats for {count} users")
+            return 0
+
+        mismatches = check_user_stats(conn, exam_taken)
+        for m in mismatches:
+            print(f"user {m['user_id']}: {m['column']} stored {m['stored']}, expected {m['expected']}")
+        print("user_stats is consistent" if not mismatches else f"{len(mismatches)} mismatches found")
+        return 1 if mismatches else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())